@@ -3,4 +3,4 @@ Agents package for the multi-format autonomous AI system
 Contains specialized agents for different input formats and classification
 """
 
-__version__ = "1.0.0"
+__version__ = "1.2.0"
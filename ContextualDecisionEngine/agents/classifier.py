@@ -3,15 +3,79 @@ Classifier Agent - Detects format and business intent using OpenAI
 Uses few-shot examples and schema matching for accurate classification
 """
 
+import os
 import json
-from typing import Dict, Any, Optional
-from ContextualDecisionEngine.utils.openai_client import OpenAIClient
+import asyncio
+from typing import Dict, Any, Optional, Tuple
+from ContextualDecisionEngine.utils.openai_client import OpenAIClient, note_fallback
+from ContextualDecisionEngine.utils.llm_registry import get_llm_registry
+from ContextualDecisionEngine.utils.format_sniffer import sniff_format
+from ContextualDecisionEngine.utils.keyword_lexicon import KeywordLexicon, KeywordHits
 from ContextualDecisionEngine.memory.store import MemoryStore
 
 class ClassifierAgent:
-    def __init__(self, memory_store: MemoryStore):
+    # sequential: format then intent, parallel: both calls gathered, fused: one combined call
+    MODES = ("sequential", "parallel", "fused")
+
+    def __init__(
+        self,
+        memory_store: MemoryStore,
+        openai_client: Optional[OpenAIClient] = None,
+        mode: Optional[str] = None,
+        sniff_threshold: Optional[float] = None
+    ):
         self.memory_store = memory_store
-        self.openai_client = OpenAIClient()
+        self.openai_client = openai_client or OpenAIClient("classifier", get_llm_registry())
+        
+        self.mode = mode or os.getenv("CLASSIFIER_MODE", "fused")
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown classifier mode: {self.mode}")
+        
+        # Structural sniffing decides the format without an LLM call at or above this confidence
+        if sniff_threshold is None:
+            sniff_threshold = float(os.getenv("SNIFF_THRESHOLD", "0.9"))
+        self.sniff_threshold = sniff_threshold
+        
+        self.available_intents = [
+            "Policy Review", "Invoice Processing", "Contract Review", "Customer Service",
+            "Risk Assessment", "Documentation", "General Document"
+        ]
+        
+        # Fallback intent keywords, checked in priority order
+        self.intent_keywords = {
+            # Policy and regulatory documents
+            "Policy Review": [
+                "policy", "gdpr", "regulation", "compliance", "privacy", "data protection",
+                "hipaa", "sox", "pci", "iso", "audit", "governance", "security policy",
+                "acceptable use", "code of conduct", "regulatory", "legal", "terms"
+            ],
+            # Invoice and financial documents
+            "Invoice Processing": [
+                "invoice", "bill", "payment", "amount", "total", "subtotal", "tax",
+                "purchase order", "receipt", "financial", "accounting", "cost"
+            ],
+            # Contract and agreement documents
+            "Contract Review": [
+                "contract", "agreement", "terms and conditions", "sla", "statement of work",
+                "proposal", "quote", "rfq", "quotation", "pricing", "vendor"
+            ],
+            # Complaint and issue documents
+            "Customer Service": [
+                "complaint", "issue", "problem", "disappointed", "dissatisfied",
+                "escalation", "urgent", "critical", "failure", "error"
+            ],
+            # Risk and fraud documents
+            "Risk Assessment": [
+                "fraud", "suspicious", "risk", "alert", "anomaly", "unusual",
+                "investigation", "security incident", "breach"
+            ],
+            # Technical documentation
+            "Documentation": [
+                "manual", "documentation", "specification", "technical", "procedure",
+                "installation", "configuration", "setup", "guide"
+            ]
+        }
+        self.lexicon = KeywordLexicon(dict(self.intent_keywords, email_markers=["from:", "to:", "subject:", "@"]))
         
         # Few-shot examples for classification
         self.few_shot_examples = {
@@ -65,33 +129,113 @@ class ClassifierAgent:
             Dictionary with classification results
         """
         try:
+            confidence_score = 0.85  # Placeholder unless the fused call reports a confidence
+            
             # If format is already detected (e.g., from file extension), use it
             format_result = detected_format
+            format_source = "provided"
             
-            # If format not detected, classify it
+            # Cheap structural sniffing before spending an LLM call on the format
+            sniffed = None
             if not format_result:
-                format_result = await self._classify_format(content)
+                sniffed = sniff_format(content)
+                if sniffed["format"] and sniffed["confidence"] >= self.sniff_threshold:
+                    format_result = sniffed["format"]
+                    format_source = "sniffer"
             
-            # Classify business intent
-            intent_result = await self._classify_intent(content)
+            if format_result:
+                # Only the business intent is left to classify
+                intent_result = await self._classify_intent(content)
+            elif self.mode == "fused":
+                fused = await self._classify_fused(content)
+                format_result, format_source = fused["format"], fused["format_source"]
+                intent_result = fused["intent"]
+                confidence_score = fused["confidence"]
+            elif self.mode == "parallel":
+                (format_result, format_source), intent_result = await asyncio.gather(
+                    self._classify_format(content),
+                    self._classify_intent(content)
+                )
+            else:
+                format_result, format_source = await self._classify_format(content)
+                intent_result = await self._classify_intent(content)
             
             # Store classification in memory
             classification_data = {
                 "format": format_result,
                 "intent": intent_result,
                 "content_preview": content[:200] + "..." if len(content) > 200 else content,
-                "confidence_score": 0.85  # Placeholder - in real implementation, extract from OpenAI response
+                "confidence_score": confidence_score,
+                "classification_mode": self.mode,
+                "format_source": format_source,
+                "format_sniff": sniffed
             }
             
-            self.memory_store.store_classification(classification_data)
+            classification_data["classification_id"] = self.memory_store.store_classification(classification_data)
             
             return classification_data
             
         except Exception as e:
             raise Exception(f"Classification failed: {str(e)}")
 
-    async def _classify_format(self, content: str) -> str:
-        """Classify the format of the input content"""
+    async def _classify_fused(self, content: str) -> Dict[str, Any]:
+        """Classify format, business intent and confidence in a single LLM call"""
+        
+        format_examples = "\n\n".join([
+            f"Input: {ex['input'][:100]}...\nFormat: {ex['format']}"
+            for ex in self.few_shot_examples["format_examples"]
+        ])
+        intent_examples = "\n\n".join([
+            f"Input: {ex['input']}\nIntent: {ex['intent']}"
+            for ex in self.few_shot_examples["intent_examples"]
+        ])
+        
+        prompt = f"""
+        You are a document classification expert. Classify both the format and the business intent of the given input.
+        
+        Format examples:
+        {format_examples}
+        
+        Intent examples:
+        {intent_examples}
+        
+        Available formats: Email, JSON, PDF
+        Available intents: {", ".join(self.available_intents)}
+        
+        Input to classify:
+        {content[:1000]}
+        
+        Analyze the structure for the format and the content, keywords and context for the intent.
+        Respond with JSON in this exact format: {{"format": "Email|JSON|PDF", "intent": "one of the available intents", "confidence": 0.0-1.0, "reasoning": "explanation"}}
+        """
+        
+        try:
+            response = await self.openai_client.chat_completion(
+                prompt=prompt,
+                response_format={"type": "json_object"},
+                max_tokens=250
+            )
+            
+            result = json.loads(response)
+            return {
+                "format": result.get("format", "Unknown"),
+                "format_source": "llm",
+                "intent": result.get("intent", "Unknown"),
+                "confidence": max(0.0, min(1.0, float(result.get("confidence", 0.85))))
+            }
+            
+        except Exception as e:
+            note_fallback("classifier:fused")
+            hits = self.lexicon.scan(content)
+            return {
+                "format": self._fallback_format(content, hits),
+                "format_source": "fallback",
+                "intent": self._fallback_intent(content, hits),
+                "confidence": 0.5
+            }
+
+    async def _classify_format(self, content: str) -> Tuple[str, str]:
+        """Classify the format of the input content, returning the format and the path that decided it"""
         
         # Prepare few-shot examples for format classification
         examples_text = "\n\n".join([
@@ -122,17 +266,21 @@ class ClassifierAgent:
             )
             
             result = json.loads(response)
-            return result.get("format", "Unknown")
+            return result.get("format", "Unknown"), "llm"
             
         except Exception as e:
-            # Fallback logic for format detection
-            content_lower = content.lower()
-            if any(keyword in content_lower for keyword in ["from:", "to:", "subject:", "@"]):
-                return "Email"
-            elif content.strip().startswith(("{", "[")):
-                return "JSON"
-            else:
-                return "PDF"
+            note_fallback("classifier:format")
+            return self._fallback_format(content), "fallback"
+
+    def _fallback_format(self, content: str, hits: Optional[KeywordHits] = None) -> str:
+        """Fallback logic for format detection"""
+        hits = hits or self.lexicon.scan(content)
+        if hits.any("email_markers"):
+            return "Email"
+        elif content.strip().startswith(("{", "[")):
+            return "JSON"
+        else:
+            return "PDF"
 
     async def _classify_intent(self, content: str) -> str:
         """Classify the business intent of the input content"""
@@ -149,7 +297,7 @@ class ClassifierAgent:
         Examples:
         {examples_text}
         
-        Available intents: Policy Review, Invoice Processing, Contract Review, Customer Service, Risk Assessment, Documentation, General Document
+        Available intents: {", ".join(self.available_intents)}
         
         Input to classify:
         {content[:1000]}
@@ -168,52 +316,17 @@ class ClassifierAgent:
             return result.get("intent", "Unknown")
             
         except Exception as e:
-            # Enhanced fallback logic for intent detection
-            content_lower = content.lower()
-            
-            # Policy and regulatory documents
-            if any(keyword in content_lower for keyword in [
-                "policy", "gdpr", "regulation", "compliance", "privacy", "data protection",
-                "hipaa", "sox", "pci", "iso", "audit", "governance", "security policy",
-                "acceptable use", "code of conduct", "regulatory", "legal", "terms"
-            ]):
-                return "Policy Review"
-            
-            # Invoice and financial documents
-            elif any(keyword in content_lower for keyword in [
-                "invoice", "bill", "payment", "amount", "total", "subtotal", "tax",
-                "purchase order", "receipt", "financial", "accounting", "cost"
-            ]):
-                return "Invoice Processing"
-            
-            # Contract and agreement documents
-            elif any(keyword in content_lower for keyword in [
-                "contract", "agreement", "terms and conditions", "sla", "statement of work",
-                "proposal", "quote", "rfq", "quotation", "pricing", "vendor"
-            ]):
-                return "Contract Review"
-            
-            # Complaint and issue documents
-            elif any(keyword in content_lower for keyword in [
-                "complaint", "issue", "problem", "disappointed", "dissatisfied",
-                "escalation", "urgent", "critical", "failure", "error"
-            ]):
-                return "Customer Service"
-            
-            # Risk and fraud documents
-            elif any(keyword in content_lower for keyword in [
-                "fraud", "suspicious", "risk", "alert", "anomaly", "unusual",
-                "investigation", "security incident", "breach"
-            ]):
-                return "Risk Assessment"
-            
-            # Technical documentation
-            elif any(keyword in content_lower for keyword in [
-                "manual", "documentation", "specification", "technical", "procedure",
-                "installation", "configuration", "setup", "guide"
-            ]):
-                return "Documentation"
-            
-            # Default for unclassified content
-            else:
-                return "General Document"
+            note_fallback("classifier:intent")
+            return self._fallback_intent(content)
+
+    def _fallback_intent(self, content: str, hits: Optional[KeywordHits] = None) -> str:
+        """Enhanced fallback logic for intent detection"""
+        hits = hits or self.lexicon.scan(content)
+        
+        # First intent, in priority order, with any keyword present
+        for intent in self.intent_keywords:
+            if hits.any(intent):
+                return intent
+        
+        # Default for unclassified content
+        return "General Document"
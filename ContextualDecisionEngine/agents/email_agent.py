@@ -3,16 +3,61 @@ Email Agent - Processes email content and extracts structured fields
 Identifies tone and triggers actions based on urgency and sentiment
 """
 
+import os
 import json
-import re
-from typing import Dict, Any
-from ContextualDecisionEngine.utils.openai_client import OpenAIClient
+from typing import Dict, Any, Optional
+from ContextualDecisionEngine.utils.openai_client import OpenAIClient, note_fallback
+from ContextualDecisionEngine.utils.llm_registry import get_llm_registry
+from ContextualDecisionEngine.utils.keyword_lexicon import KeywordLexicon, KeywordHits
+from ContextualDecisionEngine.utils.email_parser import ParsedEmail, parse_email
 from ContextualDecisionEngine.memory.store import MemoryStore
 
 class EmailAgent:
-    def __init__(self, memory_store: MemoryStore):
+    # Fields the headers state exactly; the LLM is only asked for them when headers are missing
+    HEADER_FIELDS = {
+        "sender": ("email address or name of sender", '"string"'),
+        "recipient": ("email address or name of recipient", '"string"'),
+        "subject": ("email subject line", '"string"')
+    }
+    # Fields that need reading the message
+    SEMANTIC_FIELDS = {
+        "issue_type": ("main issue or request type", '"string"'),
+        "key_points": ("list of main points or requests", '["string"]'),
+        "contact_info": ("any contact information mentioned", '"string"'),
+        "deadline_mentioned": ("any deadlines or time-sensitive information", '"string"')
+    }
+
+    def __init__(
+        self,
+        memory_store: MemoryStore,
+        openai_client: Optional[OpenAIClient] = None,
+        sniff_threshold: Optional[float] = None
+    ):
         self.memory_store = memory_store
-        self.openai_client = OpenAIClient()
+        self.openai_client = openai_client or OpenAIClient("email", get_llm_registry())
+        
+        # Same confidence the classifier needs before it calls the input an email, so both
+        # agree on whether a payload starts with a header block
+        if sniff_threshold is None:
+            sniff_threshold = float(os.getenv("SNIFF_THRESHOLD", "0.9"))
+        self.sniff_threshold = sniff_threshold
+        
+        # Fallback tone keywords (checked in this order) and urgency keywords
+        self.tone_keywords = {
+            "urgent": (["urgent", "asap", "immediately", "emergency"], 0.8),
+            "escalation": (["disappointed", "frustrated", "unacceptable", "demand"], 0.3),
+            "threatening": (["threat", "legal", "lawsuit", "report"], 0.1),
+            "polite": (["please", "thank", "appreciate", "kindly"], 0.9)
+        }
+        self.urgency_keywords = {
+            "high": ["urgent", "asap", "immediately", "emergency", "critical", "deadline"],
+            "medium": ["soon", "priority", "important", "escalate"],
+            "low": ["when possible", "convenient", "no rush", "whenever"]
+        }
+        self.lexicon = KeywordLexicon(dict(
+            {f"tone:{tone}": keywords for tone, (keywords, _) in self.tone_keywords.items()},
+            **{f"urgency:{level}": keywords for level, keywords in self.urgency_keywords.items()}
+        ))
 
     async def process(self, content: str, classification: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -23,17 +68,28 @@ class EmailAgent:
             classification: Classification result from classifier agent
             
         Returns:
-            Dictionary with extracted fields and processing results
+            Dictionary with extracted fields and processing results. The decoded attachment
+            parts ride along under "parsed_attachments" for the attachment fan-out; they are
+            not stored, and callers remove them before caching or returning the result
         """
         try:
+            # Parse headers and MIME structure deterministically
+            parsed = parse_email(content, self.sniff_threshold)
+            
             # Extract structured fields from email
-            extracted_fields = await self._extract_email_fields(content)
+            extracted_fields = await self._extract_email_fields(content, parsed)
+            
+            # Tone and urgency are judged on what the sender wrote, not the quoted history
+            message_text = parsed.text_for_analysis()
+            
+            # One keyword pass serves both the tone fallback and the urgency check
+            keyword_hits = self.lexicon.scan(message_text)
             
             # Analyze tone and sentiment
-            tone_analysis = await self._analyze_tone(content)
+            tone_analysis = await self._analyze_tone(message_text, keyword_hits)
             
             # Determine urgency level
-            urgency_level = await self._determine_urgency(content, tone_analysis)
+            urgency_level = await self._determine_urgency(message_text, tone_analysis, keyword_hits)
             
             # Determine action based on tone and urgency
             recommended_action = self._determine_action(tone_analysis, urgency_level)
@@ -45,44 +101,49 @@ class EmailAgent:
                 "tone_analysis": tone_analysis,
                 "urgency_level": urgency_level,
                 "recommended_action": recommended_action,
+                "attachments": [
+                    {key: attachment[key] for key in ("filename", "content_type", "size")}
+                    for attachment in parsed.attachments
+                ],
                 "processing_timestamp": self.memory_store.get_current_timestamp()
             }
             
             # Store in memory
-            self.memory_store.store_agent_result("email", result)
+            result["agent_result_id"] = self.memory_store.store_agent_result(
+                "email", result, classification.get("classification_id")
+            )
+            result["parsed_attachments"] = parsed.attachments
             
             return result
             
         except Exception as e:
             raise Exception(f"Email processing failed: {str(e)}")
 
-    async def _extract_email_fields(self, content: str) -> Dict[str, Any]:
-        """Extract structured fields from email content"""
+    async def _extract_email_fields(self, content: str, parsed: Optional[ParsedEmail] = None) -> Dict[str, Any]:
+        """Extract structured fields from email content: headers first, the LLM for the rest"""
         
+        parsed = parsed or parse_email(content, self.sniff_threshold)
+        fields = parsed.header_fields()
+        field_sources = {name: "headers" for name in fields}
+        
+        # Ask only for what the headers did not settle
+        requested = {name: spec for name, spec in self.HEADER_FIELDS.items() if name not in fields}
+        requested.update(self.SEMANTIC_FIELDS)
+        
+        field_list = "\n".join(f"        - {name}: {description}" for name, (description, _) in requested.items())
+        field_format = ",\n".join(f'            "{name}": {shape}' for name, (_, shape) in requested.items())
         prompt = f"""
         Extract structured information from the following email content.
         
         Email content:
-        {content}
+        {parsed.text_for_analysis() if parsed.has_headers else content}
         
         Extract the following fields and respond with JSON:
-        - sender: email address or name of sender
-        - recipient: email address or name of recipient  
-        - subject: email subject line
-        - issue_type: main issue or request type
-        - key_points: list of main points or requests
-        - contact_info: any contact information mentioned
-        - deadline_mentioned: any deadlines or time-sensitive information
+{field_list}
         
         Respond with JSON in this format:
         {{
-            "sender": "string",
-            "recipient": "string", 
-            "subject": "string",
-            "issue_type": "string",
-            "key_points": ["string"],
-            "contact_info": "string",
-            "deadline_mentioned": "string"
+{field_format}
         }}
         """
         
@@ -92,38 +153,43 @@ class EmailAgent:
                 response_format={"type": "json_object"}
             )
             
-            return json.loads(response)
+            extracted = json.loads(response)
+            for name in requested:
+                if name in extracted:
+                    fields[name] = extracted[name]
+                    field_sources[name] = "llm"
             
-        except Exception as e:
-            # Fallback extraction using regex
-            return self._fallback_extract_fields(content)
-
-    def _fallback_extract_fields(self, content: str) -> Dict[str, Any]:
-        """Fallback extraction using regex patterns"""
+        except Exception:
+            note_fallback("email:fields")  # Whatever the LLM did not return is filled in below
         
-        # Extract sender
-        sender_match = re.search(r'From:\s*([^\n\r]+)', content, re.IGNORECASE)
-        sender = sender_match.group(1).strip() if sender_match else "Unknown"
+        # Fallback values for fields neither the headers nor the LLM provided
+        for name, value in self._fallback_extract_fields(content, parsed).items():
+            if name not in fields:
+                fields[name] = value
+                field_sources[name] = "fallback"
         
-        # Extract subject
-        subject_match = re.search(r'Subject:\s*([^\n\r]+)', content, re.IGNORECASE)
-        subject = subject_match.group(1).strip() if subject_match else "No Subject"
+        fields["field_sources"] = field_sources
+        return fields
+
+    def _fallback_extract_fields(self, content: str, parsed: Optional[ParsedEmail] = None) -> Dict[str, Any]:
+        """Fallback values when a field could not be extracted"""
         
-        # Extract recipient
-        recipient_match = re.search(r'To:\s*([^\n\r]+)', content, re.IGNORECASE)
-        recipient = recipient_match.group(1).strip() if recipient_match else "Unknown"
+        parsed = parsed or parse_email(content, self.sniff_threshold)
+        headers = parsed.header_fields()
+        sender = headers.get("sender", "Unknown")
+        body = parsed.body or content
         
         return {
             "sender": sender,
-            "recipient": recipient,
-            "subject": subject,
+            "recipient": headers.get("recipient", "Unknown"),
+            "subject": headers.get("subject", "No Subject"),
             "issue_type": "General Inquiry",
-            "key_points": [content[:100] + "..."],
+            "key_points": [body[:100] + "..."],
             "contact_info": sender,
             "deadline_mentioned": "None specified"
         }
 
-    async def _analyze_tone(self, content: str) -> Dict[str, Any]:
+    async def _analyze_tone(self, content: str, keyword_hits: Optional[KeywordHits] = None) -> Dict[str, Any]:
         """Analyze tone and sentiment of email content"""
         
         prompt = f"""
@@ -159,23 +225,16 @@ class EmailAgent:
             
         except Exception as e:
             # Fallback tone analysis
-            content_lower = content.lower()
-            
-            if any(word in content_lower for word in ["urgent", "asap", "immediately", "emergency"]):
-                tone = "urgent"
-                sentiment_score = 0.8
-            elif any(word in content_lower for word in ["disappointed", "frustrated", "unacceptable", "demand"]):
-                tone = "escalation"
-                sentiment_score = 0.3
-            elif any(word in content_lower for word in ["threat", "legal", "lawsuit", "report"]):
-                tone = "threatening"
-                sentiment_score = 0.1
-            elif any(word in content_lower for word in ["please", "thank", "appreciate", "kindly"]):
-                tone = "polite"
-                sentiment_score = 0.9
-            else:
-                tone = "neutral"
-                sentiment_score = 0.5
+            note_fallback("email:tone")
+            keyword_hits = keyword_hits or self.lexicon.scan(content)
+            
+            tone = "neutral"
+            sentiment_score = 0.5
+            for candidate, (_, score) in self.tone_keywords.items():
+                if keyword_hits.any(f"tone:{candidate}"):
+                    tone = candidate
+                    sentiment_score = score
+                    break
             
             return {
                 "tone": tone,
@@ -185,20 +244,15 @@ class EmailAgent:
                 "reasoning": "Fallback analysis based on keyword detection"
             }
 
-    async def _determine_urgency(self, content: str, tone_analysis: Dict[str, Any]) -> str:
+    async def _determine_urgency(self, content: str, tone_analysis: Dict[str, Any], keyword_hits: Optional[KeywordHits] = None) -> str:
         """Determine urgency level based on content and tone"""
         
-        content_lower = content.lower()
-        urgency_keywords = {
-            "high": ["urgent", "asap", "immediately", "emergency", "critical", "deadline"],
-            "medium": ["soon", "priority", "important", "escalate"],
-            "low": ["when possible", "convenient", "no rush", "whenever"]
-        }
+        keyword_hits = keyword_hits or self.lexicon.scan(content)
         
         # Check for urgency keywords
-        high_count = sum(1 for keyword in urgency_keywords["high"] if keyword in content_lower)
-        medium_count = sum(1 for keyword in urgency_keywords["medium"] if keyword in content_lower)
-        low_count = sum(1 for keyword in urgency_keywords["low"] if keyword in content_lower)
+        high_count = len(keyword_hits.found("urgency:high"))
+        medium_count = len(keyword_hits.found("urgency:medium"))
+        low_count = len(keyword_hits.found("urgency:low"))
         
         # Factor in tone analysis
         tone = tone_analysis.get("tone", "neutral")
@@ -4,15 +4,16 @@ Flags anomalies and validates data integrity
 """
 
 import json
-import jsonschema
-from typing import Dict, Any, List
-from ContextualDecisionEngine.utils.openai_client import OpenAIClient
+from typing import Dict, Any, List, Optional
+from ContextualDecisionEngine.utils.openai_client import OpenAIClient, note_fallback
+from ContextualDecisionEngine.utils.llm_registry import get_llm_registry
+from ContextualDecisionEngine.utils.schema_registry import SchemaRegistry
 from ContextualDecisionEngine.memory.store import MemoryStore
 
 class JSONAgent:
-    def __init__(self, memory_store: MemoryStore):
+    def __init__(self, memory_store: MemoryStore, openai_client: Optional[OpenAIClient] = None):
         self.memory_store = memory_store
-        self.openai_client = OpenAIClient()
+        self.openai_client = openai_client or OpenAIClient("json", get_llm_registry())
         
         # Expected schemas for different types of JSON data
         self.expected_schemas = {
@@ -46,6 +47,19 @@ class JSONAgent:
                 }
             }
         }
+        
+        # Validators are compiled once; tenants add schemas at runtime through register_schema
+        self.schema_registry = SchemaRegistry(self.expected_schemas)
+
+    def register_schema(self, name: str, schema: Dict[str, Any]):
+        """
+        Add or replace a schema without a restart
+        
+        The schema is checked and compiled before it is used; invalid schemas raise ValueError.
+        Payloads that match no built-in type are tried against registered schemas in order.
+        """
+        self.schema_registry.register(name, schema)
+        self.expected_schemas[name] = schema
 
     async def process(self, content: str, classification: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -88,7 +102,9 @@ class JSONAgent:
             }
             
             # Store in memory
-            self.memory_store.store_agent_result("json", result)
+            result["agent_result_id"] = self.memory_store.store_agent_result(
+                "json", result, classification.get("classification_id")
+            )
             
             return result
             
@@ -112,18 +128,24 @@ class JSONAgent:
         elif "transaction_id" in json_data or ("amount" in json_data and "account_id" in json_data):
             return "transaction"
         
+        # Schemas registered at runtime, first match wins
+        registered = self.schema_registry.matching(json_data, self.schema_registry.runtime)
+        if registered:
+            return registered
+        
         # Use OpenAI for complex determination
         try:
+            types = list(self.schema_registry.compiled) + ["general"]
             prompt = f"""
             Analyze the following JSON data structure and determine its type.
             
             JSON data:
             {json.dumps(json_data, indent=2)[:1000]}
             
-            Possible types: webhook, invoice, transaction, general
+            Possible types: {", ".join(types)}
             
             Respond with JSON in this format:
-            {{"type": "webhook|invoice|transaction|general", "reasoning": "explanation"}}
+            {{"type": "{"|".join(types)}", "reasoning": "explanation"}}
             """
             
             response = await self.openai_client.chat_completion(
@@ -135,45 +157,27 @@ class JSONAgent:
             return result.get("type", "general")
             
         except Exception:
+            note_fallback("json:type")
             return "general"
 
     def _validate_schema(self, json_data: Dict[str, Any], json_type: str) -> Dict[str, Any]:
-        """Validate JSON data against expected schema"""
-        
-        validation_result = {
-            "is_valid": True,
-            "missing_fields": [],
-            "type_errors": [],
-            "extra_fields": [],
-            "schema_used": json_type
-        }
-        
-        if json_type not in self.expected_schemas:
-            validation_result["is_valid"] = False
-            validation_result["type_errors"].append(f"Unknown JSON type: {json_type}")
-            return validation_result
-        
-        schema = self.expected_schemas[json_type]
-        
+        """Validate JSON data against the precompiled schema, reporting every error at once"""
         try:
-            # Validate using jsonschema
-            jsonschema.validate(json_data, schema)
-            
-        except jsonschema.ValidationError as e:
-            validation_result["is_valid"] = False
-            
-            # Parse validation errors
-            if "required" in str(e):
-                missing_field = str(e).split("'")[1] if "'" in str(e) else "unknown"
-                validation_result["missing_fields"].append(missing_field)
-            else:
-                validation_result["type_errors"].append(str(e))
-        
+            return self.schema_registry.validate(json_data, json_type)
         except Exception as e:
-            validation_result["is_valid"] = False
-            validation_result["type_errors"].append(f"Schema validation error: {str(e)}")
-        
-        return validation_result
+            return {
+                "is_valid": False,
+                "missing_fields": [],
+                "type_errors": [{
+                    "field": "$", "validator": "schema", "expected": None,
+                    "message": f"Schema validation error: {str(e)}"
+                }],
+                "extra_fields": [],
+                "undeclared_fields": [],
+                "error_count": 1,
+                "errors_truncated": False,
+                "schema_used": json_type
+            }
 
     async def _detect_anomalies(self, json_data: Dict[str, Any], json_type: str) -> List[Dict[str, Any]]:
         """Detect anomalies in JSON data"""
@@ -338,6 +342,7 @@ class JSONAgent:
             return result.get("anomalies", [])
             
         except Exception:
+            note_fallback("json:anomalies")
             return []
 
     async def _extract_business_data(self, json_data: Dict[str, Any], json_type: str) -> Dict[str, Any]:
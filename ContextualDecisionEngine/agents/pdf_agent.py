@@ -6,15 +6,37 @@ Processes invoices and policy documents with specific flagging rules
 import os
 import re
 import json
-from typing import Dict, Any, List
-import PyPDF2
-from ContextualDecisionEngine.utils.openai_client import OpenAIClient
+from typing import Dict, Any, List, Optional, Union
+from ContextualDecisionEngine.utils.openai_client import OpenAIClient, note_fallback
+from ContextualDecisionEngine.utils.llm_registry import get_llm_registry
+from ContextualDecisionEngine.utils.pdf_extraction import PDFTextExtractor, get_pdf_extractor
+from ContextualDecisionEngine.utils.normalized_document import NormalizedDocument
+from ContextualDecisionEngine.utils.keyword_lexicon import KeywordLexicon, KeywordHits
 from ContextualDecisionEngine.memory.store import MemoryStore
 
 class PDFAgent:
-    def __init__(self, memory_store: MemoryStore):
+    # full: extract every page up front, lazy: decide from the leading pages and read on only when needed
+    MODES = ("full", "lazy")
+
+    def __init__(
+        self,
+        memory_store: MemoryStore,
+        openai_client: Optional[OpenAIClient] = None,
+        extractor: Optional[PDFTextExtractor] = None,
+        mode: Optional[str] = None
+    ):
         self.memory_store = memory_store
-        self.openai_client = OpenAIClient()
+        self.openai_client = openai_client or OpenAIClient("pdf", get_llm_registry())
+        self.extractor = extractor or get_pdf_extractor()
+        
+        self.mode = mode or os.getenv("PDF_MODE", "full")
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown PDF mode: {self.mode}")
+        
+        # Lazy mode: pages used to pick the document type, and the per-document budget for reading on
+        self.head_pages = int(os.getenv("PDF_HEAD_PAGES", "2"))
+        self.max_pages = int(os.getenv("PDF_MAX_PAGES", "200")) or None
+        self.max_seconds = float(os.getenv("PDF_TIME_BUDGET", "10")) or None
         
         # Compliance keywords to flag
         self.compliance_keywords = {
@@ -24,13 +46,46 @@ class PDFAgent:
             "SOX": ["sarbanes-oxley", "sox", "financial reporting"],
             "PCI": ["pci", "payment card industry", "credit card"]
         }
+        
+        # Document type indicators and policy terms that raise a flag
+        self.document_type_keywords = {
+            "invoice": ["invoice", "bill", "amount due", "total", "line item", "payment terms"],
+            "policy": ["policy", "procedure", "regulation", "compliance", "guidelines", "terms"]
+        }
+        self.policy_flag_terms = ["audit", "violation", "penalty", "non-compliance"]
+        
+        # Every keyword table above is matched in one pass per document
+        self.lexicon = KeywordLexicon(dict(
+            {f"type:{doc_type}": keywords for doc_type, keywords in self.document_type_keywords.items()},
+            policy_flags=self.policy_flag_terms,
+            **{f"compliance:{regulation}": keywords for regulation, keywords in self.compliance_keywords.items()}
+        ))
+
+    async def normalize(self, pdf_path: str) -> NormalizedDocument:
+        """
+        Parse a PDF once into the document shared by the classifier and this agent
+        
+        Full mode extracts every page here; lazy mode only the leading pages, and
+        process() reads on within the budget if the document type needs it.
+        """
+        try:
+            if self.mode == "lazy":
+                document = await NormalizedDocument.from_pdf(self.extractor, pdf_path, self.max_pages, self.max_seconds)
+                await document.read_pages(self.head_pages)
+            else:
+                document = await NormalizedDocument.from_pdf(self.extractor, pdf_path)
+                await document.read_all()
+            return document
+            
+        except Exception as e:
+            raise Exception(f"Failed to extract text from PDF: {str(e)}")
 
-    async def process(self, content: str, classification: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, content: Union[str, NormalizedDocument], classification: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process PDF content and extract structured fields
         
         Args:
-            content: PDF file path (for file uploads) or text content
+            content: Normalized document (for file uploads), PDF file path or text content
             classification: Classification result from classifier agent
             
         Returns:
@@ -38,15 +93,28 @@ class PDFAgent:
         """
         try:
             # Extract text from PDF
-            if content.startswith('/tmp') and content.endswith('.pdf'):
+            document = None
+            if isinstance(content, NormalizedDocument):
+                # Already parsed ahead of classification
+                document = content
+            elif content.startswith('/tmp') and content.endswith('.pdf'):
                 # It's a file path
-                pdf_text = self._extract_text_from_pdf(content)
+                document = await self.normalize(content)
+            
+            if document:
+                pdf_text = document.text
             else:
                 # It's already text content
                 pdf_text = content
             
             # Determine document type
-            doc_type = await self._determine_document_type(pdf_text)
+            keyword_hits = self.lexicon.scan(pdf_text)
+            doc_type = await self._determine_document_type(pdf_text, keyword_hits)
+            
+            # Invoices are settled by their leading pages; other documents need the rest
+            if document and doc_type != "invoice" and not document.complete:
+                pdf_text = await self._read_pages(document)
+                keyword_hits = self.lexicon.scan(pdf_text)
             
             # Extract fields based on document type
             if doc_type == "invoice":
@@ -57,10 +125,10 @@ class PDFAgent:
                 extracted_data = await self._process_general_document(pdf_text)
             
             # Check for flagging conditions
-            flags = self._check_flagging_conditions(extracted_data, pdf_text)
+            flags = self._check_flagging_conditions(extracted_data, pdf_text, keyword_hits)
             
             # Assess compliance requirements
-            compliance_flags = self._check_compliance_flags(pdf_text)
+            compliance_flags = self._check_compliance_flags(pdf_text, keyword_hits)
             
             # Prepare result
             result = {
@@ -72,43 +140,42 @@ class PDFAgent:
                 "text_length": len(pdf_text),
                 "processing_timestamp": self.memory_store.get_current_timestamp()
             }
+            if document:
+                result["document"] = document.describe()
+                if self.mode == "lazy":
+                    result["page_budget"] = document.get_report()
+                    if document.stop_reason == "time_budget":
+                        # How far a time budget gets depends on load, so the result is not repeatable
+                        note_fallback("pdf:time_budget")
             
             # Store in memory
-            self.memory_store.store_agent_result("pdf", result)
+            result["agent_result_id"] = self.memory_store.store_agent_result(
+                "pdf", result, classification.get("classification_id")
+            )
             
             return result
             
         except Exception as e:
             raise Exception(f"PDF processing failed: {str(e)}")
 
-    def _extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text content from PDF file"""
+    async def _read_pages(self, document: NormalizedDocument, count: Optional[int] = None) -> str:
+        """Read further pages of a lazily processed PDF"""
         try:
-            text = ""
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
-            
-            return text.strip()
+            return await document.read_pages(count)
             
         except Exception as e:
             raise Exception(f"Failed to extract text from PDF: {str(e)}")
 
-    async def _determine_document_type(self, text: str) -> str:
+    async def _determine_document_type(self, text: str, keyword_hits: Optional[KeywordHits] = None) -> str:
         """Determine the type of PDF document"""
         
-        text_lower = text.lower()
+        keyword_hits = keyword_hits or self.lexicon.scan(text)
         
         # Check for invoice indicators
-        invoice_keywords = ["invoice", "bill", "amount due", "total", "line item", "payment terms"]
-        invoice_score = sum(1 for keyword in invoice_keywords if keyword in text_lower)
+        invoice_score = len(keyword_hits.found("type:invoice"))
         
         # Check for policy indicators
-        policy_keywords = ["policy", "procedure", "regulation", "compliance", "guidelines", "terms"]
-        policy_score = sum(1 for keyword in policy_keywords if keyword in text_lower)
+        policy_score = len(keyword_hits.found("type:policy"))
         
         if invoice_score > policy_score and invoice_score >= 2:
             return "invoice"
@@ -138,6 +205,7 @@ class PDFAgent:
             return result.get("document_type", "general")
             
         except Exception:
+            note_fallback("pdf:document_type")
             return "general"
 
     async def _process_invoice(self, text: str) -> Dict[str, Any]:
@@ -188,6 +256,7 @@ class PDFAgent:
             
         except Exception:
             # Fallback extraction using regex
+            note_fallback("pdf:invoice")
             return self._fallback_extract_invoice(text)
 
     def _fallback_extract_invoice(self, text: str) -> Dict[str, Any]:
@@ -278,6 +347,7 @@ class PDFAgent:
             
         except Exception:
             # Fallback extraction
+            note_fallback("pdf:policy")
             return {
                 "policy_title": "Policy Document",
                 "effective_date": "Not specified",
@@ -298,7 +368,7 @@ class PDFAgent:
             "document_structure": "General document"
         }
 
-    def _check_flagging_conditions(self, extracted_data: Dict[str, Any], text: str) -> List[Dict[str, Any]]:
+    def _check_flagging_conditions(self, extracted_data: Dict[str, Any], text: str, keyword_hits: Optional[KeywordHits] = None) -> List[Dict[str, Any]]:
         """Check for conditions that require flagging"""
         
         flags = []
@@ -325,38 +395,35 @@ class PDFAgent:
             })
         
         # Flag policy documents with specific mentions
-        text_lower = text.lower()
-        policy_flags = ["audit", "violation", "penalty", "non-compliance"]
-        for flag_term in policy_flags:
-            if flag_term in text_lower:
-                flags.append({
-                    "type": f"policy_{flag_term}",
-                    "severity": "medium",
-                    "description": f"Policy document mentions '{flag_term}'",
-                    "keyword": flag_term
-                })
+        keyword_hits = keyword_hits or self.lexicon.scan(text)
+        for flag_term in keyword_hits.found("policy_flags"):
+            flags.append({
+                "type": f"policy_{flag_term}",
+                "severity": "medium",
+                "description": f"Policy document mentions '{flag_term}'",
+                "keyword": flag_term
+            })
         
         return flags
 
-    def _check_compliance_flags(self, text: str) -> List[Dict[str, Any]]:
+    def _check_compliance_flags(self, text: str, keyword_hits: Optional[KeywordHits] = None) -> List[Dict[str, Any]]:
         """Check for compliance-related keywords and regulations"""
         
         compliance_flags = []
-        text_lower = text.lower()
-        
-        for regulation, keywords in self.compliance_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    # Count occurrences
-                    count = text_lower.count(keyword)
-                    compliance_flags.append({
-                        "regulation": regulation,
-                        "keyword": keyword,
-                        "occurrences": count,
-                        "severity": "high" if regulation in ["GDPR", "FDA"] else "medium",
-                        "description": f"Document mentions {regulation} compliance requirement",
-                        "requires_legal_review": True
-                    })
-                    break  # Only flag once per regulation type
+        keyword_hits = keyword_hits or self.lexicon.scan(text)
+        
+        for regulation in self.compliance_keywords:
+            found = keyword_hits.found(f"compliance:{regulation}")
+            if found:
+                # Only flag once per regulation type, on its first listed keyword present
+                keyword = found[0]
+                compliance_flags.append({
+                    "regulation": regulation,
+                    "keyword": keyword,
+                    "occurrences": keyword_hits.count(keyword),
+                    "severity": "high" if regulation in ["GDPR", "FDA"] else "medium",
+                    "description": f"Document mentions {regulation} compliance requirement",
+                    "requires_legal_review": True
+                })
         
         return compliance_flags
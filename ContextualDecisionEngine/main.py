@@ -4,21 +4,33 @@ FastAPI application that processes Email, JSON, and PDF inputs through specializ
 """
 
 import os
+import time
+import uuid
+import asyncio
 import uvicorn
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-import tempfile
 import json
 from typing import Optional
 
+from ContextualDecisionEngine import agents
 from ContextualDecisionEngine.agents.classifier import ClassifierAgent
 from ContextualDecisionEngine.agents.email_agent import EmailAgent
 from ContextualDecisionEngine.agents.json_agent import JSONAgent
 from ContextualDecisionEngine.agents.pdf_agent import PDFAgent
 from ContextualDecisionEngine.memory.store import MemoryStore
+from ContextualDecisionEngine.memory.result_cache import ResultCache
+from ContextualDecisionEngine.memory.write_queue import WriteQueueFull
 from ContextualDecisionEngine.routers.action_router import ActionRouter
+from ContextualDecisionEngine.routers.outbox_dispatcher import OutboxDispatcher
+from ContextualDecisionEngine.routers.attachment_router import AttachmentRouter
+from ContextualDecisionEngine.utils.openai_client import OpenAIClient, track_fallbacks
+from ContextualDecisionEngine.utils.llm_registry import get_llm_registry
+from ContextualDecisionEngine.utils.upload_spool import spool_upload, UploadTooLarge
+from ContextualDecisionEngine.utils.pdf_extraction import get_pdf_extractor
+from ContextualDecisionEngine.utils.email_parser import parse_email
 
 
 app = FastAPI(
@@ -36,22 +48,84 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Upload limits: files are streamed to disk in chunks, text is held in memory once decoded
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+MAX_TEXT_UPLOAD_BYTES = int(os.getenv("MAX_TEXT_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+# Room for multipart boundaries, part headers and the small form fields
+MULTIPART_OVERHEAD = 64 * 1024
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized /process bodies from Content-Length before any of the body is read"""
+    if request.url.path == "/process":
+        length = request.headers.get("content-length")
+        if length and length.isdigit() and int(length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD:
+            return JSONResponse(
+                status_code=413,
+                content={
+                    "success": False,
+                    "error": f"Upload exceeds the {MAX_UPLOAD_BYTES} byte limit"
+                }
+            )
+    return await call_next(request)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 app.mount("/samples", StaticFiles(directory="samples"), name="samples")
 
 # Initialize components
 memory_store = MemoryStore()
-classifier_agent = ClassifierAgent(memory_store)
-email_agent = EmailAgent(memory_store)
-json_agent = JSONAgent(memory_store)
-pdf_agent = PDFAgent(memory_store)
+llm_registry = get_llm_registry()
+classifier_agent = ClassifierAgent(memory_store, OpenAIClient("classifier", llm_registry))
+email_agent = EmailAgent(
+    memory_store, OpenAIClient("email", llm_registry), sniff_threshold=classifier_agent.sniff_threshold
+)
+json_agent = JSONAgent(memory_store, OpenAIClient("json", llm_registry))
+pdf_agent = PDFAgent(memory_store, OpenAIClient("pdf", llm_registry))
 action_router = ActionRouter(memory_store)
+outbox_dispatcher = OutboxDispatcher(memory_store, action_router)
+
+def result_cache_version() -> str:
+    return (
+        f"{agents.__version__}:{classifier_agent.openai_client.model}:{classifier_agent.mode}"
+        f":sniff={classifier_agent.sniff_threshold}"
+        f":pdf={pdf_agent.mode},{pdf_agent.head_pages},{pdf_agent.max_pages},{pdf_agent.max_seconds}"
+        f":{json_agent.schema_registry.fingerprint}"
+    )
+
+# Content-addressed cache of classification + agent results; the version string invalidates
+# entries whenever prompts, model, classifier mode, sniffer threshold, PDF reading mode and
+# budgets or JSON schemas change
+result_cache = ResultCache(
+    db_path=os.getenv("RESULT_CACHE_DB", "result_cache.db"),
+    version=result_cache_version(),
+    ttl_seconds=float(os.getenv("RESULT_CACHE_TTL", "86400")),
+    max_memory_entries=int(os.getenv("RESULT_CACHE_MEMORY_ENTRIES", "1024")),
+    max_disk_entries=int(os.getenv("RESULT_CACHE_DISK_ENTRIES", "50000"))
+)
+# PDF and JSON attachments of emails are processed as child traces of the email
+attachment_router = AttachmentRouter(
+    memory_store, classifier_agent, pdf_agent, json_agent, action_router, result_cache
+)
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the database on startup"""
     memory_store.init_db()
+    result_cache.init_db()
+    # Also drains rows left over from an earlier run, so it starts even in inline mode
+    outbox_dispatcher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop outbox delivery, then release the shared LLM and action HTTP pools, PDF workers, result cache and database connections"""
+    await outbox_dispatcher.stop()
+    await llm_registry.aclose()
+    await action_router.aclose()
+    get_pdf_extractor().shutdown()
+    result_cache.close()
+    memory_store.close()
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
@@ -69,26 +143,28 @@ async def process_input(
     Process input through the multi-agent system
     Accepts file uploads or text input
     """
+    started = time.perf_counter()
+    spool = None
     try:
         print(f"DEBUG: Received request - file: {file is not None}, text_input length: {len(text_input) if text_input else 0}, input_type: {input_type}")
         if text_input:
             print(f"DEBUG: Text preview: {repr(text_input[:100])}")
         # Determine input content and type
         content = None
+        content_digest = None
         detected_format = None
         
         if file and file.filename:
-            # Handle file upload
-            content = await file.read()
-            if file.content_type == "application/pdf":
-                # For PDF, save temporarily for processing
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                    tmp_file.write(content)
-                    content = tmp_file.name
-                    detected_format = "PDF"
+            # Stream the upload to a spool file in chunks instead of reading it whole
+            spool = await spool_upload(file, MAX_UPLOAD_BYTES, UPLOAD_CHUNK_SIZE)
+            content_digest = spool.digest
+            if spool.is_pdf:
+                # PDFs are processed from the spool file path
+                content = spool.path
+                detected_format = "PDF"
             else:
                 # For text files, decode content
-                content = content.decode('utf-8')
+                content = await asyncio.to_thread(spool.read_text, MAX_TEXT_UPLOAD_BYTES)
                 if file.filename and file.filename.endswith('.json'):
                     detected_format = "JSON"
         elif text_input and text_input.strip():
@@ -104,34 +180,81 @@ async def process_input(
         if len(content_str) < 3:
             raise HTTPException(status_code=400, detail="Input too short")
         
-        # Step 1: Classify the input
-        classification_result = await classifier_agent.classify(content, detected_format)
-        
-        # Step 2: Route to appropriate agent based on classification
-        agent_result = None
-        if classification_result['format'] == 'Email':
-            agent_result = await email_agent.process(content, classification_result)
-        elif classification_result['format'] == 'JSON':
-            agent_result = await json_agent.process(content, classification_result)
-        elif classification_result['format'] == 'PDF':
-            agent_result = await pdf_agent.process(content, classification_result)
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported format: {classification_result['format']}")
-        
-        # Step 3: Trigger follow-up actions based on agent output
-        action_result = await action_router.route_action(agent_result, classification_result)
-        
-        # Step 4: Log the complete trace
-        trace_id = memory_store.log_complete_trace(
-            classification_result, agent_result, action_result
-        )
+        # Every row written for this request commits in one transaction (or one group commit)
+        with memory_store.batch():
+            # Byte-identical payloads reuse the earlier classification and agent result
+            if content_digest:
+                cache_key = result_cache.make_key_from_digest(content_digest, detected_format)
+            else:
+                cache_key = result_cache.make_key(content, detected_format)
+            cached = await result_cache.get(cache_key)
+            email_attachments = None
+            
+            if cached:
+                # Recorded as this request's own rows, so the trace never points at another request's
+                classification_result, agent_result = memory_store.store_cached_result(
+                    cached["classification"], cached["agent_result"]
+                )
+            else:
+                with track_fallbacks() as fallbacks:
+                    # Parse an uploaded PDF once; the classifier and PDFAgent share the document
+                    document = None
+                    if spool and spool.is_pdf:
+                        document = await pdf_agent.normalize(spool.path)
+                    
+                    # Step 1: Classify the input
+                    classification_result = await classifier_agent.classify(
+                        document.text if document else content, detected_format
+                    )
+                    
+                    # Step 2: Route to appropriate agent based on classification
+                    agent_result = None
+                    if classification_result['format'] == 'Email':
+                        agent_result = await email_agent.process(content, classification_result)
+                    elif classification_result['format'] == 'JSON':
+                        agent_result = await json_agent.process(content, classification_result)
+                    elif classification_result['format'] == 'PDF':
+                        agent_result = await pdf_agent.process(document or content, classification_result)
+                    else:
+                        raise HTTPException(status_code=400, detail=f"Unsupported format: {classification_result['format']}")
+                
+                # Decoded attachment parts are handed to the fan-out, never cached or returned
+                email_attachments = agent_result.pop("parsed_attachments", None)
+                
+                # Degraded answers (LLM outage, unparsable response, time-budget cut) are not
+                # cached, so they stop being served as soon as the cause is fixed
+                if fallbacks:
+                    print(f"DEBUG: Result not cached, fallbacks taken: {', '.join(fallbacks)}")
+                else:
+                    await result_cache.put(cache_key, {
+                        "classification": memory_store.without_row_ids(classification_result),
+                        "agent_result": memory_store.without_row_ids(agent_result)
+                    })
+            
+            # Step 3: Trigger follow-up actions based on agent output
+            trace_id = str(uuid.uuid4())
+            action_result = await action_router.route_action(agent_result, classification_result, trace_id)
+            
+            # Step 4: Log the complete trace, linked through the IDs each step returned
+            memory_store.log_complete_trace(
+                classification_result, agent_result, action_result,
+                total_processing_time=time.perf_counter() - started,
+                trace_id=trace_id
+            )
+            
+            # Step 5: Fan attachments out to their agents; their traces commit with the email's
+            attachment_results = []
+            if classification_result['format'] == 'Email' and agent_result.get('attachments'):
+                if email_attachments is None:
+                    # Cache hit: the email was not parsed during this request
+                    email_attachments = parse_email(content, email_agent.sniff_threshold).attachments
+                attachment_results = await attachment_router.fan_out(email_attachments, trace_id)
         
-        # Clean up temporary PDF file if created
-        if detected_format == "PDF" and isinstance(content, str) and content.startswith('/tmp'):
-            try:
-                os.unlink(content)
-            except:
-                pass
+        # Queued actions are committed with the trace; deliver them without holding the response
+        if action_result.get("pending_actions") or any(
+            attachment.get("actions_triggered", {}).get("pending_actions") for attachment in attachment_results
+        ):
+            outbox_dispatcher.notify()
         
         return JSONResponse({
             "success": True,
@@ -139,9 +262,30 @@ async def process_input(
             "classification": classification_result,
             "agent_result": agent_result,
             "actions_triggered": action_result,
+            "attachments": attachment_results,
+            "cache_hit": cached is not None,
             "message": "Input processed successfully through multi-agent system"
         })
         
+    except UploadTooLarge as e:
+        return JSONResponse(
+            status_code=413,
+            content={
+                "success": False,
+                "error": str(e),
+                "message": "Failed to process input through multi-agent system"
+            }
+        )
+    except WriteQueueFull as e:
+        # Group-commit queue is saturated; the client should retry later
+        return JSONResponse(
+            status_code=503,
+            content={
+                "success": False,
+                "error": str(e),
+                "message": "Failed to process input through multi-agent system"
+            }
+        )
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -155,16 +299,49 @@ async def process_input(
                 "message": "Failed to process input through multi-agent system"
             }
         )
+    finally:
+        # Remove the spooled upload, whether or not processing succeeded
+        if spool:
+            spool.cleanup()
 
 @app.get("/memory/traces")
-async def get_traces():
-    """Get all processing traces from memory"""
+async def get_traces(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    format: Optional[str] = None,
+    intent: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+):
+    """
+    Get processing traces from memory, newest first
+    Supports keyset pagination (cursor), field projection (comma-separated fields)
+    and format/intent/date range filters
+    """
     try:
-        traces = memory_store.get_all_traces()
+        page = memory_store.get_traces_page(
+            limit=max(1, min(limit, 500)),
+            cursor=cursor,
+            fields=[field.strip() for field in fields.split(",") if field.strip()] if fields else None,
+            format=format,
+            intent=intent,
+            since=since,
+            until=until
+        )
         return JSONResponse({
             "success": True,
-            "traces": traces
+            "traces": page["traces"],
+            "next_cursor": page["next_cursor"]
         })
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": str(e)
+            }
+        )
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -174,6 +351,22 @@ async def get_traces():
             }
         )
 
+@app.get("/memory/stats")
+async def get_memory_stats():
+    """Get durability mode and write-behind queue counters"""
+    return JSONResponse({
+        "success": True,
+        "stats": memory_store.get_write_stats()
+    })
+
+@app.post("/memory/writes/retry")
+async def retry_failed_writes():
+    """Requeue group-commit batches that failed to commit (group durability only)"""
+    return JSONResponse({
+        "success": True,
+        "requeued": memory_store.retry_failed_writes()
+    })
+
 @app.get("/memory/trace/{trace_id}")
 async def get_trace(trace_id: str):
     """Get specific trace by ID"""
@@ -195,6 +388,117 @@ async def get_trace(trace_id: str):
             }
         )
 
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Get result cache hit/miss counters"""
+    return JSONResponse({
+        "success": True,
+        "stats": result_cache.get_stats()
+    })
+
+@app.get("/actions/stats")
+async def get_action_stats():
+    """Get per-target action delivery counters and outbox state"""
+    return JSONResponse({
+        "success": True,
+        "stats": action_router.get_stats(),
+        "outbox": outbox_dispatcher.get_stats()
+    })
+
+@app.get("/attachments/stats")
+async def get_attachment_stats():
+    """Get attachment fan-out counters and worker limits"""
+    return JSONResponse({
+        "success": True,
+        "stats": attachment_router.get_stats()
+    })
+
+@app.get("/json/schemas")
+async def get_json_schemas():
+    """Get the JSON schemas validation runs against and which were registered at runtime"""
+    return JSONResponse({
+        "success": True,
+        "schemas": json_agent.schema_registry.schemas,
+        "registered": json_agent.schema_registry.runtime,
+        "fingerprint": json_agent.schema_registry.fingerprint
+    })
+
+@app.post("/json/schemas/{name}")
+async def register_json_schema(name: str, request: Request):
+    """Add or replace a JSON schema; the body is the schema itself"""
+    try:
+        schema = await request.json()
+        json_agent.register_schema(name, schema)
+        # Results validated under the previous schema set are no longer served from cache
+        result_cache.version = result_cache_version()
+        return JSONResponse({
+            "success": True,
+            "name": name,
+            "fingerprint": json_agent.schema_registry.fingerprint
+        })
+    except (ValueError, TypeError) as e:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": str(e)
+            }
+        )
+
+@app.get("/actions/rules")
+async def get_action_rules():
+    """Get the loaded action rule file, its version and rule counts per agent"""
+    return JSONResponse({
+        "success": True,
+        "rules": action_router.rule_engine.get_stats()
+    })
+
+@app.post("/actions/rules/reload")
+async def reload_action_rules():
+    """Recompile the action rule file now instead of waiting for the change check"""
+    reloaded = action_router.rule_engine.reload()
+    stats = action_router.rule_engine.get_stats()
+    return JSONResponse(
+        status_code=200 if reloaded else 400,
+        content={
+            "success": reloaded,
+            "rules": stats,
+            "error": stats["last_error"]
+        }
+    )
+
+@app.post("/actions/outbox/{outbox_id}/retry")
+async def retry_dead_action(outbox_id: str):
+    """Requeue a dead-lettered action for delivery"""
+    if not memory_store.requeue_action(outbox_id):
+        raise HTTPException(status_code=404, detail="No dead-lettered action with this ID")
+    
+    outbox_dispatcher.notify()
+    return JSONResponse({
+        "success": True,
+        "requeued": outbox_id
+    })
+
+@app.get("/llm/stats")
+async def get_llm_stats():
+    """Get shared LLM pool usage, rate budget and per-agent accounting"""
+    return JSONResponse({
+        "success": True,
+        "stats": llm_registry.get_stats()
+    })
+
+@app.delete("/llm/memo")
+async def invalidate_llm_memo(key: Optional[str] = None):
+    """Invalidate one memoized completion by key, or all of them"""
+    if not llm_registry.memo:
+        raise HTTPException(status_code=404, detail="Prompt memoization is disabled")
+    
+    await llm_registry.memo.invalidate(key)
+    return JSONResponse({
+        "success": True,
+        "invalidated": key or "all"
+    })
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -237,6 +541,39 @@ async def simulate_compliance_flag(data: dict):
         "message": "Compliance issue flagged"
     }
 
+# Bulk variants: one request carries many actions; results come back in item order
+@app.post("/crm/escalate/bulk")
+async def simulate_crm_escalate_bulk(data: dict):
+    """Simulate bulk CRM escalation endpoint"""
+    return {
+        "success": True,
+        "results": [await simulate_crm_escalate(item.get("payload", {})) for item in data.get("items", [])]
+    }
+
+@app.post("/crm/log/bulk")
+async def simulate_crm_log_bulk(data: dict):
+    """Simulate bulk CRM logging endpoint"""
+    return {
+        "success": True,
+        "results": [await simulate_crm_log(item.get("payload", {})) for item in data.get("items", [])]
+    }
+
+@app.post("/risk_alert/bulk")
+async def simulate_risk_alert_bulk(data: dict):
+    """Simulate bulk risk alert endpoint"""
+    return {
+        "success": True,
+        "results": [await simulate_risk_alert(item.get("payload", {})) for item in data.get("items", [])]
+    }
+
+@app.post("/compliance/flag/bulk")
+async def simulate_compliance_flag_bulk(data: dict):
+    """Simulate bulk compliance flagging endpoint"""
+    return {
+        "success": True,
+        "results": [await simulate_compliance_flag(item.get("payload", {})) for item in data.get("items", [])]
+    }
+
 if __name__ == "__main__":
     # Bind to 0.0.0.0:5000 for external access
     uvicorn.run(app, host="0.0.0.0", port=5000)
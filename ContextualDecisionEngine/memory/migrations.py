@@ -0,0 +1,172 @@
+"""
+Schema Migrations - Ordered, versioned changes to the memory database
+The applied version is tracked in SQLite's user_version pragma
+"""
+
+import sqlite3
+from typing import List, Tuple
+
+# (version, description, statements); append new migrations, never edit applied ones
+MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (1, "Base schema", [
+        # Table for input metadata and classifications
+        '''
+        CREATE TABLE IF NOT EXISTS classifications (
+            id TEXT PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            format TEXT NOT NULL,
+            intent TEXT NOT NULL,
+            content_preview TEXT,
+            confidence_score REAL,
+            metadata TEXT
+        )
+        ''',
+        # Table for agent processing results
+        '''
+        CREATE TABLE IF NOT EXISTS agent_results (
+            id TEXT PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            agent_type TEXT NOT NULL,
+            classification_id TEXT,
+            result_data TEXT NOT NULL,
+            processing_duration REAL,
+            FOREIGN KEY (classification_id) REFERENCES classifications (id)
+        )
+        ''',
+        # Table for action router results
+        '''
+        CREATE TABLE IF NOT EXISTS action_results (
+            id TEXT PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            agent_result_id TEXT,
+            actions_triggered TEXT NOT NULL,
+            success_count INTEGER,
+            failure_count INTEGER,
+            FOREIGN KEY (agent_result_id) REFERENCES agent_results (id)
+        )
+        ''',
+        # Table for complete processing traces
+        '''
+        CREATE TABLE IF NOT EXISTS processing_traces (
+            id TEXT PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            classification_id TEXT,
+            agent_result_id TEXT,
+            action_result_id TEXT,
+            status TEXT NOT NULL,
+            total_processing_time REAL,
+            FOREIGN KEY (classification_id) REFERENCES classifications (id),
+            FOREIGN KEY (agent_result_id) REFERENCES agent_results (id),
+            FOREIGN KEY (action_result_id) REFERENCES action_results (id)
+        )
+        ''',
+        # Table for decision audit logs
+        '''
+        CREATE TABLE IF NOT EXISTS decision_logs (
+            id TEXT PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            component TEXT NOT NULL,
+            decision_type TEXT NOT NULL,
+            decision_data TEXT NOT NULL,
+            reasoning TEXT,
+            trace_id TEXT
+        )
+        '''
+    ]),
+    (2, "Indexes for getter access paths", [
+        # get_all_traces: newest traces first
+        'CREATE INDEX IF NOT EXISTS idx_traces_timestamp ON processing_traces (timestamp)',
+        # get_agent_results: newest first, optionally filtered by agent type
+        'CREATE INDEX IF NOT EXISTS idx_agent_results_timestamp ON agent_results (timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_agent_results_type_timestamp ON agent_results (agent_type, timestamp)',
+        # get_decision_logs: newest first, optionally filtered by component
+        'CREATE INDEX IF NOT EXISTS idx_decision_logs_timestamp ON decision_logs (timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_decision_logs_component_timestamp ON decision_logs (component, timestamp)',
+        # Reverse lookups along the trace foreign keys
+        'CREATE INDEX IF NOT EXISTS idx_agent_results_classification ON agent_results (classification_id)',
+        'CREATE INDEX IF NOT EXISTS idx_action_results_agent_result ON action_results (agent_result_id)',
+        'CREATE INDEX IF NOT EXISTS idx_decision_logs_trace ON decision_logs (trace_id)',
+        'ANALYZE'
+    ]),
+    (3, "Keyset pagination and filters for traces", [
+        # Denormalized so trace listing and filtering never need the classification join
+        'ALTER TABLE processing_traces ADD COLUMN format TEXT',
+        'ALTER TABLE processing_traces ADD COLUMN intent TEXT',
+        '''
+        UPDATE processing_traces SET
+            format = (SELECT c.format FROM classifications c WHERE c.id = processing_traces.classification_id),
+            intent = (SELECT c.intent FROM classifications c WHERE c.id = processing_traces.classification_id)
+        ''',
+        # Keyset order is (timestamp, id) so pages stay stable when timestamps collide
+        'DROP INDEX IF EXISTS idx_traces_timestamp',
+        'CREATE INDEX IF NOT EXISTS idx_traces_timestamp_id ON processing_traces (timestamp, id)',
+        'CREATE INDEX IF NOT EXISTS idx_traces_format_timestamp_id ON processing_traces (format, timestamp, id)',
+        'CREATE INDEX IF NOT EXISTS idx_traces_intent_timestamp_id ON processing_traces (intent, timestamp, id)',
+        'ANALYZE'
+    ]),
+    (4, "Transactional outbox for action delivery", [
+        # One row per outbound action call; the row id doubles as the idempotency key
+        '''
+        CREATE TABLE IF NOT EXISTS action_outbox (
+            id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            trace_id TEXT,
+            action_result_id TEXT,
+            action_index INTEGER NOT NULL,
+            action_type TEXT NOT NULL,
+            depends_on TEXT,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            response TEXT,
+            FOREIGN KEY (action_result_id) REFERENCES action_results (id)
+        )
+        ''',
+        # Dispatcher polling: due pending rows and expired in-flight leases
+        'CREATE INDEX IF NOT EXISTS idx_outbox_status_next_attempt ON action_outbox (status, next_attempt_at)',
+        # Trace detail and dependency ordering within one request's actions
+        'CREATE INDEX IF NOT EXISTS idx_outbox_action_result ON action_outbox (action_result_id, action_index)'
+    ]),
+    (5, "Parent/child traces for email attachments", [
+        # Attachments processed from an email log their own trace pointing at the email's
+        'ALTER TABLE processing_traces ADD COLUMN parent_trace_id TEXT',
+        'CREATE INDEX IF NOT EXISTS idx_traces_parent_timestamp_id ON processing_traces (parent_trace_id, timestamp, id)'
+    ])
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """Apply every migration newer than the database version; returns the resulting version"""
+    current = get_schema_version(conn)
+
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+
+        # Each migration and its version bump commit atomically. BEGIN IMMEDIATE takes the
+        # write lock first, so a worker starting at the same time waits, then re-reads the
+        # version and skips what the other one already applied
+        conn.commit()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            current = get_schema_version(conn)
+            if version <= current:
+                conn.commit()
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Migration {version} ({description}) failed: {str(e)}")
+        current = version
+
+    return current
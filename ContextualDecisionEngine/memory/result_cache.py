@@ -0,0 +1,215 @@
+"""
+Result Cache - Content-addressed cache for classification and agent results
+Keeps an in-memory LRU tier in front of a persistent SQLite tier, both with TTL and size limits
+"""
+
+import sqlite3
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Union
+
+class ResultCache:
+    def __init__(
+        self,
+        db_path: str = "result_cache.db",
+        version: str = "",
+        ttl_seconds: float = 86400,
+        max_memory_entries: int = 1024,
+        max_disk_entries: int = 50000
+    ):
+        self.db_path = db_path
+        self.version = version
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        # lock guards the memory tier and counters; db_lock serializes the one SQLite
+        # connection, which is only used from worker threads so lookups never block the loop
+        self.lock = threading.Lock()
+        self.db_lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+
+        # key -> (stored_at, serialized value); serialized so callers never share mutable results
+        self.memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self.puts_since_eviction = 0
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "puts": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+    def init_db(self):
+        """Open the persistent tier's connection and create its table"""
+        with self.db_lock:
+            if self.conn is None:
+                self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+                self.conn.execute('PRAGMA journal_mode=WAL')
+                self.conn.execute('PRAGMA synchronous=NORMAL')
+            cursor = self.conn.cursor()
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    key TEXT PRIMARY KEY,
+                    stored_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    value TEXT NOT NULL
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_result_cache_last_access ON result_cache (last_access)')
+
+            self.conn.commit()
+
+    def close(self):
+        """Close the persistent tier's connection"""
+        with self.db_lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def make_key(self, content: Union[str, bytes], detected_format: Optional[str] = None) -> str:
+        """Hash the raw payload together with the pipeline version"""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return self.make_key_from_digest(hashlib.sha256(content).hexdigest(), detected_format)
+
+    def make_key_from_digest(self, content_digest: str, detected_format: Optional[str] = None) -> str:
+        """Key for a payload whose SHA-256 was computed while streaming it"""
+        digest = hashlib.sha256()
+        digest.update(self.version.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update((detected_format or "").encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(content_digest.encode("ascii"))
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached result, promoting disk hits into memory"""
+        now = time.time()
+
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry:
+                stored_at, serialized = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self.memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return json.loads(serialized)
+                del self.memory[key]
+                self.stats["expirations"] += 1
+
+        row, expired = await asyncio.to_thread(self._disk_get, key, now)
+
+        with self.lock:
+            if row:
+                self._remember(key, row[0], row[1])
+                self.stats["disk_hits"] += 1
+                return json.loads(row[1])
+            if expired:
+                self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return None
+
+    async def put(self, key: str, value: Dict[str, Any]):
+        """Store a result in both tiers"""
+        now = time.time()
+        serialized = json.dumps(value)
+
+        with self.lock:
+            self._remember(key, now, serialized)
+            self.stats["puts"] += 1
+            # Trim the disk tier periodically rather than counting rows on every write
+            self.puts_since_eviction += 1
+            evict = self.puts_since_eviction >= 100
+            if evict:
+                self.puts_since_eviction = 0
+
+        expired, evicted = await asyncio.to_thread(self._disk_put, key, now, serialized, evict)
+        if evict:
+            with self.lock:
+                self.stats["expirations"] += expired
+                self.stats["evictions"] += evicted
+
+    async def clear(self):
+        """Drop every cached result"""
+        with self.lock:
+            self.memory.clear()
+        await asyncio.to_thread(self._disk_clear)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        with self.lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return dict(
+                self.stats,
+                hit_rate=round(hits / lookups, 4) if lookups else 0.0,
+                memory_entries=len(self.memory),
+                max_memory_entries=self.max_memory_entries,
+                max_disk_entries=self.max_disk_entries,
+                ttl_seconds=self.ttl_seconds,
+                version=self.version
+            )
+
+    def _remember(self, key: str, stored_at: float, serialized: str):
+        self.memory[key] = (stored_at, serialized)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float):
+        """Fetch a live disk row and touch it; returns (row or None, whether an expired row was dropped)"""
+        with self.db_lock:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT stored_at, value FROM result_cache WHERE key = ?', (key,))
+            row = cursor.fetchone()
+
+            if row and now - row[0] <= self.ttl_seconds:
+                cursor.execute('UPDATE result_cache SET last_access = ? WHERE key = ?', (now, key))
+                self.conn.commit()
+                return row, False
+
+            if row:
+                cursor.execute('DELETE FROM result_cache WHERE key = ?', (key,))
+                self.conn.commit()
+                return None, True
+            return None, False
+
+    def _disk_put(self, key: str, now: float, serialized: str, evict: bool):
+        """Write one disk row, trimming the tier when asked; returns (expired, evicted) row counts"""
+        with self.db_lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO result_cache (key, stored_at, last_access, value)
+                VALUES (?, ?, ?, ?)
+            ''', (key, now, now, serialized))
+            expired = evicted = 0
+            if evict:
+                expired, evicted = self._evict_disk(cursor, now)
+            self.conn.commit()
+            return expired, evicted
+
+    def _disk_clear(self):
+        with self.db_lock:
+            self.conn.execute('DELETE FROM result_cache')
+            self.conn.commit()
+
+    def _evict_disk(self, cursor: sqlite3.Cursor, now: float):
+        cursor.execute('DELETE FROM result_cache WHERE stored_at < ?', (now - self.ttl_seconds,))
+        expired = cursor.rowcount
+
+        cursor.execute('SELECT COUNT(*) FROM result_cache')
+        overflow = max(cursor.fetchone()[0] - self.max_disk_entries, 0)
+        if overflow > 0:
+            cursor.execute('''
+                DELETE FROM result_cache WHERE key IN (
+                    SELECT key FROM result_cache ORDER BY last_access ASC LIMIT ?
+                )
+            ''', (overflow,))
+        return expired, overflow
@@ -6,91 +6,161 @@ Stores input metadata, extracted fields, chained actions, and agent decision tra
 import sqlite3
 import json
 import uuid
+import base64
+import os
+import time
+import queue
+import contextvars
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import threading
+from ContextualDecisionEngine.memory.write_queue import WriteBehindQueue
+from ContextualDecisionEngine.memory.migrations import apply_migrations
+
+# Statements collected by the active MemoryStore.batch() of the current request
+_current_batch: contextvars.ContextVar = contextvars.ContextVar("memory_store_batch", default=None)
 
 class MemoryStore:
-    def __init__(self, db_path: str = "agent_memory.db"):
+    DURABILITY_MODES = ("strict", "group")
+
+    def __init__(self, db_path: str = "agent_memory.db", read_pool_size: int = 8, durability: Optional[str] = None):
         self.db_path = db_path
+        
+        # strict: every request (or lone write) commits before returning
+        # group: writes are handed to a write-behind queue and group-committed
+        self.durability = durability or os.getenv("MEMORY_DURABILITY", "strict")
+        if self.durability not in self.DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {self.durability}")
+        
+        # Single long-lived writer connection serialized by the lock; readers
+        # borrow pooled connections and never wait on the writer (WAL mode)
         self.lock = threading.Lock()
+        self.writer: Optional[sqlite3.Connection] = None
+        self.read_pool_size = read_pool_size
+        self.read_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        
+        self.write_queue: Optional[WriteBehindQueue] = None
+        if self.durability == "group":
+            self.write_queue = WriteBehindQueue(
+                self._execute_statements,
+                max_queue_size=int(os.getenv("MEMORY_WRITE_QUEUE_SIZE", "10000")),
+                flush_window=float(os.getenv("MEMORY_FLUSH_WINDOW", "0.05"))
+            )
 
-    def init_db(self):
-        """Initialize the database schema"""
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with WAL journaling and tuned pragmas"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA cache_size=-16000')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA busy_timeout=30000')
+        return conn
+
+    @contextmanager
+    def _write_connection(self):
+        """Yield the shared writer connection and commit (or roll back) afterwards"""
         with self.lock:
-            conn = sqlite3.connect(self.db_path)
+            if self.writer is None:
+                self.writer = self._connect()
+            try:
+                yield self.writer
+                self.writer.commit()
+            except Exception:
+                self.writer.rollback()
+                raise
+
+    @contextmanager
+    def _read_connection(self):
+        """Borrow a pooled reader connection"""
+        try:
+            conn = self.read_pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if self.read_pool.qsize() < self.read_pool_size:
+                self.read_pool.put(conn)
+            else:
+                conn.close()
+
+    def _execute_statements(self, statements: List[Tuple[str, tuple]]):
+        """Run statements in one transaction"""
+        with self._write_connection() as conn:
             cursor = conn.cursor()
-            
-            # Table for input metadata and classifications
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS classifications (
-                    id TEXT PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    format TEXT NOT NULL,
-                    intent TEXT NOT NULL,
-                    content_preview TEXT,
-                    confidence_score REAL,
-                    metadata TEXT
-                )
-            ''')
-            
-            # Table for agent processing results
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS agent_results (
-                    id TEXT PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    agent_type TEXT NOT NULL,
-                    classification_id TEXT,
-                    result_data TEXT NOT NULL,
-                    processing_duration REAL,
-                    FOREIGN KEY (classification_id) REFERENCES classifications (id)
-                )
-            ''')
-            
-            # Table for action router results
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS action_results (
-                    id TEXT PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    agent_result_id TEXT,
-                    actions_triggered TEXT NOT NULL,
-                    success_count INTEGER,
-                    failure_count INTEGER,
-                    FOREIGN KEY (agent_result_id) REFERENCES agent_results (id)
-                )
-            ''')
-            
-            # Table for complete processing traces
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS processing_traces (
-                    id TEXT PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    classification_id TEXT,
-                    agent_result_id TEXT,
-                    action_result_id TEXT,
-                    status TEXT NOT NULL,
-                    total_processing_time REAL,
-                    FOREIGN KEY (classification_id) REFERENCES classifications (id),
-                    FOREIGN KEY (agent_result_id) REFERENCES agent_results (id),
-                    FOREIGN KEY (action_result_id) REFERENCES action_results (id)
-                )
-            ''')
-            
-            # Table for decision audit logs
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS decision_logs (
-                    id TEXT PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    component TEXT NOT NULL,
-                    decision_type TEXT NOT NULL,
-                    decision_data TEXT NOT NULL,
-                    reasoning TEXT,
-                    trace_id TEXT
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
+            for sql, params in statements:
+                cursor.execute(sql, params)
+
+    def _write(self, sql: str, params: tuple):
+        """Write one row: join the active batch, queue it, or commit it right away"""
+        batch = _current_batch.get()
+        if batch is not None:
+            batch.append((sql, params))
+        elif self.write_queue:
+            self.write_queue.submit([(sql, params)])
+        else:
+            self._execute_statements([(sql, params)])
+
+    @contextmanager
+    def batch(self):
+        """
+        Group every write made inside the block into a single transaction
+        
+        In strict mode the transaction commits when the block exits; in group
+        mode it is queued and may share a commit with other requests. A block
+        that raises writes nothing, so a failed request leaves no partial rows.
+        """
+        statements: List[Tuple[str, tuple]] = []
+        token = _current_batch.set(statements)
+        try:
+            yield
+        finally:
+            _current_batch.reset(token)
+        if statements:
+            if self.write_queue:
+                self.write_queue.submit(statements)
+            else:
+                self._execute_statements(statements)
+
+    def flush(self):
+        """Wait until queued writes are committed (no-op in strict mode)"""
+        if self.write_queue:
+            self.write_queue.flush()
+
+    def retry_failed_writes(self) -> int:
+        """Requeue write-behind batches that failed to commit; returns how many were requeued"""
+        if not self.write_queue:
+            return 0
+        return self.write_queue.retry_dead_letters()
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Durability mode and write-behind queue counters"""
+        return {
+            "durability": self.durability,
+            "write_queue": self.write_queue.get_stats() if self.write_queue else None
+        }
+
+    def close(self):
+        """Flush queued writes, then close the writer and every pooled reader connection"""
+        if self.write_queue:
+            self.write_queue.close()
+            self.write_queue = None
+        with self.lock:
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+        while True:
+            try:
+                self.read_pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def init_db(self):
+        """Initialize the database schema, applying any pending migrations"""
+        with self._write_connection() as conn:
+            apply_migrations(conn)
 
     def get_current_timestamp(self) -> str:
         """Get current timestamp in ISO format"""
@@ -98,158 +168,305 @@ class MemoryStore:
 
     def store_classification(self, classification_data: Dict[str, Any]) -> str:
         """Store classification result and return ID"""
-        with self.lock:
-            classification_id = str(uuid.uuid4())
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO classifications 
-                (id, timestamp, format, intent, content_preview, confidence_score, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                classification_id,
-                self.get_current_timestamp(),
-                classification_data.get('format', 'Unknown'),
-                classification_data.get('intent', 'Unknown'),
-                classification_data.get('content_preview', ''),
-                classification_data.get('confidence_score', 0.0),
-                json.dumps(classification_data)
-            ))
-            
-            conn.commit()
-            conn.close()
-            
-            return classification_id
+        classification_id = str(uuid.uuid4())
+        self._write('''
+            INSERT INTO classifications 
+            (id, timestamp, format, intent, content_preview, confidence_score, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            classification_id,
+            self.get_current_timestamp(),
+            classification_data.get('format', 'Unknown'),
+            classification_data.get('intent', 'Unknown'),
+            classification_data.get('content_preview', ''),
+            classification_data.get('confidence_score', 0.0),
+            json.dumps(classification_data)
+        ))
+        
+        return classification_id
 
     def store_agent_result(self, agent_type: str, result_data: Dict[str, Any], classification_id: str = None) -> str:
         """Store agent processing result and return ID"""
-        with self.lock:
-            result_id = str(uuid.uuid4())
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO agent_results 
-                (id, timestamp, agent_type, classification_id, result_data, processing_duration)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                result_id,
-                self.get_current_timestamp(),
-                agent_type,
-                classification_id,
-                json.dumps(result_data),
-                result_data.get('processing_duration', 0.0)
-            ))
-            
-            conn.commit()
-            conn.close()
-            
-            return result_id
+        result_id = str(uuid.uuid4())
+        self._write('''
+            INSERT INTO agent_results 
+            (id, timestamp, agent_type, classification_id, result_data, processing_duration)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            result_id,
+            self.get_current_timestamp(),
+            agent_type,
+            classification_id,
+            json.dumps(result_data),
+            result_data.get('processing_duration', 0.0)
+        ))
+        
+        return result_id
+
+    @staticmethod
+    def without_row_ids(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a classification or agent result without the row IDs it was stored under"""
+        return {key: value for key, value in result.items() if key not in ('classification_id', 'agent_result_id')}
+
+    def store_cached_result(self, classification: Dict[str, Any], agent_result: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Store a result served from the result cache as fresh rows of the current request
+        
+        Both rows are marked cache_hit so they can be told apart from ones the agents produced.
+        Returns copies of the inputs carrying the new row IDs.
+        """
+        classification = self.without_row_ids(classification)
+        agent_result = self.without_row_ids(agent_result)
+        classification['classification_id'] = self.store_classification(dict(classification, cache_hit=True))
+        agent_result['agent_result_id'] = self.store_agent_result(
+            str(classification.get('format', 'Unknown')).lower(),
+            dict(agent_result, cache_hit=True),
+            classification['classification_id']
+        )
+        return classification, agent_result
 
     def store_action_result(self, action_data: Dict[str, Any], agent_result_id: str = None) -> str:
         """Store action router result and return ID"""
-        with self.lock:
-            action_id = str(uuid.uuid4())
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            actions_triggered = action_data.get('actions_triggered', [])
-            success_count = sum(1 for action in actions_triggered if action.get('success', False))
-            failure_count = len(actions_triggered) - success_count
-            
-            cursor.execute('''
-                INSERT INTO action_results 
-                (id, timestamp, agent_result_id, actions_triggered, success_count, failure_count)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                action_id,
-                self.get_current_timestamp(),
-                agent_result_id,
-                json.dumps(actions_triggered),
-                success_count,
-                failure_count
-            ))
-            
-            conn.commit()
-            conn.close()
-            
-            return action_id
+        action_id = str(uuid.uuid4())
+        
+        actions_triggered = action_data.get('actions_triggered', [])
+        success_count = sum(1 for action in actions_triggered if action.get('success', False))
+        # Actions still queued in the outbox are counted once the dispatcher settles them
+        failure_count = sum(
+            1 for action in actions_triggered
+            if not action.get('success', False) and action.get('status') != 'pending'
+        )
+        
+        self._write('''
+            INSERT INTO action_results 
+            (id, timestamp, agent_result_id, actions_triggered, success_count, failure_count)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            action_id,
+            self.get_current_timestamp(),
+            agent_result_id,
+            json.dumps(actions_triggered),
+            success_count,
+            failure_count
+        ))
+        
+        return action_id
 
-    def log_complete_trace(self, classification: Dict[str, Any], agent_result: Dict[str, Any], action_result: Dict[str, Any]) -> str:
-        """Log complete processing trace"""
-        with self.lock:
-            trace_id = str(uuid.uuid4())
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get the latest IDs (in a real implementation, these would be passed)
-            cursor.execute('SELECT id FROM classifications ORDER BY timestamp DESC LIMIT 1')
-            classification_id = cursor.fetchone()
-            classification_id = classification_id[0] if classification_id else None
-            
-            cursor.execute('SELECT id FROM agent_results ORDER BY timestamp DESC LIMIT 1')
-            agent_result_id = cursor.fetchone()
-            agent_result_id = agent_result_id[0] if agent_result_id else None
-            
-            cursor.execute('SELECT id FROM action_results ORDER BY timestamp DESC LIMIT 1')
-            action_result_id = cursor.fetchone()
-            action_result_id = action_result_id[0] if action_result_id else None
-            
-            cursor.execute('''
-                INSERT INTO processing_traces 
-                (id, timestamp, classification_id, agent_result_id, action_result_id, status, total_processing_time)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                trace_id,
-                self.get_current_timestamp(),
-                classification_id,
-                agent_result_id,
-                action_result_id,
-                'completed',
-                0.0  # Would calculate actual processing time
-            ))
-            
-            conn.commit()
-            conn.close()
-            
-            return trace_id
+    def log_complete_trace(
+        self,
+        classification: Dict[str, Any],
+        agent_result: Dict[str, Any],
+        action_result: Dict[str, Any],
+        total_processing_time: float = 0.0,
+        trace_id: Optional[str] = None,
+        status: str = 'completed',
+        parent_trace_id: Optional[str] = None
+    ) -> str:
+        """
+        Log complete processing trace, linking the rows whose IDs the pipeline passed along
+        
+        parent_trace_id links the trace of an email attachment to the email's own trace.
+        """
+        trace_id = trace_id or str(uuid.uuid4())
+        
+        self._write('''
+            INSERT INTO processing_traces 
+            (id, timestamp, classification_id, agent_result_id, action_result_id, status, total_processing_time, format, intent, parent_trace_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            trace_id,
+            self.get_current_timestamp(),
+            classification.get('classification_id'),
+            agent_result.get('agent_result_id'),
+            action_result.get('action_result_id'),
+            status,
+            total_processing_time,
+            classification.get('format'),
+            classification.get('intent'),
+            parent_trace_id
+        ))
+        
+        return trace_id
 
     def log_decision(self, component: str, decision_type: str, decision_data: Dict[str, Any], reasoning: str = "", trace_id: str = None) -> str:
         """Log agent decision for audit purposes"""
-        with self.lock:
-            decision_id = str(uuid.uuid4())
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO decision_logs 
-                (id, timestamp, component, decision_type, decision_data, reasoning, trace_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+        decision_id = str(uuid.uuid4())
+        self._write('''
+            INSERT INTO decision_logs 
+            (id, timestamp, component, decision_type, decision_data, reasoning, trace_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            decision_id,
+            self.get_current_timestamp(),
+            component,
+            decision_type,
+            json.dumps(decision_data),
+            reasoning,
+            trace_id
+        ))
+        
+        return decision_id
+
+    def enqueue_actions(self, trace_id: Optional[str], action_result_id: str, entries: List[Dict[str, Any]]):
+        """
+        Add outbound action calls to the outbox
+        
+        Inside a request batch the rows commit atomically with the trace. Each entry
+        carries outbox_id, action_index, action_type, payload and optional depends_on.
+        """
+        timestamp = self.get_current_timestamp()
+        now = time.time()
+        for entry in entries:
+            self._write('''
+                INSERT INTO action_outbox
+                (id, created_at, updated_at, trace_id, action_result_id, action_index, action_type, depends_on, payload, status, attempts, next_attempt_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending', 0, ?)
             ''', (
-                decision_id,
-                self.get_current_timestamp(),
-                component,
-                decision_type,
-                json.dumps(decision_data),
-                reasoning,
-                trace_id
+                entry['outbox_id'],
+                timestamp,
+                timestamp,
+                trace_id,
+                action_result_id,
+                entry['action_index'],
+                entry['action_type'],
+                json.dumps(entry.get('depends_on', [])),
+                json.dumps(entry['payload']),
+                now
             ))
-            
-            conn.commit()
-            conn.close()
-            
-            return decision_id
+
+    def claim_due_actions(self, limit: int = 20, lease_seconds: float = 60.0) -> List[Dict[str, Any]]:
+        """
+        Lease outbox rows that are due for delivery
+        
+        Due pending rows and in-flight rows whose lease expired (a dispatcher died
+        mid-delivery) are eligible, except rows still waiting on an undelivered earlier
+        action of the same request they depend on. Dispatcher state changes commit
+        immediately, whatever the durability mode, so the next poll sees them.
+        """
+        now = time.time()
+        timestamp = self.get_current_timestamp()
+        with self._write_connection() as conn:
+            # Take the write lock before reading so other processes cannot claim the same rows
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute('''
+                SELECT o.id, o.trace_id, o.action_result_id, o.action_type, o.payload, o.attempts
+                FROM action_outbox o
+                WHERE o.status IN ('pending', 'in_flight') AND o.next_attempt_at <= ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM action_outbox p
+                      WHERE p.action_result_id = o.action_result_id
+                        AND p.action_index < o.action_index
+                        AND p.status IN ('pending', 'in_flight')
+                        AND p.action_type IN (SELECT value FROM json_each(o.depends_on))
+                  )
+                LIMIT ?
+            ''', (now, limit)).fetchall()
+            conn.executemany('''
+                UPDATE action_outbox
+                SET status = 'in_flight', attempts = attempts + 1, next_attempt_at = ?, updated_at = ?
+                WHERE id = ?
+            ''', [(now + lease_seconds, timestamp, row[0]) for row in rows])
+        
+        return [{
+            'outbox_id': row[0],
+            'trace_id': row[1],
+            'action_result_id': row[2],
+            'action_type': row[3],
+            'payload': json.loads(row[4]),
+            'attempts': row[5] + 1
+        } for row in rows]
+
+    def complete_action(self, outbox_id: str, response: Dict[str, Any]):
+        """Mark a leased outbox row delivered and count it as a successful action"""
+        with self._write_connection() as conn:
+            cursor = conn.execute('''
+                UPDATE action_outbox SET status = 'delivered', response = ?, last_error = NULL, updated_at = ?
+                WHERE id = ? AND status = 'in_flight'
+            ''', (json.dumps(response), self.get_current_timestamp(), outbox_id))
+            if cursor.rowcount:
+                conn.execute('''
+                    UPDATE action_results SET success_count = success_count + 1
+                    WHERE id = (SELECT action_result_id FROM action_outbox WHERE id = ?)
+                ''', (outbox_id,))
+
+    def fail_action(self, outbox_id: str, error: str, retry_at: Optional[float] = None, refund_attempt: bool = False):
+        """
+        Schedule a retry of a failed delivery, or dead-letter it when retry_at is None
+        
+        refund_attempt gives back the attempt taken by the claim, for calls that never
+        reached the target (e.g. an open circuit breaker).
+        """
+        with self._write_connection() as conn:
+            if retry_at is not None:
+                conn.execute('''
+                    UPDATE action_outbox
+                    SET status = 'pending', attempts = attempts - ?, next_attempt_at = ?, last_error = ?, updated_at = ?
+                    WHERE id = ? AND status = 'in_flight'
+                ''', (1 if refund_attempt else 0, retry_at, error, self.get_current_timestamp(), outbox_id))
+                return
+            
+            cursor = conn.execute('''
+                UPDATE action_outbox SET status = 'dead', last_error = ?, updated_at = ?
+                WHERE id = ? AND status = 'in_flight'
+            ''', (error, self.get_current_timestamp(), outbox_id))
+            if cursor.rowcount:
+                conn.execute('''
+                    UPDATE action_results SET failure_count = failure_count + 1
+                    WHERE id = (SELECT action_result_id FROM action_outbox WHERE id = ?)
+                ''', (outbox_id,))
+
+    def requeue_action(self, outbox_id: str) -> bool:
+        """Move a dead-lettered row back to pending with a fresh attempt budget"""
+        with self._write_connection() as conn:
+            cursor = conn.execute('''
+                UPDATE action_outbox SET status = 'pending', attempts = 0, next_attempt_at = ?, updated_at = ?
+                WHERE id = ? AND status = 'dead'
+            ''', (time.time(), self.get_current_timestamp(), outbox_id))
+            if not cursor.rowcount:
+                return False
+            conn.execute('''
+                UPDATE action_results SET failure_count = failure_count - 1
+                WHERE id = (SELECT action_result_id FROM action_outbox WHERE id = ?)
+            ''', (outbox_id,))
+            return True
+
+    def get_action_deliveries(self, action_result_id: str) -> List[Dict[str, Any]]:
+        """Get the outbox state of every action queued for one action result"""
+        with self._read_connection() as conn:
+            return self._select_deliveries(conn.cursor(), action_result_id)
+
+    @staticmethod
+    def _select_deliveries(cursor: sqlite3.Cursor, action_result_id: str) -> List[Dict[str, Any]]:
+        cursor.execute('''
+            SELECT id, action_type, status, attempts, last_error, response, updated_at
+            FROM action_outbox
+            WHERE action_result_id = ?
+            ORDER BY action_index
+        ''', (action_result_id,))
+        
+        return [{
+            'outbox_id': row[0],
+            'action_type': row[1],
+            'status': row[2],
+            'attempts': row[3],
+            'last_error': row[4],
+            'response': json.loads(row[5]) if row[5] else None,
+            'updated_at': row[6]
+        } for row in cursor.fetchall()]
+
+    def get_outbox_stats(self) -> Dict[str, int]:
+        """Count outbox rows by delivery status"""
+        with self._read_connection() as conn:
+            rows = conn.execute('SELECT status, COUNT(*) FROM action_outbox GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
 
     def get_classification(self, classification_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve classification by ID"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self._read_connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute('SELECT * FROM classifications WHERE id = ?', (classification_id,))
             row = cursor.fetchone()
-            conn.close()
             
             if row:
                 return {
@@ -265,8 +482,7 @@ class MemoryStore:
 
     def get_agent_results(self, agent_type: str = None, limit: int = 100) -> List[Dict[str, Any]]:
         """Retrieve agent results, optionally filtered by agent type"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self._read_connection() as conn:
             cursor = conn.cursor()
             
             if agent_type:
@@ -284,7 +500,6 @@ class MemoryStore:
                 ''', (limit,))
             
             rows = cursor.fetchall()
-            conn.close()
             
             results = []
             for row in rows:
@@ -299,58 +514,130 @@ class MemoryStore:
             
             return results
 
+    # Trace list projections: field -> (section, key, SQL expression, joined table alias, is JSON)
+    TRACE_FIELDS = {
+        'status': (None, 'status', 't.status', None, False),
+        'total_processing_time': (None, 'total_processing_time', 't.total_processing_time', None, False),
+        'parent_trace_id': (None, 'parent_trace_id', 't.parent_trace_id', None, False),
+        'format': ('classification', 'format', 't.format', None, False),
+        'intent': ('classification', 'intent', 't.intent', None, False),
+        'content_preview': ('classification', 'content_preview', 'c.content_preview', 'c', False),
+        'agent_type': ('agent_result', 'agent_type', 'a.agent_type', 'a', False),
+        'result_data': ('agent_result', 'result_data', 'a.result_data', 'a', True),
+        'actions_triggered': ('action_result', 'actions_triggered', 'ac.actions_triggered', 'ac', True),
+        'success_count': ('action_result', 'success_count', 'ac.success_count', 'ac', False),
+        'failure_count': ('action_result', 'failure_count', 'ac.failure_count', 'ac', False)
+    }
+
+    TRACE_JOINS = {
+        'c': 'LEFT JOIN classifications c ON t.classification_id = c.id',
+        'a': 'LEFT JOIN agent_results a ON t.agent_result_id = a.id',
+        'ac': 'LEFT JOIN action_results ac ON t.action_result_id = ac.id'
+    }
+
     def get_all_traces(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get all processing traces with joined data"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT 
-                    t.id, t.timestamp, t.status, t.total_processing_time,
-                    c.format, c.intent, c.content_preview,
-                    a.agent_type, a.result_data,
-                    ac.actions_triggered, ac.success_count, ac.failure_count
-                FROM processing_traces t
-                LEFT JOIN classifications c ON t.classification_id = c.id
-                LEFT JOIN agent_results a ON t.agent_result_id = a.id  
-                LEFT JOIN action_results ac ON t.action_result_id = ac.id
-                ORDER BY t.timestamp DESC
-                LIMIT ?
-            ''', (limit,))
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
-            traces = []
-            for row in rows:
-                traces.append({
-                    'trace_id': row[0],
-                    'timestamp': row[1],
-                    'status': row[2],
-                    'total_processing_time': row[3],
-                    'classification': {
-                        'format': row[4],
-                        'intent': row[5],
-                        'content_preview': row[6]
-                    },
-                    'agent_result': {
-                        'agent_type': row[7],
-                        'result_data': json.loads(row[8]) if row[8] else {}
-                    },
-                    'action_result': {
-                        'actions_triggered': json.loads(row[9]) if row[9] else [],
-                        'success_count': row[10],
-                        'failure_count': row[11]
-                    }
-                })
-            
-            return traces
+        return self.get_traces_page(limit=limit)['traces']
+
+    def get_traces_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        format: Optional[str] = None,
+        intent: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of traces, newest first, using keyset pagination
+        
+        Args:
+            limit: Maximum traces per page
+            cursor: Opaque cursor from the previous page's next_cursor
+            fields: Fields to return (see TRACE_FIELDS); all when omitted. Tables
+                and JSON columns not needed by the projection are never touched
+            format, intent: Exact-match filters
+            since, until: Inclusive ISO timestamp range
+            
+        Returns:
+            Dictionary with the traces and the cursor for the next page (None at the end)
+        """
+        if fields is None:
+            fields = list(self.TRACE_FIELDS)
+        unknown = [field for field in fields if field not in self.TRACE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown trace fields: {', '.join(unknown)}")
+        
+        projection = [self.TRACE_FIELDS[field] for field in fields]
+        joins = [self.TRACE_JOINS[alias] for alias in self.TRACE_JOINS if any(p[3] == alias for p in projection)]
+        
+        conditions, params = [], []
+        if cursor:
+            cursor_timestamp, cursor_id = self._decode_cursor(cursor)
+            conditions.append('(t.timestamp, t.id) < (?, ?)')
+            params.extend([cursor_timestamp, cursor_id])
+        if format:
+            conditions.append('t.format = ?')
+            params.append(format)
+        if intent:
+            conditions.append('t.intent = ?')
+            params.append(intent)
+        if since:
+            conditions.append('t.timestamp >= ?')
+            params.append(since)
+        if until:
+            conditions.append('t.timestamp <= ?')
+            params.append(until)
+        
+        sql = f'''
+            SELECT t.id, t.timestamp{''.join(', ' + p[2] for p in projection)}
+            FROM processing_traces t
+            {' '.join(joins)}
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            ORDER BY t.timestamp DESC, t.id DESC
+            LIMIT ?
+        '''
+        params.append(limit)
+        
+        with self._read_connection() as conn:
+            cursor_obj = conn.cursor()
+            cursor_obj.execute(sql, params)
+            rows = cursor_obj.fetchall()
+        
+        traces = []
+        for row in rows:
+            trace = {'trace_id': row[0], 'timestamp': row[1]}
+            for (section, key, _, _, is_json), value in zip(projection, row[2:]):
+                if is_json:
+                    value = json.loads(value) if value else ([] if key == 'actions_triggered' else {})
+                if section:
+                    trace.setdefault(section, {})[key] = value
+                else:
+                    trace[key] = value
+            traces.append(trace)
+        
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = self._encode_cursor(rows[-1][1], rows[-1][0])
+        
+        return {'traces': traces, 'next_cursor': next_cursor}
+
+    @staticmethod
+    def _encode_cursor(timestamp: str, trace_id: str) -> str:
+        return base64.urlsafe_b64encode(json.dumps([timestamp, trace_id]).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, str]:
+        try:
+            timestamp, trace_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return timestamp, trace_id
+        except Exception:
+            raise ValueError("Invalid trace cursor")
 
     def get_trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
         """Get specific trace by ID"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self._read_connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -358,7 +645,8 @@ class MemoryStore:
                     t.id, t.timestamp, t.status, t.total_processing_time,
                     c.format, c.intent, c.content_preview, c.metadata,
                     a.agent_type, a.result_data,
-                    ac.actions_triggered, ac.success_count, ac.failure_count
+                    ac.actions_triggered, ac.success_count, ac.failure_count,
+                    t.action_result_id, t.parent_trace_id
                 FROM processing_traces t
                 LEFT JOIN classifications c ON t.classification_id = c.id
                 LEFT JOIN agent_results a ON t.agent_result_id = a.id  
@@ -367,7 +655,6 @@ class MemoryStore:
             ''', (trace_id,))
             
             row = cursor.fetchone()
-            conn.close()
             
             if row:
                 return {
@@ -375,6 +662,8 @@ class MemoryStore:
                     'timestamp': row[1],
                     'status': row[2],
                     'total_processing_time': row[3],
+                    'parent_trace_id': row[14],
+                    'child_traces': self._select_child_traces(cursor, row[0]),
                     'classification': {
                         'format': row[4],
                         'intent': row[5],
@@ -388,15 +677,40 @@ class MemoryStore:
                     'action_result': {
                         'actions_triggered': json.loads(row[10]) if row[10] else [],
                         'success_count': row[11],
-                        'failure_count': row[12]
+                        'failure_count': row[12],
+                        'deliveries': self._select_deliveries(cursor, row[13]) if row[13] else []
                     }
                 }
             return None
 
+    def get_child_traces(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Get the attachment traces logged under an email's trace, oldest first"""
+        with self._read_connection() as conn:
+            return self._select_child_traces(conn.cursor(), trace_id)
+
+    @staticmethod
+    def _select_child_traces(cursor: sqlite3.Cursor, trace_id: str) -> List[Dict[str, Any]]:
+        cursor.execute('''
+            SELECT id, timestamp, status, total_processing_time, format, intent
+            FROM processing_traces
+            WHERE parent_trace_id = ?
+            ORDER BY timestamp, id
+        ''', (trace_id,))
+        return [
+            {
+                'trace_id': row[0],
+                'timestamp': row[1],
+                'status': row[2],
+                'total_processing_time': row[3],
+                'format': row[4],
+                'intent': row[5]
+            }
+            for row in cursor.fetchall()
+        ]
+
     def get_decision_logs(self, component: str = None, limit: int = 100) -> List[Dict[str, Any]]:
         """Get decision audit logs"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self._read_connection() as conn:
             cursor = conn.cursor()
             
             if component:
@@ -414,7 +728,6 @@ class MemoryStore:
                 ''', (limit,))
             
             rows = cursor.fetchall()
-            conn.close()
             
             logs = []
             for row in rows:
@@ -0,0 +1,179 @@
+"""
+Write-Behind Queue - Background group commit for MemoryStore writes
+Coalesces queued statement batches into one transaction per time/size window
+"""
+
+import time
+import queue
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Statement = Tuple[str, tuple]
+
+
+class WriteQueueFull(Exception):
+    """Raised when the queue has no room; on the event loop this happens at once instead of blocking"""
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        execute_batch: Callable[[List[Statement]], None],
+        max_queue_size: int = 10000,
+        flush_window: float = 0.05,
+        max_batch_statements: int = 500,
+        put_timeout: float = 5.0,
+        max_dead_letters: int = 1000
+    ):
+        # execute_batch runs a list of statements inside a single transaction
+        self.execute_batch = execute_batch
+        self.flush_window = flush_window
+        self.max_batch_statements = max_batch_statements
+        self.put_timeout = put_timeout
+
+        # Bounded queue: once it is full, worker threads block (back-pressure) and
+        # event loop callers are refused right away
+        self.queue: "queue.Queue[List[Statement]]" = queue.Queue(maxsize=max_queue_size)
+        self.stopping = threading.Event()
+        self.stats = {"submitted": 0, "transactions": 0, "statements": 0, "errors": 0, "rejected": 0, "group_retries": 0}
+
+        # Request batches that failed even in their own transaction, kept for inspection and retry
+        self.dead_letters: "deque[Dict[str, Any]]" = deque(maxlen=max_dead_letters)
+        self.last_error: Optional[str] = None
+
+        self.thread = threading.Thread(target=self._run, name="memory-write-behind", daemon=True)
+        self.thread.start()
+
+    def submit(self, statements: List[Statement]):
+        """
+        Queue statements that must commit together
+
+        Off the event loop this waits up to put_timeout for room. On the event loop it
+        never waits, since that would stall every request; a full queue raises
+        WriteQueueFull at once, which the API reports as 503.
+        """
+        if self.stopping.is_set():
+            raise Exception("Write-behind queue is closed")
+        try:
+            asyncio.get_running_loop()
+            on_event_loop = True
+        except RuntimeError:
+            on_event_loop = False
+        try:
+            if on_event_loop:
+                self.queue.put_nowait(statements)
+            else:
+                self.queue.put(statements, timeout=self.put_timeout)
+        except queue.Full:
+            self.stats["rejected"] += 1
+            raise WriteQueueFull("Write-behind queue is full")
+        self.stats["submitted"] += 1
+
+    def flush(self):
+        """Block until everything queued so far has been committed"""
+        self.queue.join()
+
+    def close(self):
+        """Flush pending writes and stop the background thread"""
+        self.stopping.set()
+        self.flush()
+        self.queue.put([])  # Wake the thread so it notices the stop flag
+        self.thread.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.stats,
+            queued=self.queue.qsize(),
+            flush_window=self.flush_window,
+            dead_letters=len(self.dead_letters),
+            last_error=self.last_error
+        )
+
+    def retry_dead_letters(self) -> int:
+        """Queue every dead-lettered batch again, e.g. once the database problem is fixed"""
+        retried = 0
+        while self.dead_letters:
+            entry = self.dead_letters.popleft()
+            try:
+                self.submit(entry["statements"])
+            except WriteQueueFull:
+                self.dead_letters.appendleft(entry)
+                break
+            retried += 1
+        return retried
+
+    def _commit_groups(self, groups: List[List[Statement]]):
+        """
+        Commit the gathered request batches in one transaction
+
+        If that fails, each batch is retried in its own transaction so one bad batch cannot
+        discard the others; batches that still fail are dead-lettered and reported.
+        """
+        statements = [statement for group in groups for statement in group]
+        if not statements:
+            return
+        try:
+            self.execute_batch(statements)
+            self.stats["transactions"] += 1
+            self.stats["statements"] += len(statements)
+            return
+        except Exception as e:
+            if len(groups) == 1:
+                self._dead_letter(groups[0], e)
+                return
+            self.stats["group_retries"] += 1
+            print(f"ERROR: Write-behind group commit of {len(groups)} batches failed, retrying each - {str(e)}")
+
+        for group in groups:
+            if not group:
+                continue
+            try:
+                self.execute_batch(group)
+                self.stats["transactions"] += 1
+                self.stats["statements"] += len(group)
+            except Exception as e:
+                self._dead_letter(group, e)
+
+    def _dead_letter(self, group: List[Statement], error: Exception):
+        self.stats["errors"] += 1
+        self.last_error = str(error)
+        self.dead_letters.append({"failed_at": time.time(), "error": str(error), "statements": group})
+        print(f"ERROR: Write-behind batch of {len(group)} statements failed and was dead-lettered - {str(error)}")
+
+    def _run(self):
+        while True:
+            first = self.queue.get()
+            if not first and self.stopping.is_set():
+                self.queue.task_done()
+                return
+
+            groups = [first]
+            statement_count = len(first)
+            deadline = time.monotonic() + self.flush_window
+            stop_seen = False
+
+            # Gather further batches until the window closes or the transaction is large enough
+            while statement_count < self.max_batch_statements:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    group = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                groups.append(group)
+                if not group:
+                    stop_seen = True  # Close sentinel
+                    break
+                statement_count += len(group)
+
+            try:
+                self._commit_groups(groups)
+            finally:
+                for _ in groups:
+                    self.queue.task_done()
+
+            if stop_seen:
+                return
@@ -0,0 +1,89 @@
+"""
+Action Batcher - Coalesces same-target action calls into bulk requests
+Calls queued for one endpoint within a short window (or up to a size cap) go out as a
+single POST to the endpoint's /bulk variant; each caller still gets its own result
+"""
+
+import os
+import asyncio
+from typing import Dict, Any, List, Optional, Set, Tuple
+from ContextualDecisionEngine.routers.http_transport import ActionTransport
+from ContextualDecisionEngine.routers.circuit_breaker import CircuitOpenError
+
+PendingCall = Tuple[Any, Optional[str], asyncio.Future]
+
+
+class ActionBatcher:
+    def __init__(self, transport: ActionTransport, window: Optional[float] = None, max_batch_size: Optional[int] = None):
+        self.transport = transport
+        self.window = window if window is not None else float(os.getenv("ACTION_BATCH_WINDOW", "0.02"))
+        self.max_batch_size = max_batch_size or int(os.getenv("ACTION_BATCH_MAX_SIZE", "50"))
+
+        self.pending: Dict[str, List[PendingCall]] = {}
+        self.timers: Dict[str, asyncio.TimerHandle] = {}
+        self.sending: Set[asyncio.Task] = set()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    async def submit(self, url: str, payload: Any, idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """Queue one call for the endpoint and wait for its share of the bulk response"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        calls = self.pending.setdefault(url, [])
+        calls.append((payload, idempotency_key, future))
+
+        if len(calls) >= self.max_batch_size:
+            self._flush(url)
+        elif len(calls) == 1:
+            # The first call of a batch opens its window
+            self.timers[url] = loop.call_later(self.window, self._flush, url)
+
+        return await future
+
+    def _flush(self, url: str):
+        timer = self.timers.pop(url, None)
+        if timer:
+            timer.cancel()
+        calls = self.pending.pop(url, [])
+        if calls:
+            task = asyncio.create_task(self._send(url, calls))
+            self.sending.add(task)
+            task.add_done_callback(self.sending.discard)
+
+    async def _send(self, url: str, calls: List[PendingCall]):
+        stats = self.stats.setdefault(url, {"batches": 0, "calls": 0, "largest_batch": 0})
+        stats["batches"] += 1
+        stats["calls"] += len(calls)
+        stats["largest_batch"] = max(stats["largest_batch"], len(calls))
+
+        body = {"items": [{"idempotency_key": key, "payload": payload} for payload, key, _ in calls]}
+        try:
+            response = await self.transport.post_json(f"{url}/bulk", body)
+            results = response.get("results", [])
+            if len(results) != len(calls):
+                raise Exception(f"Bulk response has {len(results)} results for {len(calls)} calls")
+        except CircuitOpenError as e:
+            results = [{"success": False, "error": str(e), "circuit_open": True, "retry_after": e.retry_after}] * len(calls)
+        except Exception as e:
+            results = [{"success": False, "error": str(e)}] * len(calls)
+
+        # Results come back in item order, so each caller gets the one for its own call
+        for (_, _, future), result in zip(calls, results):
+            if not future.done():
+                future.set_result(dict(result, batch_size=len(calls)))
+
+    async def aclose(self):
+        """Send everything still waiting for its window and wait for in-flight batches"""
+        for url in list(self.pending):
+            self._flush(url)
+        if self.sending:
+            await asyncio.gather(*self.sending, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "max_batch_size": self.max_batch_size,
+            "targets": {
+                url: dict(stats, average_batch=round(stats["calls"] / stats["batches"], 2) if stats["batches"] else 0.0)
+                for url, stats in self.stats.items()
+            }
+        }
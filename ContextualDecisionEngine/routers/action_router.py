@@ -3,69 +3,119 @@ Action Router - Triggers follow-up actions based on agent outputs
 Routes to CRM, risk alerts, compliance flags via simulated REST calls
 """
 
+import os
 import json
-import requests
-from typing import Dict, Any, List
+import uuid
+import asyncio
+from typing import Dict, Any, List, Optional
 from ContextualDecisionEngine.memory.store import MemoryStore
+from ContextualDecisionEngine.routers.http_transport import ActionTransport
+from ContextualDecisionEngine.routers.circuit_breaker import CircuitOpenError
+from ContextualDecisionEngine.routers.action_batcher import ActionBatcher
+from ContextualDecisionEngine.routers.rule_engine import RuleEngine
 
 class ActionRouter:
-    def __init__(self, memory_store: MemoryStore):
+    DELIVERY_MODES = ("outbox", "inline")
+    
+    # Action types delivered over HTTP, by endpoint path
+    ACTION_ENDPOINTS = {
+        "crm_escalate": "/crm/escalate",
+        "crm_log": "/crm/log",
+        "risk_alert": "/risk_alert",
+        "compliance_flag": "/compliance/flag"
+    }
+    
+    def __init__(self, memory_store: MemoryStore, transport: Optional[ActionTransport] = None, delivery: Optional[str] = None, batch_window: Optional[float] = None, rule_engine: Optional[RuleEngine] = None):
         self.memory_store = memory_store
         
         # Base URL for API calls (assuming same host for simulation)
-        self.base_url = "http://localhost:5000"
+        self.base_url = os.getenv("ACTION_BASE_URL", "http://localhost:5000")
         
-        # Action mapping rules
-        self.action_rules = {
-            "email": {
-                "escalate_immediate": ["crm_escalate", "risk_alert"],
-                "escalate_standard": ["crm_escalate"],
-                "prioritize": ["crm_log"],
-                "log_and_acknowledge": ["crm_log"],
-                "standard_response": ["crm_log"]
-            },
-            "json": {
-                "high_risk": ["risk_alert", "compliance_flag"],
-                "medium_risk": ["risk_alert"],
-                "low_risk": ["log_only"]
-            },
-            "pdf": {
-                "high_value_invoice": ["compliance_flag", "approval_required"],
-                "compliance_required": ["compliance_flag", "legal_review"],
-                "standard_processing": ["log_only"]
-            }
-        }
+        # Async pooled HTTP so in-flight actions never block the event loop
+        self.transport = transport or ActionTransport()
+        
+        # Same-target calls within ACTION_BATCH_WINDOW share one bulk request (0 disables batching)
+        self.batcher = ActionBatcher(self.transport, window=batch_window)
+        if self.batcher.window <= 0:
+            self.batcher = None
+        
+        # Upper bound on actions of one request dispatched at the same time
+        self.max_parallel = int(os.getenv("ACTION_MAX_PARALLEL", "4"))
+        
+        # outbox: HTTP actions are queued with the trace and delivered in the background
+        # inline: HTTP actions are called before route_action returns
+        self.delivery = delivery or os.getenv("ACTION_DELIVERY", "outbox")
+        if self.delivery not in self.DELIVERY_MODES:
+            raise ValueError(f"Unknown action delivery mode: {self.delivery}")
+        
+        # Declarative routing rules, compiled once and hot-reloaded when the file changes
+        self.rule_engine = rule_engine or RuleEngine()
 
-    async def route_action(self, agent_result: Dict[str, Any], classification: Dict[str, Any]) -> Dict[str, Any]:
+    async def route_action(self, agent_result: Dict[str, Any], classification: Dict[str, Any], trace_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Route and trigger follow-up actions based on agent processing results
         
         Args:
             agent_result: Result from specialized agent processing
             classification: Original classification from classifier agent
+            trace_id: ID of the processing trace the actions belong to (optional)
             
         Returns:
-            Dictionary with triggered actions and their results
+            Dictionary with triggered actions and their results; in outbox mode HTTP
+            actions are reported as pending with the outbox_id they will be delivered under
         """
         try:
             # Determine actions to trigger based on agent type and results
             actions_to_trigger = self._determine_actions(agent_result, classification)
             
-            # Execute each action
-            action_results = []
-            for action in actions_to_trigger:
-                result = await self._execute_action(action, agent_result, classification)
-                action_results.append(result)
+            outbox_entries = []
+            if self.delivery == "outbox":
+                # HTTP actions go to the outbox; local ones still complete right away
+                local_actions = [a for a in actions_to_trigger if a.get("action_type") not in self.ACTION_ENDPOINTS]
+                local_results = iter(await self._execute_actions(local_actions, agent_result, classification))
+                action_results = []
+                for index, action in enumerate(actions_to_trigger):
+                    if action.get("action_type") not in self.ACTION_ENDPOINTS:
+                        action_results.append(next(local_results))
+                        continue
+                    entry = {
+                        "outbox_id": str(uuid.uuid4()),
+                        "action_index": index,
+                        "action_type": action["action_type"],
+                        "depends_on": action.get("depends_on", []),
+                        "payload": self._build_payload(action, agent_result, classification)
+                    }
+                    outbox_entries.append(entry)
+                    action_results.append({
+                        "action_type": action["action_type"],
+                        "success": False,
+                        "status": "pending",
+                        "outbox_id": entry["outbox_id"]
+                    })
+            else:
+                # Execute independent actions concurrently; results keep the trigger order
+                action_results = await self._execute_actions(actions_to_trigger, agent_result, classification)
             
             # Aggregate results
+            pending = sum(1 for r in action_results if r.get("status") == "pending")
+            successful = sum(1 for r in action_results if r.get("success", False))
             action_summary = {
                 "actions_triggered": action_results,
                 "total_actions": len(action_results),
-                "successful_actions": sum(1 for r in action_results if r.get("success", False)),
-                "failed_actions": sum(1 for r in action_results if not r.get("success", False)),
+                "successful_actions": successful,
+                "failed_actions": len(action_results) - successful - pending,
+                "pending_actions": pending,
                 "routing_timestamp": self.memory_store.get_current_timestamp()
             }
             
+            action_summary["action_result_id"] = self.memory_store.store_action_result(
+                action_summary, agent_result.get("agent_result_id")
+            )
+            
+            # Same batch as the trace, so queued actions and the trace commit together
+            if outbox_entries:
+                self.memory_store.enqueue_actions(trace_id, action_summary["action_result_id"], outbox_entries)
+            
             # Log decision
             self.memory_store.log_decision(
                 component="action_router",
@@ -75,7 +125,8 @@ class ActionRouter:
                     "classification": classification,
                     "actions_determined": [a["action_type"] for a in actions_to_trigger]
                 },
-                reasoning=f"Determined {len(actions_to_trigger)} actions based on agent results"
+                reasoning=f"Determined {len(actions_to_trigger)} actions based on agent results",
+                trace_id=trace_id
             )
             
             return action_summary
@@ -85,183 +136,55 @@ class ActionRouter:
 
     def _determine_actions(self, agent_result: Dict[str, Any], classification: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Determine which actions to trigger based on agent results"""
-        
-        actions = []
-        agent_type = agent_result.get("agent_type", "").lower()
-        
-        if agent_type == "email":
-            actions.extend(self._determine_email_actions(agent_result))
-        elif agent_type == "json":
-            actions.extend(self._determine_json_actions(agent_result))
-        elif agent_type == "pdf":
-            actions.extend(self._determine_pdf_actions(agent_result))
-        
-        return actions
-
-    def _determine_email_actions(self, agent_result: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Determine actions for email processing results"""
-        
-        actions = []
-        recommended_action = agent_result.get("recommended_action", "standard_response")
-        tone = agent_result.get("tone_analysis", {}).get("tone", "neutral")
-        urgency = agent_result.get("urgency_level", "medium")
-        
-        if recommended_action == "escalate_immediate":
-            actions.append({
-                "action_type": "crm_escalate",
-                "priority": "high",
-                "data": {
-                    "urgency": urgency,
-                    "tone": tone,
-                    "sender": agent_result.get("extracted_fields", {}).get("sender", "unknown"),
-                    "issue_type": agent_result.get("extracted_fields", {}).get("issue_type", "general")
-                }
-            })
-            
-        elif recommended_action == "escalate_standard":
-            actions.append({
-                "action_type": "crm_escalate",
-                "priority": "medium",
-                "data": {
-                    "urgency": urgency,
-                    "tone": tone,
-                    "sender": agent_result.get("extracted_fields", {}).get("sender", "unknown")
-                }
-            })
-            
-        else:
-            actions.append({
-                "action_type": "crm_log",
-                "priority": "low",
-                "data": {
-                    "action_taken": recommended_action,
-                    "sender": agent_result.get("extracted_fields", {}).get("sender", "unknown")
-                }
-            })
-        
-        return actions
+        return self.rule_engine.evaluate(agent_result)
 
-    def _determine_json_actions(self, agent_result: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Determine actions for JSON processing results"""
-        
-        actions = []
-        risk_level = agent_result.get("risk_level", "low")
-        anomalies = agent_result.get("anomalies", [])
-        
-        if risk_level == "high":
-            actions.append({
-                "action_type": "risk_alert",
-                "priority": "high",
-                "data": {
-                    "risk_level": risk_level,
-                    "anomaly_count": len(anomalies),
-                    "anomalies": anomalies[:3],  # Top 3 anomalies
-                    "json_type": agent_result.get("json_type", "unknown")
-                }
-            })
-            
-        elif risk_level == "medium":
-            actions.append({
-                "action_type": "risk_alert",
-                "priority": "medium", 
-                "data": {
-                    "risk_level": risk_level,
-                    "anomaly_count": len(anomalies),
-                    "json_type": agent_result.get("json_type", "unknown")
-                }
-            })
-        
-        # Check for compliance issues
-        if anomalies:
-            compliance_anomalies = [a for a in anomalies if a.get("severity") == "high"]
-            if compliance_anomalies:
-                actions.append({
-                    "action_type": "compliance_flag",
-                    "priority": "high",
-                    "data": {
-                        "compliance_issues": compliance_anomalies,
-                        "json_type": agent_result.get("json_type", "unknown")
-                    }
-                })
-        
-        return actions
-
-    def _determine_pdf_actions(self, agent_result: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Determine actions for PDF processing results"""
-        
-        actions = []
-        flags = agent_result.get("flags", [])
-        compliance_flags = agent_result.get("compliance_flags", [])
-        extracted_data = agent_result.get("extracted_data", {})
-        
-        # Check for high-value invoice flag
-        high_value_flags = [f for f in flags if f.get("type") == "high_value_invoice"]
-        if high_value_flags:
-            actions.append({
-                "action_type": "compliance_flag",
-                "priority": "high",
-                "data": {
-                    "flag_type": "high_value_invoice",
-                    "amount": high_value_flags[0].get("amount", 0),
-                    "requires_approval": True
-                }
-            })
-        
-        # Check for compliance requirements
-        if compliance_flags:
-            for comp_flag in compliance_flags:
-                if comp_flag.get("requires_legal_review"):
-                    actions.append({
-                        "action_type": "compliance_flag",
-                        "priority": "high",
-                        "data": {
-                            "regulation": comp_flag.get("regulation"),
-                            "keyword": comp_flag.get("keyword"),
-                            "requires_legal_review": True
-                        }
-                    })
-        
-        # Standard processing action
-        if not actions:
-            actions.append({
-                "action_type": "log_only",
-                "priority": "low",
-                "data": {
-                    "document_type": agent_result.get("document_type", "unknown"),
-                    "processing_status": "completed"
-                }
-            })
+    async def _execute_actions(self, actions: List[Dict[str, Any]], agent_result: Dict[str, Any], classification: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Fan out actions with bounded concurrency
         
-        return actions
+        An action may list action types in "depends_on"; it then starts only after every
+        earlier action of those types has finished. Only earlier actions count, so
+        dependencies can never form a cycle.
+        """
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        
+        async def run(action: Dict[str, Any], prerequisites: List[asyncio.Task]) -> Dict[str, Any]:
+            if prerequisites:
+                await asyncio.wait(prerequisites)
+            # Take a slot only once runnable so waiting actions never starve the ones they wait on
+            async with semaphore:
+                return await self._execute_action(action, agent_result, classification)
+        
+        tasks = []
+        for index, action in enumerate(actions):
+            depends_on = set(action.get("depends_on", []))
+            prerequisites = [tasks[i] for i in range(index) if actions[i].get("action_type") in depends_on]
+            tasks.append(asyncio.create_task(run(action, prerequisites)))
+        
+        return list(await asyncio.gather(*tasks))
 
-    async def _execute_action(self, action: Dict[str, Any], agent_result: Dict[str, Any], classification: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a specific action via API call"""
-        
-        action_type = action.get("action_type")
-        priority = action.get("priority", "medium")
-        data = action.get("data", {})
-        
-        # Prepare payload for API call
-        payload = {
-            "priority": priority,
+    def _build_payload(self, action: Dict[str, Any], agent_result: Dict[str, Any], classification: Dict[str, Any]) -> Dict[str, Any]:
+        """Prepare the API payload for an action"""
+        return {
+            "priority": action.get("priority", "medium"),
             "timestamp": self.memory_store.get_current_timestamp(),
             "source_agent": agent_result.get("agent_type"),
             "classification": {
                 "format": classification.get("format"),
                 "intent": classification.get("intent")
             },
-            "action_data": data
+            "action_data": action.get("data", {})
         }
+
+    async def _execute_action(self, action: Dict[str, Any], agent_result: Dict[str, Any], classification: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a specific action via API call"""
+        
+        action_type = action.get("action_type")
+        payload = self._build_payload(action, agent_result, classification)
         
         try:
-            if action_type == "crm_escalate":
-                response = await self._call_crm_escalate(payload)
-            elif action_type == "crm_log":
-                response = await self._call_crm_log(payload)
-            elif action_type == "risk_alert":
-                response = await self._call_risk_alert(payload)
-            elif action_type == "compliance_flag":
-                response = await self._call_compliance_flag(payload)
+            if action_type in self.ACTION_ENDPOINTS:
+                response = await self.call_endpoint(action_type, payload)
             elif action_type == "log_only":
                 response = {"success": True, "message": "Logged for audit purposes"}
             else:
@@ -282,54 +205,29 @@ class ActionRouter:
                 "execution_timestamp": self.memory_store.get_current_timestamp()
             }
 
-    async def _call_crm_escalate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Call CRM escalation endpoint"""
+    async def call_endpoint(self, action_type: str, payload: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """Call the endpoint behind an action type; failures come back as an unsuccessful response"""
+        url = f"{self.base_url}{self.ACTION_ENDPOINTS[action_type]}"
+        if self.batcher:
+            return await self.batcher.submit(url, payload, idempotency_key)
+        
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
         try:
-            response = requests.post(
-                f"{self.base_url}/crm/escalate",
-                json=payload,
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
+            return await self.transport.post_json(url, payload, headers=headers)
+        except CircuitOpenError as e:
+            return {"success": False, "error": str(e), "circuit_open": True, "retry_after": e.retry_after}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    async def _call_crm_log(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Call CRM logging endpoint"""
-        try:
-            response = requests.post(
-                f"{self.base_url}/crm/log",
-                json=payload,
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+    def get_stats(self) -> Dict[str, Any]:
+        """Transport counters plus bulk batching counters"""
+        return dict(
+            self.transport.get_stats(),
+            batching=self.batcher.get_stats() if self.batcher else None
+        )
 
-    async def _call_risk_alert(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Call risk alert endpoint"""
-        try:
-            response = requests.post(
-                f"{self.base_url}/risk_alert",
-                json=payload,
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return {"success": False, "error": str(e)}
-
-    async def _call_compliance_flag(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Call compliance flagging endpoint"""
-        try:
-            response = requests.post(
-                f"{self.base_url}/compliance/flag",
-                json=payload,
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+    async def aclose(self):
+        """Send queued batches, then close the HTTP pools"""
+        if self.batcher:
+            await self.batcher.aclose()
+        await self.transport.aclose()
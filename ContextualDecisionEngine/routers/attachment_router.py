@@ -0,0 +1,241 @@
+"""
+Attachment Router - Fans email attachments out to the PDF and JSON agents
+Each supported attachment is classified, processed, routed to actions and logged as a
+child trace of the email; a process-wide worker limit plus a per-email limit keep one
+email with many attachments from starving the attachments of other requests
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import hashlib
+import tempfile
+from typing import Dict, Any, List, Optional
+from ContextualDecisionEngine.memory.store import MemoryStore
+from ContextualDecisionEngine.memory.result_cache import ResultCache
+from ContextualDecisionEngine.agents.classifier import ClassifierAgent
+from ContextualDecisionEngine.agents.pdf_agent import PDFAgent
+from ContextualDecisionEngine.agents.json_agent import JSONAgent
+from ContextualDecisionEngine.routers.action_router import ActionRouter
+from ContextualDecisionEngine.utils.openai_client import track_fallbacks
+
+
+class AttachmentRouter:
+    # Formats an attachment can be routed to, by content type and by file extension
+    CONTENT_TYPES = {
+        "application/pdf": "PDF",
+        "application/json": "JSON",
+        "text/json": "JSON"
+    }
+    EXTENSIONS = {
+        ".pdf": "PDF",
+        ".json": "JSON"
+    }
+
+    def __init__(
+        self,
+        memory_store: MemoryStore,
+        classifier_agent: ClassifierAgent,
+        pdf_agent: PDFAgent,
+        json_agent: JSONAgent,
+        action_router: ActionRouter,
+        result_cache: Optional[ResultCache] = None,
+        max_workers: Optional[int] = None,
+        max_per_email: Optional[int] = None,
+        max_attachments: Optional[int] = None
+    ):
+        self.memory_store = memory_store
+        self.classifier_agent = classifier_agent
+        self.pdf_agent = pdf_agent
+        self.json_agent = json_agent
+        self.action_router = action_router
+        self.result_cache = result_cache
+
+        # Attachments processed at the same time across all requests
+        self.max_workers = max_workers or int(os.getenv("ATTACHMENT_WORKERS", "4"))
+        # Share of those workers one email may hold, so other emails still get a turn
+        self.max_per_email = max_per_email or int(os.getenv("ATTACHMENT_MAX_PER_EMAIL", "2"))
+        # Attachments past this count are reported as skipped instead of processed
+        self.max_attachments = max_attachments or int(os.getenv("ATTACHMENT_MAX_COUNT", "50"))
+        self.workers = asyncio.Semaphore(self.max_workers)
+
+        self.stats = {"emails": 0, "processed": 0, "failed": 0, "skipped": 0, "active": 0, "peak_active": 0}
+
+    def attachment_format(self, attachment: Dict[str, Any]) -> Optional[str]:
+        """PDF or JSON by declared content type, then extension, then the PDF magic bytes"""
+        content_type = attachment["content_type"].lower()
+        if content_type in self.CONTENT_TYPES:
+            return self.CONTENT_TYPES[content_type]
+        if content_type.endswith("+json"):
+            return "JSON"
+        extension = os.path.splitext(attachment["filename"].lower())[1]
+        if extension in self.EXTENSIONS:
+            return self.EXTENSIONS[extension]
+        if attachment["payload"].startswith(b"%PDF-"):
+            return "PDF"
+        return None
+
+    async def fan_out(self, attachments: List[Dict[str, Any]], parent_trace_id: str) -> List[Dict[str, Any]]:
+        """
+        Process every supported attachment of an email concurrently
+
+        Args:
+            attachments: Decoded attachment parts of the parsed email (see utils.email_parser)
+            parent_trace_id: Trace of the email; each attachment trace links to it
+
+        Returns:
+            One summary per attachment, in message order: its child trace_id, format,
+            status and the actions it triggered, or why it was skipped or failed
+        """
+        if not attachments:
+            return []
+        self.stats["emails"] += 1
+
+        # Created per call, so the cap applies to this email only
+        email_slots = asyncio.Semaphore(self.max_per_email)
+        tasks = []
+        for index, attachment in enumerate(attachments):
+            summary = {
+                "filename": attachment["filename"],
+                "content_type": attachment["content_type"],
+                "size": attachment["size"]
+            }
+            attachment_format = self.attachment_format(attachment)
+            if attachment_format is None:
+                tasks.append(self._skipped(summary, "unsupported attachment type"))
+            elif index >= self.max_attachments:
+                tasks.append(self._skipped(summary, f"more than {self.max_attachments} attachments"))
+            else:
+                tasks.append(self._process_attachment(
+                    attachment, attachment_format, summary, parent_trace_id, email_slots
+                ))
+        return await asyncio.gather(*tasks)
+
+    async def _skipped(self, summary: Dict[str, Any], reason: str) -> Dict[str, Any]:
+        self.stats["skipped"] += 1
+        return dict(summary, status="skipped", reason=reason)
+
+    async def _process_attachment(
+        self,
+        attachment: Dict[str, Any],
+        attachment_format: str,
+        summary: Dict[str, Any],
+        parent_trace_id: str,
+        email_slots: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        # The per-email slot comes first: waiting on it never holds a shared worker
+        async with email_slots:
+            async with self.workers:
+                self.stats["active"] += 1
+                self.stats["peak_active"] = max(self.stats["peak_active"], self.stats["active"])
+                try:
+                    return await self._run_pipeline(attachment, attachment_format, summary, parent_trace_id)
+                finally:
+                    self.stats["active"] -= 1
+
+    async def _run_pipeline(
+        self,
+        attachment: Dict[str, Any],
+        attachment_format: str,
+        summary: Dict[str, Any],
+        parent_trace_id: str
+    ) -> Dict[str, Any]:
+        """Classify, process, route and log one attachment as a child trace"""
+        started = time.perf_counter()
+        trace_id = str(uuid.uuid4())
+        try:
+            cache_key = None
+            cached = None
+            if self.result_cache:
+                digest = hashlib.sha256(attachment["payload"]).hexdigest()
+                cache_key = self.result_cache.make_key_from_digest(digest, attachment_format)
+                cached = await self.result_cache.get(cache_key)
+
+            fallbacks = []
+            if cached:
+                classification_result, agent_result = self.memory_store.store_cached_result(
+                    cached["classification"], cached["agent_result"]
+                )
+            else:
+                with track_fallbacks() as fallbacks:
+                    if attachment_format == "PDF":
+                        classification_result, agent_result = await self._process_pdf(attachment["payload"])
+                    else:
+                        classification_result, agent_result = await self._process_json(attachment["payload"])
+
+            # Degraded answers are not cached, as for top-level inputs
+            if cache_key and not cached and not fallbacks:
+                await self.result_cache.put(cache_key, {
+                    "classification": self.memory_store.without_row_ids(classification_result),
+                    "agent_result": self.memory_store.without_row_ids(agent_result)
+                })
+
+            action_result = await self.action_router.route_action(agent_result, classification_result, trace_id)
+            self.memory_store.log_complete_trace(
+                classification_result, agent_result, action_result,
+                total_processing_time=time.perf_counter() - started,
+                trace_id=trace_id,
+                parent_trace_id=parent_trace_id
+            )
+            self.stats["processed"] += 1
+            return dict(
+                summary,
+                status="completed",
+                trace_id=trace_id,
+                format=attachment_format,
+                intent=classification_result.get("intent"),
+                actions_triggered=action_result,
+                cache_hit=cached is not None
+            )
+        except Exception as e:
+            print(f"ERROR: Attachment {summary['filename'] or '(unnamed)'} failed - {str(e)}")
+            # The failure stays visible under the email's trace
+            self.memory_store.log_complete_trace(
+                {"format": attachment_format}, {}, {},
+                total_processing_time=time.perf_counter() - started,
+                trace_id=trace_id,
+                status="failed",
+                parent_trace_id=parent_trace_id
+            )
+            self.stats["failed"] += 1
+            return dict(summary, status="failed", trace_id=trace_id, format=attachment_format, error=str(e))
+
+    async def _process_pdf(self, payload: bytes):
+        """PDFAgent works from a file path; spool the payload to a temp file for the duration"""
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        # Written by path in a worker thread; the descriptor is not handed across
+        os.close(fd)
+        try:
+            await asyncio.to_thread(self._write_file, path, payload)
+            document = await self.pdf_agent.normalize(path)
+            classification_result = await self.classifier_agent.classify(document.text, "PDF")
+            agent_result = await self.pdf_agent.process(document, classification_result)
+            return classification_result, agent_result
+        finally:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    async def _process_json(self, payload: bytes):
+        try:
+            content = payload.decode("utf-8-sig")
+        except UnicodeDecodeError as e:
+            raise Exception(f"JSON attachment is not UTF-8: {str(e)}")
+        classification_result = await self.classifier_agent.classify(content, "JSON")
+        agent_result = await self.json_agent.process(content, classification_result)
+        return classification_result, agent_result
+
+    @staticmethod
+    def _write_file(path: str, payload: bytes):
+        with open(path, "wb") as f:
+            f.write(payload)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.stats,
+            max_workers=self.max_workers,
+            max_per_email=self.max_per_email,
+            max_attachments=self.max_attachments
+        )
@@ -0,0 +1,95 @@
+"""
+Circuit Breaker - Fails fast on a degraded action target instead of waiting out timeouts
+Opens after consecutive failures, then lets a limited number of half-open probes through
+"""
+
+import time
+from typing import Dict, Any
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a target whose breaker is open"""
+
+    def __init__(self, target: str, retry_after: float):
+        super().__init__(f"Circuit open for {target}; retry in {retry_after:.1f}s")
+        self.target = target
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, target: str, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_probes: int = 1):
+        self.target = target
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.stats = {"short_circuited": 0, "opened": 0, "closed": 0}
+
+    def before_call(self) -> bool:
+        """
+        Admit a call or raise CircuitOpenError; an admitted call must report its outcome
+        
+        Returns True when the call is a half-open probe.
+        """
+        if self.state == self.OPEN:
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                self.stats["short_circuited"] += 1
+                raise CircuitOpenError(self.target, remaining)
+            self.state = self.HALF_OPEN
+            self.probes_in_flight = 0
+
+        if self.state == self.HALF_OPEN:
+            if self.probes_in_flight >= self.half_open_probes:
+                self.stats["short_circuited"] += 1
+                raise CircuitOpenError(self.target, self.reset_timeout)
+            self.probes_in_flight += 1
+            return True
+        return False
+
+    def record_success(self):
+        if self.state == self.HALF_OPEN:
+            self._release_probe()
+            self.state = self.CLOSED
+            self.stats["closed"] += 1
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        if self.state == self.HALF_OPEN:
+            # A failed probe re-opens the breaker for another full reset period
+            self._release_probe()
+            self._open()
+            return
+
+        self.consecutive_failures += 1
+        if self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def record_ignored(self):
+        """Release an admitted call whose outcome says nothing about target health"""
+        if self.state == self.HALF_OPEN:
+            self._release_probe()
+
+    def _release_probe(self):
+        self.probes_in_flight = max(0, self.probes_in_flight - 1)
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.stats["opened"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.stats,
+            state=self.state,
+            consecutive_failures=self.consecutive_failures,
+            failure_threshold=self.failure_threshold,
+            reset_timeout=self.reset_timeout
+        )
@@ -0,0 +1,188 @@
+"""
+HTTP Transport - Non-blocking, pooled HTTP delivery for action router calls
+Keeps one keep-alive connection pool per target host with its own limits and timeouts,
+a circuit breaker per endpoint and timeouts adapted from observed latency
+"""
+
+import os
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+import httpx
+from ContextualDecisionEngine.routers.circuit_breaker import CircuitBreaker
+
+class ActionTransport:
+    def __init__(
+        self,
+        default_timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        target_timeouts: Optional[Dict[str, float]] = None,
+        host_limits: Optional[Dict[str, int]] = None,
+        adaptive_timeouts: Optional[bool] = None,
+        breaker_failures: Optional[int] = None,
+        breaker_reset: Optional[float] = None
+    ):
+        self.default_timeout = default_timeout or float(os.getenv("ACTION_HTTP_TIMEOUT", "10"))
+        self.max_connections = max_connections or int(os.getenv("ACTION_HTTP_MAX_CONNECTIONS", "20"))
+        self.max_keepalive_connections = max_keepalive_connections or int(os.getenv("ACTION_HTTP_MAX_KEEPALIVE", "10"))
+        
+        # Per-endpoint timeouts keyed by path, e.g. ACTION_TARGET_TIMEOUTS="/compliance/flag=3,/crm/log=2"
+        if target_timeouts is None:
+            target_timeouts = {
+                path.strip(): float(seconds)
+                for path, seconds in (
+                    item.split("=", 1) for item in os.getenv("ACTION_TARGET_TIMEOUTS", "").split(",") if "=" in item
+                )
+            }
+        self.target_timeouts = target_timeouts
+        # Per-host connection caps keyed by "host:port"
+        self.host_limits = host_limits or {}
+        
+        # Adaptive timeout: a multiple of the observed latency percentile, capped by the
+        # configured timeout, once enough successful calls have been seen
+        if adaptive_timeouts is None:
+            adaptive_timeouts = os.getenv("ACTION_ADAPTIVE_TIMEOUTS", "1") == "1"
+        self.adaptive_timeouts = adaptive_timeouts
+        self.timeout_percentile = float(os.getenv("ACTION_TIMEOUT_PERCENTILE", "99"))
+        self.timeout_multiplier = float(os.getenv("ACTION_TIMEOUT_MULTIPLIER", "3"))
+        self.min_timeout = float(os.getenv("ACTION_MIN_TIMEOUT", "0.5"))
+        self.min_samples = 20
+        
+        self.breaker_failures = breaker_failures or int(os.getenv("ACTION_BREAKER_FAILURES", "5"))
+        self.breaker_reset = breaker_reset or float(os.getenv("ACTION_BREAKER_RESET", "30"))
+        
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, deque] = {}
+
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        """Get (or lazily create) the pooled client for the URL's host"""
+        parts = urlsplit(url)
+        host = parts.netloc
+        if host not in self.clients:
+            max_connections = self.host_limits.get(host, self.max_connections)
+            self.clients[host] = httpx.AsyncClient(
+                base_url=f"{parts.scheme}://{host}",
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=min(self.max_keepalive_connections, max_connections)
+                ),
+                timeout=self.default_timeout
+            )
+        return self.clients[host]
+
+    def timeout_for(self, url: str) -> float:
+        """Configured timeout for the endpoint, tightened to observed latency when adaptive"""
+        path = urlsplit(url).path
+        configured = self.target_timeouts.get(path, self.default_timeout)
+        latencies = self.latencies.get(path)
+        if not self.adaptive_timeouts or not latencies or len(latencies) < self.min_samples:
+            return configured
+        adaptive = self._percentile(latencies, self.timeout_percentile) * self.timeout_multiplier
+        return min(configured, max(self.min_timeout, adaptive))
+
+    @staticmethod
+    def _percentile(values, percentile: float) -> float:
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def _stats_for(self, path: str) -> Dict[str, Any]:
+        if path not in self.stats:
+            self.stats[path] = {"requests": 0, "errors": 0, "in_flight": 0, "total_seconds": 0.0}
+            self.breakers[path] = CircuitBreaker(path, self.breaker_failures, self.breaker_reset)
+            self.latencies[path] = deque(maxlen=200)
+        return self.stats[path]
+
+    @staticmethod
+    def _is_target_failure(error: Exception) -> bool:
+        """Timeouts, connection errors and 5xx count against the target; 4xx are the caller's fault"""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        return isinstance(error, (httpx.TransportError, ValueError))
+
+    async def post_json(
+        self,
+        url: str,
+        payload: Any,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        POST a JSON payload and return the decoded JSON response
+        
+        Raises on HTTP errors, and raises CircuitOpenError without touching the
+        network while the endpoint's breaker is open.
+        """
+        path = urlsplit(url).path
+        stats = self._stats_for(path)
+        breaker = self.breakers[path]
+        # Probes get the full configured timeout so a slow but healthy target can
+        # succeed and widen a timeout that adapted to faster days
+        probe = breaker.before_call()
+        if probe and timeout is None:
+            timeout = self.target_timeouts.get(path, self.default_timeout)
+        
+        client = self._client_for(url)
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        started = time.perf_counter()
+        try:
+            response = await client.post(
+                url,
+                json=payload,
+                headers=headers,
+                timeout=timeout or self.timeout_for(url)
+            )
+            response.raise_for_status()
+            result = response.json()
+        except Exception as e:
+            stats["errors"] += 1
+            if self._is_target_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_ignored()
+            raise
+        except BaseException:
+            breaker.record_ignored()
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            stats["in_flight"] -= 1
+            stats["total_seconds"] += elapsed
+        
+        breaker.record_success()
+        self.latencies[path].append(elapsed)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-endpoint counters, latency percentiles, current timeout and breaker state"""
+        targets = {}
+        for path, stats in self.stats.items():
+            latencies = self.latencies[path]
+            targets[path] = dict(
+                stats,
+                configured_timeout=self.target_timeouts.get(path, self.default_timeout),
+                timeout=self.timeout_for(path),
+                latency={
+                    "samples": len(latencies),
+                    "p50": round(self._percentile(latencies, 50), 4) if latencies else None,
+                    "p95": round(self._percentile(latencies, 95), 4) if latencies else None,
+                    "p99": round(self._percentile(latencies, 99), 4) if latencies else None
+                },
+                breaker=self.breakers[path].get_stats()
+            )
+        return {
+            "hosts": list(self.clients),
+            "adaptive_timeouts": self.adaptive_timeouts,
+            "targets": targets
+        }
+
+    async def aclose(self):
+        """Close every per-host connection pool"""
+        for client in self.clients.values():
+            await client.aclose()
+        self.clients.clear()
@@ -0,0 +1,117 @@
+"""
+Outbox Dispatcher - Background delivery of actions queued in the MemoryStore outbox
+Retries failed calls with exponential backoff and dead-letters them after the last attempt
+"""
+
+import os
+import time
+import random
+import asyncio
+from typing import Dict, Any, Optional
+from ContextualDecisionEngine.memory.store import MemoryStore
+from ContextualDecisionEngine.routers.action_router import ActionRouter
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        memory_store: MemoryStore,
+        action_router: ActionRouter,
+        poll_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        base_backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+        lease_seconds: Optional[float] = None
+    ):
+        self.memory_store = memory_store
+        self.action_router = action_router
+        self.poll_interval = poll_interval or float(os.getenv("ACTION_OUTBOX_POLL_INTERVAL", "0.5"))
+        self.batch_size = batch_size or int(os.getenv("ACTION_OUTBOX_BATCH_SIZE", "20"))
+        self.max_attempts = max_attempts or int(os.getenv("ACTION_OUTBOX_MAX_ATTEMPTS", "5"))
+        self.base_backoff = base_backoff or float(os.getenv("ACTION_OUTBOX_BACKOFF", "1"))
+        self.max_backoff = max_backoff or float(os.getenv("ACTION_OUTBOX_MAX_BACKOFF", "300"))
+        # A claimed row is retried by any dispatcher once its lease runs out (e.g. after a crash)
+        self.lease_seconds = lease_seconds or float(os.getenv("ACTION_OUTBOX_LEASE", "60"))
+        
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.stats = {"delivered": 0, "retried": 0, "dead_lettered": 0, "short_circuited": 0, "polls": 0}
+
+    def start(self):
+        """Start the delivery loop on the running event loop"""
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the delivery loop; leased rows are picked up again after a restart"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def notify(self):
+        """Wake the loop right away, e.g. after a request committed new outbox rows"""
+        self.wakeup.set()
+
+    def backoff_for(self, attempts: int) -> float:
+        """Exponential backoff with jitter for the retry after the given attempt"""
+        delay = min(self.max_backoff, self.base_backoff * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def dispatch_due(self) -> int:
+        """Deliver one batch of due outbox rows; returns how many were attempted"""
+        entries = await asyncio.to_thread(self.memory_store.claim_due_actions, self.batch_size, self.lease_seconds)
+        self.stats["polls"] += 1
+        if entries:
+            await asyncio.gather(*[self._deliver(entry) for entry in entries])
+        return len(entries)
+
+    async def _deliver(self, entry: Dict[str, Any]):
+        response = await self.action_router.call_endpoint(
+            entry["action_type"], entry["payload"], idempotency_key=entry["outbox_id"]
+        )
+        
+        if response.get("success", False):
+            await asyncio.to_thread(self.memory_store.complete_action, entry["outbox_id"], response)
+            self.stats["delivered"] += 1
+            return
+        
+        error = response.get("error") or response.get("message") or "Target reported failure"
+        if response.get("circuit_open"):
+            # The target was never called, so wait for the breaker without spending an attempt
+            retry_at = time.time() + max(response.get("retry_after", 0.0), self.backoff_for(1))
+            await asyncio.to_thread(self.memory_store.fail_action, entry["outbox_id"], error, retry_at, True)
+            self.stats["short_circuited"] += 1
+        elif entry["attempts"] >= self.max_attempts:
+            await asyncio.to_thread(self.memory_store.fail_action, entry["outbox_id"], error)
+            self.stats["dead_lettered"] += 1
+        else:
+            retry_at = time.time() + self.backoff_for(entry["attempts"])
+            await asyncio.to_thread(self.memory_store.fail_action, entry["outbox_id"], error, retry_at)
+            self.stats["retried"] += 1
+
+    async def _run(self):
+        while True:
+            try:
+                # Keep draining while full batches come back
+                if await self.dispatch_due() >= self.batch_size:
+                    continue
+            except Exception as e:
+                print(f"ERROR: Outbox dispatch failed - {str(e)}")
+            
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.stats,
+            running=self.task is not None and not self.task.done(),
+            max_attempts=self.max_attempts,
+            outbox=self.memory_store.get_outbox_stats()
+        )
@@ -0,0 +1,420 @@
+"""
+Rule Engine - Declarative action routing rules compiled into decision tables
+Rules map conditions on agent result fields to actions with priority and payload templates;
+the rule file is compiled once and recompiled automatically when it changes on disk
+"""
+
+import os
+import json
+import time
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+# Marks a field that is absent, as opposed to present with a None value
+_MISSING = object()
+
+Getter = Callable[[Any, Any], Any]
+Predicate = Callable[[Any, Any], bool]
+
+
+def _compile_path(path: str) -> Getter:
+    """Compile a dotted field path; paths starting with "item." read the for_each element"""
+    keys = path.split(".")
+    from_item = keys[0] == "item"
+    if from_item:
+        keys = keys[1:]
+
+    def get(result, item):
+        value = item if from_item else result
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                return _MISSING
+            value = value[key]
+        return value
+
+    return get
+
+
+def _compile_condition(spec: Dict[str, Any]) -> Predicate:
+    """
+    Compile a condition into a predicate
+
+    Forms: {"field", "equals" | "not_equals" | "in" | "truthy" | "gt" | "gte" | "lt" | "lte"}
+    with an optional "default" for absent fields, {"any": list_field, "where": condition}
+    (conditions inside "where" read fields of the element), {"all": [...]},
+    {"any_of": [...]} and {"not": condition}.
+    """
+    if "all" in spec:
+        parts = [_compile_condition(part) for part in spec["all"]]
+        return lambda result, item: all(part(result, item) for part in parts)
+    if "any_of" in spec:
+        parts = [_compile_condition(part) for part in spec["any_of"]]
+        return lambda result, item: any(part(result, item) for part in parts)
+    if "not" in spec:
+        inner = _compile_condition(spec["not"])
+        return lambda result, item: not inner(result, item)
+    if "any" in spec:
+        get_list = _compile_path(spec["any"])
+        where = _compile_condition(spec["where"])
+        return lambda result, item: any(
+            where(element, element) for element in _as_list(get_list(result, item))
+        )
+
+    if "field" not in spec:
+        raise ValueError(f"Condition needs a field: {spec}")
+    get = _compile_path(spec["field"])
+    default = spec.get("default")
+
+    def value_of(result, item):
+        value = get(result, item)
+        return default if value is _MISSING else value
+
+    if "equals" in spec:
+        expected = spec["equals"]
+        return lambda result, item: value_of(result, item) == expected
+    if "not_equals" in spec:
+        expected = spec["not_equals"]
+        return lambda result, item: value_of(result, item) != expected
+    if "in" in spec:
+        allowed = frozenset(spec["in"])
+        return lambda result, item: _hashable(value_of(result, item)) in allowed
+    if "truthy" in spec:
+        expected = bool(spec["truthy"])
+        return lambda result, item: bool(value_of(result, item)) == expected
+
+    comparisons = {
+        "gt": lambda a, b: a > b,
+        "gte": lambda a, b: a >= b,
+        "lt": lambda a, b: a < b,
+        "lte": lambda a, b: a <= b
+    }
+    for operator, compare in comparisons.items():
+        if operator in spec:
+            bound = spec[operator]
+
+            def predicate(result, item, compare=compare, bound=bound):
+                value = value_of(result, item)
+                return isinstance(value, (int, float)) and compare(value, bound)
+
+            return predicate
+
+    raise ValueError(f"Condition has no operator: {spec}")
+
+
+def _compile_template(spec: Any) -> Getter:
+    """
+    Compile a payload template
+
+    {"$ref": path} copies a field ("default" when absent; lists can be narrowed with
+    "where" and "limit"), {"$count": path} is a list's length, dicts and lists are
+    compiled recursively and anything else is a literal.
+    """
+    if isinstance(spec, dict) and "$ref" in spec:
+        get = _compile_path(spec["$ref"])
+        default = spec.get("default")
+        where = _compile_condition(spec["where"]) if "where" in spec else None
+        limit = spec.get("limit")
+
+        def ref(result, item):
+            value = get(result, item)
+            if value is _MISSING:
+                value = default
+            if where is not None:
+                value = [element for element in _as_list(value) if where(element, element)]
+            if limit is not None and isinstance(value, list):
+                value = value[:limit]
+            return value
+
+        return ref
+
+    if isinstance(spec, dict) and "$count" in spec:
+        get = _compile_path(spec["$count"])
+        return lambda result, item: len(_as_list(get(result, item)))
+
+    if isinstance(spec, dict):
+        fields = [(key, _compile_template(value)) for key, value in spec.items()]
+        return lambda result, item: {key: field(result, item) for key, field in fields}
+
+    if isinstance(spec, list):
+        elements = [_compile_template(value) for value in spec]
+        return lambda result, item: [element(result, item) for element in elements]
+
+    return lambda result, item: spec
+
+
+def _as_list(value) -> list:
+    return value if isinstance(value, list) else []
+
+
+def _hashable(value):
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return None
+
+
+class CompiledRule:
+    """One rule: an optional condition, an optional for_each expansion and an action template"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.name = spec.get("name", "")
+        self.when = _compile_condition(spec["when"]) if "when" in spec else None
+        self.for_each = _compile_path(spec["for_each"]) if "for_each" in spec else None
+        self.where = _compile_condition(spec["where"]) if "where" in spec else None
+        self.limit = spec.get("limit")
+
+        action = spec.get("action")
+        if not action or "type" not in action:
+            raise ValueError(f"Rule {self.name or spec} needs an action with a type")
+        self.action_type = action["type"]
+        self.priority = action.get("priority", "medium")
+        self.depends_on = list(action.get("depends_on", []))
+        self.data = _compile_template(action.get("data", {}))
+
+    def matches(self, result: Dict[str, Any]) -> bool:
+        return self.when is None or self.when(result, None)
+
+    def emit(self, result: Dict[str, Any], actions: List[Dict[str, Any]]):
+        if self.for_each is None:
+            actions.append(self._action(result, None))
+            return
+
+        emitted = 0
+        for element in _as_list(self.for_each(result, None)):
+            if self.where is not None and not self.where(element, element):
+                continue
+            actions.append(self._action(result, element))
+            emitted += 1
+            if self.limit is not None and emitted >= self.limit:
+                break
+
+    def _action(self, result, item) -> Dict[str, Any]:
+        action = {"action_type": self.action_type, "priority": self.priority, "data": self.data(result, item)}
+        if self.depends_on:
+            action["depends_on"] = list(self.depends_on)
+        return action
+
+
+class RuleGroup:
+    """
+    Rules sharing a group name: the first match wins
+
+    When every conditional rule tests the same field for equality (or membership), the
+    group compiles to a dict lookup on that field instead of a linear scan.
+    """
+
+    def __init__(self, rules: List[Tuple[Dict[str, Any], CompiledRule]]):
+        self.rules = [rule for _, rule in rules]
+        self.dispatch_field: Optional[Getter] = None
+        self.dispatch: Dict[Any, CompiledRule] = {}
+        self.otherwise: Optional[CompiledRule] = None
+
+        conditional = [(spec, rule) for spec, rule in rules if "when" in spec]
+        unconditional = [rule for spec, rule in rules if "when" not in spec]
+        fields = {spec["when"].get("field") for spec, _ in conditional}
+        simple = all(
+            set(spec["when"]) <= {"field", "equals", "in"} and ("equals" in spec["when"]) != ("in" in spec["when"])
+            for spec, _ in conditional
+        )
+        # A catch-all must come last, otherwise it would shadow the rules after it
+        catch_all_last = not unconditional or (len(unconditional) == 1 and self.rules[-1] is unconditional[0])
+
+        if conditional and simple and len(fields) == 1 and catch_all_last:
+            self.dispatch_field = _compile_path(fields.pop())
+            for spec, rule in conditional:
+                values = [spec["when"]["equals"]] if "equals" in spec["when"] else spec["when"]["in"]
+                for value in values:
+                    self.dispatch.setdefault(_hashable(value), rule)
+            self.otherwise = unconditional[0] if unconditional else None
+
+    def emit(self, result: Dict[str, Any], actions: List[Dict[str, Any]]):
+        if self.dispatch_field is not None:
+            value = self.dispatch_field(result, None)
+            rule = self.dispatch.get(_hashable(value)) if value is not _MISSING else None
+            rule = rule or self.otherwise
+            if rule is not None:
+                rule.emit(result, actions)
+            return
+
+        for rule in self.rules:
+            if rule.matches(result):
+                rule.emit(result, actions)
+                return
+
+
+def _key_clause(when: Optional[Dict[str, Any]]) -> Optional[Tuple[str, list]]:
+    """The equality test a rule cannot match without, as (field, accepted values), if it has one"""
+    if not when:
+        return None
+    clauses = when["all"] if "all" in when else [when]
+    for clause in clauses:
+        if set(clause) <= {"field", "equals", "in"} and ("equals" in clause) != ("in" in clause):
+            return clause["field"], [clause["equals"]] if "equals" in clause else list(clause["in"])
+    return None
+
+
+class AgentTable:
+    """
+    Compiled rules for one agent type
+
+    Independent rules with an equality test are indexed by the tested value, so only
+    rules that can match are evaluated; the rest (groups, other rules) always run.
+    Matches are emitted in rule file order.
+    """
+
+    def __init__(self, steps: List[Tuple[Dict[str, Any], Any]], fallbacks: List[CompiledRule]):
+        self.steps = [step for _, step in steps]
+        self.fallbacks = fallbacks
+        self.always: List[int] = []
+        indexes: Dict[str, Dict[Any, List[int]]] = {}
+
+        for position, (spec, step) in enumerate(steps):
+            key = _key_clause(spec.get("when")) if isinstance(step, CompiledRule) and "for_each" not in spec else None
+            if key is None:
+                self.always.append(position)
+                continue
+            field, values = key
+            buckets = indexes.setdefault(field, {})
+            for value in values:
+                buckets.setdefault(_hashable(value), []).append(position)
+
+        self.indexes = [(_compile_path(field), buckets) for field, buckets in indexes.items()]
+
+    def rule_count(self) -> int:
+        return sum(len(step.rules) if isinstance(step, RuleGroup) else 1 for step in self.steps) + len(self.fallbacks)
+
+    def evaluate(self, agent_result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        positions = self.always
+        for get, buckets in self.indexes:
+            value = get(agent_result, None)
+            if value is not _MISSING:
+                candidates = buckets.get(_hashable(value))
+                if candidates:
+                    positions = positions + candidates
+        if len(positions) != len(self.always):
+            positions = sorted(positions)
+
+        actions: List[Dict[str, Any]] = []
+        for position in positions:
+            step = self.steps[position]
+            if isinstance(step, RuleGroup):
+                step.emit(agent_result, actions)
+            elif step.matches(agent_result):
+                step.emit(agent_result, actions)
+
+        if not actions:
+            for rule in self.fallbacks:
+                if rule.matches(agent_result):
+                    rule.emit(agent_result, actions)
+        return actions
+
+
+class RuleEngine:
+    def __init__(self, rules_path: Optional[str] = None, reload_interval: Optional[float] = None):
+        self.rules_path = rules_path or os.getenv(
+            "ACTION_RULES_PATH", os.path.join(os.path.dirname(__file__), "action_rules.json")
+        )
+        # How often (seconds) evaluate() checks the rule file for changes; 0 disables hot reload
+        self.reload_interval = reload_interval if reload_interval is not None else float(
+            os.getenv("ACTION_RULES_RELOAD_INTERVAL", "1")
+        )
+
+        self.tables: Dict[str, AgentTable] = {}
+        self.version = None
+        self.mtime = None
+        self.failed_mtime = None
+        self.last_check = 0.0
+        self.stats = {"loads": 0, "reload_errors": 0, "last_error": None, "loaded_at": None}
+
+        self.reload()
+
+    def reload(self) -> bool:
+        """
+        Load and compile the rule file
+
+        A file that fails to compile keeps the previous rules in place; the first load
+        raises instead, since there is nothing to fall back to.
+        """
+        mtime = None
+        try:
+            mtime = os.path.getmtime(self.rules_path)
+            with open(self.rules_path, "r") as f:
+                config = json.load(f)
+            tables = self._compile(config)
+        except Exception as e:
+            if self.mtime is None:
+                raise Exception(f"Action rule loading failed: {str(e)}")
+            # Remember the broken revision so the change check does not retry it every interval
+            self.failed_mtime = mtime
+            self.stats["reload_errors"] += 1
+            self.stats["last_error"] = str(e)
+            print(f"ERROR: Action rule reload failed, keeping previous rules - {str(e)}")
+            return False
+
+        # Swap in one assignment so a concurrent evaluate sees either old or new rules
+        self.tables = tables
+        self.version = config.get("version")
+        self.mtime = mtime
+        self.stats["loads"] += 1
+        self.stats["last_error"] = None
+        self.stats["loaded_at"] = time.time()
+        return True
+
+    @staticmethod
+    def _compile(config: Dict[str, Any]) -> Dict[str, AgentTable]:
+        tables = {}
+        for agent_type, specs in config.get("agents", {}).items():
+            # Entries are (spec, rule) for independent rules, or a list of them for a group
+            steps: list = []
+            groups: Dict[str, list] = {}
+            fallbacks: List[CompiledRule] = []
+
+            for spec in specs:
+                rule = CompiledRule(spec)
+                if spec.get("fallback"):
+                    fallbacks.append(rule)
+                elif spec.get("group"):
+                    # A group is evaluated where its first rule appears
+                    if spec["group"] not in groups:
+                        groups[spec["group"]] = []
+                        steps.append(groups[spec["group"]])
+                    groups[spec["group"]].append((spec, rule))
+                else:
+                    steps.append((spec, rule))
+
+            compiled_steps = [({}, RuleGroup(step)) if isinstance(step, list) else step for step in steps]
+            tables[agent_type.lower()] = AgentTable(compiled_steps, fallbacks)
+        return tables
+
+    def _maybe_reload(self):
+        if self.reload_interval <= 0:
+            return
+        now = time.monotonic()
+        if now - self.last_check < self.reload_interval:
+            return
+        self.last_check = now
+        try:
+            mtime = os.path.getmtime(self.rules_path)
+        except OSError:
+            return
+        if mtime != self.mtime and mtime != self.failed_mtime:
+            self.reload()
+
+    def evaluate(self, agent_result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Actions for an agent result, in rule order; fallback rules fire only when nothing else did"""
+        self._maybe_reload()
+
+        agent_type = str(agent_result.get("agent_type") or "").lower()
+        table = self.tables.get(agent_type)
+        if table is None:
+            return []
+        return table.evaluate(agent_result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.stats,
+            rules_path=self.rules_path,
+            version=self.version,
+            reload_interval=self.reload_interval,
+            agents={agent_type: table.rule_count() for agent_type, table in self.tables.items()}
+        )
@@ -0,0 +1,6 @@
+"""
+Scripts package for benchmarks and operational checks
+Run modules from the repository root, e.g. python -m ContextualDecisionEngine.scripts.bench_llm_concurrency
+"""
+
+__version__ = "1.0.0"
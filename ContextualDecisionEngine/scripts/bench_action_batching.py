@@ -0,0 +1,82 @@
+"""
+Action Batching Benchmark - Counts downstream POSTs for a burst of actions
+Sends the same burst of crm_log / risk_alert calls with batching off and on
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from fastapi import FastAPI, Request
+from ContextualDecisionEngine.memory.store import MemoryStore
+from ContextualDecisionEngine.routers.action_router import ActionRouter
+from ContextualDecisionEngine.scripts.fake_llm_server import BackgroundServer
+
+
+def build_targets(latency: float, received: list) -> FastAPI:
+    """Single and bulk endpoints that record every POST they receive"""
+    app = FastAPI()
+
+    async def single(request: Request):
+        received.append(request.url.path)
+        await asyncio.sleep(latency)
+        return {"success": True}
+
+    async def bulk(request: Request):
+        received.append(request.url.path)
+        items = (await request.json()).get("items", [])
+        await asyncio.sleep(latency)
+        return {"success": True, "results": [{"success": True, "key": item.get("idempotency_key")} for item in items]}
+
+    for path in ("/crm/log", "/risk_alert"):
+        app.post(path)(single)
+        app.post(f"{path}/bulk")(bulk)
+    return app
+
+
+async def burst(router: ActionRouter, actions: int) -> tuple:
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        router.call_endpoint("crm_log" if i % 2 else "risk_alert", {"n": i}, idempotency_key=f"key-{i}")
+        for i in range(actions)
+    ])
+    elapsed = time.perf_counter() - start
+    await router.aclose()
+
+    # Every caller must get back the result for its own item
+    mismatched = sum(
+        1 for i, result in enumerate(results)
+        if not result.get("success") or ("key" in result and result["key"] != f"key-{i}")
+    )
+    return elapsed, mismatched
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--actions", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.01, help="Target latency per POST in seconds")
+    parser.add_argument("--window", type=float, default=0.02, help="Batch window in seconds")
+    args = parser.parse_args()
+
+    received: list = []
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp, BackgroundServer(build_targets(args.latency, received)) as server:
+        os.environ["ACTION_BASE_URL"] = server.url
+        store = MemoryStore(os.path.join(tmp, "bench.db"))
+
+        for label, window in (("unbatched", 0), (f"batched ({args.window}s window)", args.window)):
+            received.clear()
+            router = ActionRouter(store, delivery="inline", batch_window=window)
+            elapsed, mismatched = asyncio.run(burst(router, args.actions))
+            failures += mismatched
+            print(f"{label:<28} {args.actions} actions -> {len(received):4d} POSTs in {elapsed:.2f}s, {mismatched} mismatched")
+
+        store.close()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
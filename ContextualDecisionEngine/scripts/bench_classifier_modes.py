@@ -0,0 +1,76 @@
+"""
+Classifier Mode Benchmark - Compares sequential, parallel and fused classification
+Uses a stubbed LLM with injected latency and reports p50/p99 per mode
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+from ContextualDecisionEngine.agents.classifier import ClassifierAgent
+from ContextualDecisionEngine.memory.store import MemoryStore
+
+
+class StubLLMClient:
+    """Stands in for OpenAIClient and answers after a jittered delay"""
+
+    def __init__(self, latency: float, jitter: float):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+
+    async def chat_completion(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+        return json.dumps({
+            "format": "Email",
+            "intent": "Customer Service",
+            "confidence": 0.9,
+            "reasoning": "stub"
+        })
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(mode: str, store: MemoryStore, args) -> None:
+    llm = StubLLMClient(args.latency, args.jitter)
+    # A threshold above 1.0 disables the sniffer so every mode pays for format classification
+    agent = ClassifierAgent(store, openai_client=llm, mode=mode, sniff_threshold=1.1)
+    content = "From: customer@example.com\nSubject: Broken order\n\nMy order arrived damaged, please help."
+
+    samples = []
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        await agent.classify(content)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    print(
+        f"{mode:<11} p50={percentile(samples, 50):7.1f}ms  p99={percentile(samples, 99):7.1f}ms  "
+        f"mean={statistics.mean(samples):7.1f}ms  llm_calls/request={llm.calls / args.iterations:.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean injected LLM latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.015, help="Std deviation of the injected latency")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MemoryStore(os.path.join(tmp, "bench.db"))
+        store.init_db()
+        for mode in ClassifierAgent.MODES:
+            asyncio.run(run(mode, store, args))
+
+
+if __name__ == "__main__":
+    main()
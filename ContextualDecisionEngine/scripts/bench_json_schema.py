@@ -0,0 +1,213 @@
+"""
+JSON Schema Benchmark - Per-request jsonschema.validate vs precompiled registry validators
+Validates large invoice and webhook payloads, valid and with errors spread through them,
+and checks both agree on validity while the registry reports every error; a parity pass
+then checks the compiled fast path and error locator against plain jsonschema on random
+instances of every registered schema
+"""
+
+import sys
+import time
+import random
+import argparse
+import jsonschema
+from collections import Counter
+from ContextualDecisionEngine.agents.json_agent import JSONAgent
+
+# A tenant schema describing every line item, so validation has to walk the whole payload
+LINE_ITEM_INVOICE = {
+    "type": "object",
+    "required": ["invoice_id", "amount", "customer_id", "line_items"],
+    "properties": {
+        "invoice_id": {"type": "string"},
+        "amount": {"type": "number", "minimum": 0},
+        "customer_id": {"type": ["string", "number"]},
+        "line_items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["sku", "quantity", "unit_price"],
+                "properties": {
+                    "sku": {"type": "string", "minLength": 1},
+                    "quantity": {"type": "integer", "minimum": 1},
+                    "unit_price": {"type": "number", "minimum": 0},
+                    "description": {"type": "string"}
+                },
+                "additionalProperties": False
+            }
+        }
+    }
+}
+
+
+def legacy_validate(json_data, schema):
+    """Previous behaviour: build a validator per call and keep only the first error"""
+    try:
+        jsonschema.validate(json_data, schema)
+        return True
+    except jsonschema.ValidationError:
+        return False
+
+
+def build_invoice(items: int, errors: int, seed: int):
+    rng = random.Random(seed)
+    line_items = [
+        {"sku": f"SKU-{index}", "quantity": rng.randint(1, 9), "unit_price": round(rng.uniform(1, 500), 2), "description": "widget"}
+        for index in range(items)
+    ]
+    for index in rng.sample(range(items), errors):
+        broken = line_items[index]
+        choice = index % 3
+        if choice == 0:
+            broken["quantity"] = "three"
+        elif choice == 1:
+            del broken["sku"]
+        else:
+            broken["discount"] = 5
+    return {"invoice_id": "INV-1", "amount": 1000.0, "customer_id": 42, "line_items": line_items}
+
+
+def build_webhook(items: int, seed: int):
+    rng = random.Random(seed)
+    return {
+        "timestamp": "2024-01-01T00:00:00Z",
+        "event_type": "order.shipped",
+        "data": {"events": [{"id": index, "value": rng.random()} for index in range(items)]}
+    }
+
+
+SCALARS = [None, True, False, 0, 1, -1, 1.0, 2.5, -0.5, "", "x", "three", [], {}]
+NOISE_LEVELS = [0.0, 0.02, 0.1, 0.3]
+
+
+def sample_instance(schema, rng: random.Random, noise: float, depth: int = 0):
+    """Random instance shaped like the schema; each node breaks it with probability noise"""
+    if not isinstance(schema, dict) or depth > 4 or rng.random() < noise:
+        return rng.choice(SCALARS)
+    declared = schema.get("type")
+    names = [declared] if isinstance(declared, str) else list(declared or ["object", "array", "string", "number"])
+    kind = rng.choice(names)
+    if kind == "object":
+        properties = schema.get("properties", {})
+        required = set(schema.get("required", []))
+        instance = {}
+        for name in list(required) + list(properties):
+            if name in required and rng.random() >= noise or rng.random() < 0.5:
+                instance[name] = sample_instance(properties.get(name, {}), rng, noise, depth + 1)
+        if rng.random() < noise:
+            instance[f"extra_{rng.randint(0, 3)}"] = sample_instance(schema.get("additionalProperties", {}), rng, noise, depth + 1)
+        return instance
+    if kind == "array":
+        return [sample_instance(schema.get("items", {}), rng, noise, depth + 1) for _ in range(rng.randint(0, 4))]
+    if kind == "string":
+        low = schema.get("minLength", 0)
+        high = schema.get("maxLength", low + 3)
+        if rng.random() < noise:
+            return "s" * rng.choice([max(low - 1, 0), high + 1])
+        return "s" * rng.randint(low, high)
+    if kind in ("number", "integer"):
+        low = schema.get("minimum", -10)
+        high = schema.get("maximum", low + 20)
+        if rng.random() < noise:
+            return rng.choice([low - 1, high + 1, low - 0.5, high + 0.5])
+        # Bounds themselves and whole-number floats are where hand-written checks go wrong
+        if kind == "integer":
+            return rng.choice([low, high, float(low), float(high), rng.randint(low, high)])
+        return rng.choice([low, high, float(low), rng.uniform(low, high)])
+    if kind == "boolean":
+        return rng.random() < 0.5
+    return None
+
+
+def error_signature(errors):
+    return Counter((tuple(error.absolute_path), error.validator, error.message) for error in errors)
+
+
+def check_parity(registry, samples: int, seed: int = 7) -> bool:
+    """Fast path and error locator must agree with jsonschema on validity and on every error"""
+    ok = True
+    rng = random.Random(seed)
+    for name, compiled in registry.compiled.items():
+        disagreements = 0
+        for index in range(samples):
+            # From mostly valid instances, where one wrong check flips validity, to heavily broken ones
+            instance = sample_instance(compiled.schema, rng, NOISE_LEVELS[index % len(NOISE_LEVELS)])
+            valid = compiled.validator.is_valid(instance)
+            problem = None
+            if compiled.fast_check is not None and compiled.fast_check(instance) != valid:
+                problem = f"fast path says {not valid}"
+            elif compiled.locator is not None and error_signature(compiled.locator.iter_errors(instance)) != error_signature(
+                compiled.validator.iter_errors(instance)
+            ):
+                problem = "error locator differs from iter_errors"
+            if problem:
+                disagreements += 1
+                if disagreements <= 3:
+                    print(f"  {name}: {problem} for {instance!r}")
+        fast = "compiled" if compiled.fast_check is not None else "jsonschema only"
+        print(f"parity {name:<20} {samples} instances ({fast}) disagreements={disagreements}")
+        ok = ok and disagreements == 0
+    return ok
+
+
+def timed(function, *args, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--small-requests", type=int, default=2000)
+    parser.add_argument("--parity-samples", type=int, default=2000)
+    args = parser.parse_args()
+
+    agent = JSONAgent(None, openai_client=object())
+    agent.register_schema("line_item_invoice", LINE_ITEM_INVOICE)
+    registry = agent.schema_registry
+
+    ok = True
+    cases = []
+    for items in args.items:
+        cases.append((f"invoice {items} items, valid", build_invoice(items, 0, items), "line_item_invoice"))
+        cases.append((f"invoice {items} items, 30 errors", build_invoice(items, 30, items), "line_item_invoice"))
+        cases.append((f"webhook {items} events", build_webhook(items, items), "webhook"))
+
+    for label, payload, name in cases:
+        schema = agent.expected_schemas[name]
+        expected, legacy_time = timed(legacy_validate, payload, schema)
+        result, registry_time = timed(registry.validate, payload, name)
+        match = expected == result["is_valid"]
+        ok = ok and match
+        print(
+            f"{label:<34} legacy={legacy_time * 1000:8.1f}ms registry={registry_time * 1000:8.1f}ms "
+            f"speedup={legacy_time / registry_time:5.1f}x errors={result['error_count']:3d} "
+            f"missing={len(result['missing_fields'])} type={len(result['type_errors'])} "
+            f"extra={len(result['extra_fields'])} same_validity={match}"
+        )
+
+    # Many small requests: the per-call validator construction dominates
+    small = build_invoice(3, 0, 1)
+    started = time.perf_counter()
+    for _ in range(args.small_requests):
+        legacy_validate(small, LINE_ITEM_INVOICE)
+    legacy_time = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(args.small_requests):
+        registry.validate(small, "line_item_invoice")
+    registry_time = time.perf_counter() - started
+    print(
+        f"{args.small_requests} small invoices{'':<15} legacy={legacy_time * 1000:8.1f}ms registry={registry_time * 1000:8.1f}ms "
+        f"speedup={legacy_time / registry_time:5.1f}x"
+    )
+
+    ok = check_parity(registry, args.parity_samples) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
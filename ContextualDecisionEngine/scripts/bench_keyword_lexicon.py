@@ -0,0 +1,196 @@
+"""
+Keyword Lexicon Benchmark - Repeated per-keyword scans vs one lexicon pass per agent
+Builds multi-MB documents, runs the previous keyword checks of the classifier, email
+and PDF agents against their lexicon-based replacements and verifies identical results
+"""
+
+import sys
+import time
+import random
+import string
+import asyncio
+import argparse
+from ContextualDecisionEngine.agents.classifier import ClassifierAgent
+from ContextualDecisionEngine.agents.email_agent import EmailAgent
+from ContextualDecisionEngine.agents.pdf_agent import PDFAgent
+from ContextualDecisionEngine.utils.keyword_lexicon import KeywordLexicon
+
+
+class FailingLLMClient:
+    """Forces every agent onto its keyword fallback"""
+
+    async def chat_completion(self, prompt: str, **kwargs) -> str:
+        raise Exception("LLM disabled for benchmark")
+
+
+def legacy_classifier(agent: ClassifierAgent, content: str):
+    """Format and intent fallbacks as previously written: one substring scan per keyword"""
+    content_lower = content.lower()
+    if any(keyword in content_lower for keyword in ["from:", "to:", "subject:", "@"]):
+        fmt = "Email"
+    elif content.strip().startswith(("{", "[")):
+        fmt = "JSON"
+    else:
+        fmt = "PDF"
+    content_lower = content.lower()
+    intent = "General Document"
+    for name, keywords in agent.intent_keywords.items():
+        if any(keyword in content_lower for keyword in keywords):
+            intent = name
+            break
+    return fmt, intent
+
+
+def legacy_email(agent: EmailAgent, content: str):
+    content_lower = content.lower()
+    tone = "neutral"
+    for name, (keywords, _) in agent.tone_keywords.items():
+        if any(word in content_lower for word in keywords):
+            tone = name
+            break
+    content_lower = content.lower()
+    counts = {
+        level: sum(1 for keyword in keywords if keyword in content_lower)
+        for level, keywords in agent.urgency_keywords.items()
+    }
+    return tone, counts
+
+
+def legacy_pdf(agent: PDFAgent, text: str):
+    text_lower = text.lower()
+    scores = {
+        doc_type: sum(1 for keyword in keywords if keyword in text_lower)
+        for doc_type, keywords in agent.document_type_keywords.items()
+    }
+    text_lower = text.lower()
+    flag_terms = [term for term in agent.policy_flag_terms if term in text_lower]
+    text_lower = text.lower()
+    compliance = []
+    for regulation, keywords in agent.compliance_keywords.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                compliance.append((regulation, keyword, text_lower.count(keyword)))
+                break
+    return scores, flag_terms, compliance
+
+
+def lexicon_classifier(agent: ClassifierAgent, content: str):
+    hits = agent.lexicon.scan(content)
+    return agent._fallback_format(content, hits), agent._fallback_intent(content, hits)
+
+
+def lexicon_email(agent: EmailAgent, content: str):
+    hits = agent.lexicon.scan(content)
+    tone = asyncio.run(agent._analyze_tone(content, hits))["tone"]
+    counts = {level: len(hits.found(f"urgency:{level}")) for level in agent.urgency_keywords}
+    return tone, counts
+
+
+def lexicon_pdf(agent: PDFAgent, text: str):
+    hits = agent.lexicon.scan(text)
+    scores = {doc_type: len(hits.found(f"type:{doc_type}")) for doc_type in agent.document_type_keywords}
+    flag_terms = [flag["keyword"] for flag in agent._check_flagging_conditions({}, text, hits)]
+    compliance = [
+        (flag["regulation"], flag["keyword"], flag["occurrences"])
+        for flag in agent._check_compliance_flags(text, hits)
+    ]
+    return scores, flag_terms, compliance
+
+
+def build_document(size: int, keywords, seed: int) -> str:
+    """Report-like filler with a sprinkling of mixed-case keywords"""
+    rng = random.Random(seed)
+    filler = (
+        "the quarterly revenue and expenses were reconciled against ledger entries for the period "
+        "while the board reviewed the statement balance sheet cash flow and operating margin"
+    ).split()
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(keywords) if rng.random() < 0.002 else rng.choice(filler)
+        word = word.upper() if rng.random() < 0.1 else word
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def legacy_vocabulary(categories, text: str):
+    """Every category's hits and counts with one substring scan per keyword"""
+    text_lower = text.lower()
+    return {
+        category: {keyword: text_lower.count(keyword) for keyword in keywords if keyword in text_lower}
+        for category, keywords in categories.items()
+    }
+
+
+def large_vocabulary(count: int, seed: int):
+    rng = random.Random(seed)
+    keywords = sorted({
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+        for _ in range(count)
+    })
+    return {f"category_{index}": keywords[index::10] for index in range(10)}
+
+
+def timed(function, *args, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 5])
+    parser.add_argument("--vocabularies", type=int, nargs="+", default=[100, 300, 1000])
+    args = parser.parse_args()
+
+    llm = FailingLLMClient()
+    classifier = ClassifierAgent(None, openai_client=llm)
+    email = EmailAgent(None, openai_client=llm)
+    pdf = PDFAgent(None, openai_client=llm)
+    cases = [
+        ("classifier", classifier, legacy_classifier, lexicon_classifier),
+        ("email", email, legacy_email, lexicon_email),
+        ("pdf", pdf, legacy_pdf, lexicon_pdf),
+    ]
+    vocabulary = sorted({keyword for _, agent, _, _ in cases for keyword in agent.lexicon.keywords})
+
+    ok = True
+    for size_mb in args.sizes_mb:
+        for seed, density in ((1, vocabulary), (2, vocabulary[:5])):
+            text = build_document(int(size_mb * 1024 * 1024), density, seed)
+            label = "many keywords" if density is vocabulary else "few keywords"
+            for name, agent, legacy, lexicon in cases:
+                expected, legacy_time = timed(legacy, agent, text)
+                actual, lexicon_time = timed(lexicon, agent, text)
+                match = expected == actual
+                ok = ok and match
+                print(
+                    f"{size_mb:4.1f}MB {label:<13} {name:<10} keywords={len(agent.lexicon.keywords):3d} "
+                    f"legacy={legacy_time * 1000:7.1f}ms lexicon={lexicon_time * 1000:7.1f}ms "
+                    f"speedup={legacy_time / lexicon_time:4.1f}x identical={match}"
+                )
+
+    # Large vocabularies: the automaton pass stays nearly flat while per-keyword scans grow linearly
+    for size_mb in args.sizes_mb:
+        for count in args.vocabularies:
+            categories = large_vocabulary(count, seed=count)
+            keywords = sorted({keyword for words in categories.values() for keyword in words})
+            text = build_document(int(size_mb * 1024 * 1024), keywords[:20], seed=3)
+            expected, legacy_time = timed(legacy_vocabulary, categories, text, repeat=1)
+            timings = []
+            for engine in ("substring", "automaton"):
+                lexicon = KeywordLexicon(categories, engine=engine)
+                actual, elapsed = timed(lambda: lexicon.scan(text).to_dict(), repeat=1)
+                match = expected == actual
+                ok = ok and match
+                timings.append(f"{engine}={elapsed * 1000:7.1f}ms identical={match}")
+            print(f"{size_mb:4.1f}MB vocabulary={len(keywords):4d} legacy={legacy_time * 1000:7.1f}ms " + " ".join(timings))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
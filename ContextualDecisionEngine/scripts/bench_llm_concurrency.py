@@ -0,0 +1,55 @@
+"""
+LLM Concurrency Benchmark - Shows that concurrent completions overlap
+Fires N completions at a local fake server and fails unless they finish in about the
+time of a single call and a short per-call timeout actually fires
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from ContextualDecisionEngine.utils.openai_client import OpenAIClient
+from ContextualDecisionEngine.scripts.fake_llm_server import FakeLLMServer
+
+
+async def run(base_url: str, concurrency: int, max_ratio: float) -> bool:
+    client = OpenAIClient(max_concurrency=concurrency, base_url=base_url)
+
+    start = time.perf_counter()
+    await client.chat_completion("ping")
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client.chat_completion(f"ping {i}") for i in range(concurrency)])
+    batch = time.perf_counter() - start
+
+    # A short per-call timeout cancels the in-flight request
+    try:
+        await client.chat_completion("slow", timeout=0.05)
+        timed_out = False
+    except Exception as e:
+        timed_out = "timed out" in str(e)
+
+    await client.aclose()
+
+    print(f"single call:          {single:.3f}s")
+    overlapped = batch <= single * max_ratio
+    print(f"{concurrency} concurrent calls: {batch:.3f}s ({batch / single:.2f}x a single call, limit {max_ratio}x) overlapped={overlapped}")
+    print(f"per-call timeout honoured: {timed_out}")
+    return overlapped and timed_out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.5, help="Injected server latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=20, help="Number of concurrent completions")
+    parser.add_argument("--max-ratio", type=float, default=1.5, help="Allowed concurrent time as a multiple of one call")
+    args = parser.parse_args()
+
+    with FakeLLMServer(latency=args.latency) as server:
+        ok = asyncio.run(run(server.base_url, args.concurrency, args.max_ratio))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Memory Store Benchmark - Insert throughput and read latency under concurrent writes
+Compares the pooled WAL MemoryStore with the old connect-per-call pattern
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import argparse
+import tempfile
+import threading
+from ContextualDecisionEngine.memory.store import MemoryStore
+
+
+class ConnectPerCallStore(MemoryStore):
+    """The previous access pattern: global lock, fresh connection, rollback journal"""
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+
+    def store_classification(self, classification_data):
+        with self.lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT INTO classifications (id, timestamp, format, intent, content_preview, confidence_score, metadata) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (str(uuid.uuid4()), self.get_current_timestamp(), classification_data['format'],
+                 classification_data['intent'], '', 0.9, json.dumps(classification_data))
+            )
+            conn.commit()
+            conn.close()
+
+    def get_agent_results(self, agent_type=None, limit=100):
+        with self.lock:
+            conn = self._connect()
+            rows = conn.execute('SELECT * FROM agent_results ORDER BY timestamp DESC LIMIT ?', (limit,)).fetchall()
+            conn.close()
+            return rows
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def bench(store: MemoryStore, inserts: int, readers: int) -> None:
+    store.init_db()
+    for _ in range(200):
+        store.store_agent_result("email", {"agent_type": "Email", "payload": "x" * 200})
+
+    row = {"format": "Email", "intent": "Customer Service"}
+    start = time.perf_counter()
+    for _ in range(inserts):
+        store.store_classification(row)
+    insert_rate = inserts / (time.perf_counter() - start)
+
+    # Readers query while a writer keeps inserting
+    latencies = []
+    stop = threading.Event()
+
+    def writer():
+        while not stop.is_set():
+            store.store_classification(row)
+
+    def reader():
+        for _ in range(100):
+            t = time.perf_counter()
+            store.get_agent_results(limit=20)
+            latencies.append((time.perf_counter() - t) * 1000)
+
+    writer_thread = threading.Thread(target=writer)
+    writer_thread.start()
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in reader_threads:
+        thread.start()
+    for thread in reader_threads:
+        thread.join()
+    stop.set()
+    writer_thread.join()
+
+    print(
+        f"{type(store).__name__:<20} inserts/s={insert_rate:9.0f}  "
+        f"read p50={percentile(latencies, 50):6.2f}ms  p99={percentile(latencies, 99):6.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--inserts", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench(ConnectPerCallStore(os.path.join(tmp, "before.db")), args.inserts, args.readers)
+        store = MemoryStore(os.path.join(tmp, "after.db"))
+        bench(store, args.inserts, args.readers)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+PDF Extraction Benchmark - Sequential concatenation vs page-parallel extraction
+Generates multi-hundred-page PDFs and times the old per-page string concatenation
+against PDFTextExtractor, measuring event loop lag while extraction runs
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import PyPDF2
+from ContextualDecisionEngine.utils.pdf_extraction import PDFTextExtractor
+from ContextualDecisionEngine.scripts.pdf_fixtures import build_pdf, report_pages
+
+
+def extract_sequential(pdf_path: str) -> str:
+    """The original PDFAgent extraction: one pass, string concatenation"""
+    text = ""
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page_num in range(len(pdf_reader.pages)):
+            text += pdf_reader.pages[page_num].extract_text() + "\n"
+    return text.strip()
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def timed_on_loop(extract) -> tuple:
+    """Run an extraction while a ticker measures how long the loop is blocked"""
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(stop))
+    await asyncio.sleep(0.02)
+    started = time.perf_counter()
+    text = await extract()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return text, elapsed, await ticker
+
+
+async def run(page_counts, workers: int, pages_per_task: int):
+    extractor = PDFTextExtractor(max_workers=workers, pages_per_task=pages_per_task)
+    print(f"cpus={os.cpu_count()} workers={extractor.max_workers} pages_per_task={extractor.pages_per_task}")
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        # Warm the worker processes so pool start-up is not billed to the first document
+        warm_path = os.path.join(tmp, "warm.pdf")
+        with open(warm_path, "wb") as f:
+            f.write(build_pdf(report_pages(extractor.parallel_min_pages, 2)))
+        await extractor.extract_text(warm_path)
+
+        for count in page_counts:
+            path = os.path.join(tmp, f"report_{count}.pdf")
+            with open(path, "wb") as f:
+                f.write(build_pdf(report_pages(count)))
+
+            async def sequential():
+                return extract_sequential(path)
+
+            seq_text, seq_time, seq_lag = await timed_on_loop(sequential)
+            par_text, par_time, par_lag = await timed_on_loop(lambda: extractor.extract_text(path))
+
+            first_page_started = time.perf_counter()
+            async for _ in extractor.iter_pages(path):
+                break
+            first_page = time.perf_counter() - first_page_started
+
+            match = seq_text == par_text
+            ok = ok and match
+            print(
+                f"pages={count:4d} sequential={seq_time * 1000:8.1f}ms (loop lag {seq_lag * 1000:7.1f}ms) "
+                f"extractor={par_time * 1000:8.1f}ms (loop lag {par_lag * 1000:6.1f}ms) "
+                f"first_page={first_page * 1000:6.1f}ms identical={match}"
+            )
+    extractor.shutdown()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 300, 500])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--pages-per-task", type=int, default=None)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args.pages, args.workers, args.pages_per_task))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
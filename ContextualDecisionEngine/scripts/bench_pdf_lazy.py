@@ -0,0 +1,92 @@
+"""
+Lazy PDF Benchmark - Full vs page-budgeted PDFAgent processing
+Runs PDFAgent over a long invoice (answer on page one) and a long policy document
+in both modes with a stubbed LLM, reporting time and pages read
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from ContextualDecisionEngine.agents.pdf_agent import PDFAgent
+from ContextualDecisionEngine.memory.store import MemoryStore
+from ContextualDecisionEngine.utils.pdf_extraction import PDFTextExtractor
+from ContextualDecisionEngine.scripts.pdf_fixtures import build_pdf, report_pages
+
+
+class StubLLMClient:
+    """Stands in for OpenAIClient; answers instantly so only extraction is timed"""
+
+    async def chat_completion(self, prompt: str, **kwargs) -> str:
+        if "invoice information" in prompt:
+            return json.dumps({"invoice_number": "INV-2024-001", "total_amount": 12500.0, "line_items": []})
+        return json.dumps({"document_type": "report", "policy_title": "Data Handling Policy"})
+
+
+def invoice_pages(count: int):
+    first = "ACME Corp INVOICE\nInvoice Number: INV-2024-001\nPayment terms: net 30\nTotal: $12,500.00\nAmount due: $12,500.00"
+    return [first] + report_pages(count - 1)
+
+
+def policy_pages(count: int):
+    first = "Data Handling Policy\nThis policy sets the procedure and guidelines for compliance with GDPR."
+    return [first] + report_pages(count - 1)
+
+
+async def run(args) -> bool:
+    extractor = PDFTextExtractor(max_workers=args.workers)
+    ok = True
+    with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+        store = MemoryStore(os.path.join(tmp, "bench.db"))
+        store.init_db()
+        agents = {mode: PDFAgent(store, openai_client=StubLLMClient(), extractor=extractor, mode=mode) for mode in PDFAgent.MODES}
+
+        # Warm the worker pool so start-up is not billed to the first run
+        warm_path = os.path.join(tmp, "warm.pdf")
+        with open(warm_path, "wb") as f:
+            f.write(build_pdf(report_pages(extractor.parallel_min_pages, 2)))
+        await extractor.extract_text(warm_path)
+
+        for name, pages in (("invoice", invoice_pages), ("policy", policy_pages)):
+            path = os.path.join(tmp, f"{name}_{args.pages}.pdf")
+            with open(path, "wb") as f:
+                f.write(build_pdf(pages(args.pages)))
+
+            results = {}
+            for mode, agent in agents.items():
+                started = time.perf_counter()
+                result = await agent.process(path, {})
+                elapsed = time.perf_counter() - started
+                results[mode] = result
+                budget = result.get("page_budget") or {"pages_read": args.pages, "stop_reason": None}
+                print(
+                    f"{name:<8} pages={args.pages} mode={mode:<5} time={elapsed * 1000:8.1f}ms "
+                    f"type={result['document_type']:<8} pages_read={budget['pages_read']:4d} stop={budget['stop_reason']}"
+                )
+
+            # Both modes must reach the same decision
+            same = all(
+                results["full"][key] == results["lazy"][key]
+                for key in ("document_type", "flags", "compliance_flags")
+            )
+            ok = ok and same
+            print(f"{name:<8} decisions identical={same}")
+
+        store.close()
+    extractor.shutdown()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Rule Engine Benchmark - Routing latency with hundreds of compiled rules
+Generates a rule file with a large first-match group and many independent rules,
+then times RuleEngine.evaluate for matching and non-matching agent results
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+from ContextualDecisionEngine.routers.rule_engine import RuleEngine
+
+
+def build_rules(group_rules: int, independent_rules: int) -> dict:
+    rules = []
+    # One first-match group keyed on the same field compiles to a dict lookup
+    for i in range(group_rules):
+        rules.append({
+            "name": f"category_{i}",
+            "group": "category",
+            "when": {"field": "category", "equals": f"c{i}"},
+            "action": {"type": "crm_log", "priority": "low", "data": {"category": {"$ref": "category"}}}
+        })
+    # Independent rules are each checked on every evaluation
+    for i in range(independent_rules):
+        rules.append({
+            "name": f"threshold_{i}",
+            "when": {"all": [
+                {"field": "score", "gt": i},
+                {"field": "region", "in": [f"r{i}", f"r{i + 1}"]}
+            ]},
+            "action": {"type": "risk_alert", "priority": "high", "data": {"score": {"$ref": "score"}}}
+        })
+    rules.append({"name": "fallback", "fallback": True, "action": {"type": "log_only", "priority": "low"}})
+    return {"version": 1, "agents": {"bench": rules}}
+
+
+def time_evaluate(engine: RuleEngine, agent_result: dict, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        engine.evaluate(agent_result)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--group-rules", type=int, default=400)
+    parser.add_argument("--independent-rules", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rules.json")
+        with open(path, "w") as f:
+            json.dump(build_rules(args.group_rules, args.independent_rules), f)
+
+        start = time.perf_counter()
+        engine = RuleEngine(path, reload_interval=1)
+        print(f"{args.group_rules + args.independent_rules + 1} rules compiled in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        cases = {
+            "group hit + 2 independent hits": {"agent_type": "bench", "category": f"c{args.group_rules - 1}", "score": 50, "region": "r10"},
+            "no match (fallback)": {"agent_type": "bench", "category": "none", "score": -1, "region": "none"},
+            "unknown agent type": {"agent_type": "other"}
+        }
+        for label, agent_result in cases.items():
+            actions = len(engine.evaluate(agent_result))
+            print(f"{label:<32} {time_evaluate(engine, agent_result, args.iterations):8.2f}us per evaluate ({actions} actions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Circuit Breaker Check - Shows a degraded action target failing fast once its breaker opens
+Warms a healthy target so its timeout adapts, degrades it, then times calls while the
+breaker is open and after the half-open probe succeeds
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from fastapi import FastAPI
+from ContextualDecisionEngine.routers.http_transport import ActionTransport
+from ContextualDecisionEngine.routers.circuit_breaker import CircuitOpenError
+from ContextualDecisionEngine.scripts.fake_llm_server import BackgroundServer
+
+
+def build_target(state: dict) -> FastAPI:
+    """Compliance endpoint whose latency is switched at runtime"""
+    app = FastAPI()
+
+    @app.post("/compliance/flag")
+    async def compliance_flag(data: dict):
+        await asyncio.sleep(state["latency"])
+        return {"success": True}
+
+    return app
+
+
+async def timed_call(transport: ActionTransport, url: str):
+    start = time.perf_counter()
+    try:
+        await transport.post_json(url, {})
+        outcome = "ok"
+    except CircuitOpenError:
+        outcome = "short-circuited"
+    except Exception as e:
+        outcome = type(e).__name__
+    return outcome, time.perf_counter() - start
+
+
+async def run(base_url: str, state: dict, degraded_latency: float, reset: float) -> bool:
+    url = f"{base_url}/compliance/flag"
+    transport = ActionTransport(default_timeout=10, breaker_failures=3, breaker_reset=reset)
+
+    for _ in range(transport.min_samples):
+        await transport.post_json(url, {})
+    print(f"healthy: adaptive timeout {transport.timeout_for(url):.2f}s (configured 10s)")
+
+    state["latency"] = degraded_latency
+    print(f"degraded to {degraded_latency}s per call:")
+    open_costs = []
+    for i in range(8):
+        outcome, elapsed = await timed_call(transport, url)
+        print(f"  call {i + 1}: {outcome:<16} {elapsed * 1000:9.3f}ms")
+        if outcome == "short-circuited":
+            open_costs.append(elapsed)
+
+    state["latency"] = 0.0
+    await asyncio.sleep(reset)
+    outcome, elapsed = await timed_call(transport, url)
+    breaker = transport.get_stats()["targets"]["/compliance/flag"]["breaker"]
+    print(f"recovered: half-open probe {outcome} in {elapsed * 1000:.1f}ms, breaker {breaker['state']}")
+    await transport.aclose()
+
+    worst_open = max(open_costs) if open_costs else float("inf")
+    print(f"worst short-circuited call: {worst_open * 1e6:.0f}us")
+    return worst_open < 0.001 and breaker["state"] == "closed"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--degraded-latency", type=float, default=3.0)
+    parser.add_argument("--reset", type=float, default=1.0, help="Breaker reset timeout in seconds")
+    args = parser.parse_args()
+
+    state = {"latency": 0.0}
+    with BackgroundServer(build_target(state)) as server:
+        ok = asyncio.run(run(server.url, state, args.degraded_latency, args.reset))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
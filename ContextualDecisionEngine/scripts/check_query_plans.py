@@ -0,0 +1,119 @@
+"""
+Query Plan Check - Verifies every public MemoryStore getter is served by an index
+Captures the SQL each getter runs, then fails on full table scans or temp sort trees
+"""
+
+import os
+import sys
+import tempfile
+from typing import List, Tuple
+from ContextualDecisionEngine.memory.store import MemoryStore
+
+
+def seed(store: MemoryStore) -> Tuple[str, str, str]:
+    """Write a handful of linked rows so the planner sees realistic tables"""
+    classification, action_result, trace_id = None, None, None
+    for i in range(20):
+        classification = {"format": "Email", "intent": "Customer Service", "content_preview": f"row {i}"}
+        classification["classification_id"] = store.store_classification(classification)
+        agent_result = {"agent_type": "Email"}
+        agent_result["agent_result_id"] = store.store_agent_result("email", agent_result, classification["classification_id"])
+        action_result = {"actions_triggered": []}
+        action_result["action_result_id"] = store.store_action_result(action_result, agent_result["agent_result_id"])
+        trace_id = store.log_complete_trace(classification, agent_result, action_result, parent_trace_id=trace_id)
+        store.log_decision("action_router", "action_routing", {}, trace_id=trace_id)
+        store.enqueue_actions(trace_id, action_result["action_result_id"], [
+            {"outbox_id": f"{trace_id}:0", "action_index": 0, "action_type": "crm_log", "payload": {}}
+        ])
+    return classification["classification_id"], action_result["action_result_id"], trace_id
+
+
+def capture(store: MemoryStore, call) -> List[str]:
+    """Run a getter and return the SQL statements it executed"""
+    statements = []
+    with store._read_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        store.read_pool.put(conn)  # Hand the traced connection to the getter
+        try:
+            call()
+        finally:
+            store.read_pool.get_nowait()
+            conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+
+
+def plan_problems(store: MemoryStore, sql: str, filtered: bool) -> List[str]:
+    """Full scans and temp sorts are problems; filtered getters must also seek, not walk, an index"""
+    with store._read_connection() as conn:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    details = [row[-1] for row in rows]
+    problems = []
+    for detail in details:
+        if detail.startswith("SCAN") and "USING" not in detail:
+            problems.append(detail)
+        if "TEMP B-TREE" in detail:
+            problems.append(detail)
+    if filtered and not details[0].startswith("SEARCH"):
+        problems.append(f"filter not served by an index seek: {details[0]}")
+    return problems
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MemoryStore(os.path.join(tmp, "plans.db"), read_pool_size=1)
+        store.init_db()
+        classification_id, action_result_id, trace_id = seed(store)
+        page_cursor = store.get_traces_page(limit=5)["next_cursor"]
+
+        # (name, call, whether the query filters rows)
+        getters: List[Tuple[str, object, bool]] = [
+            ("get_classification", lambda: store.get_classification(classification_id), True),
+            ("get_agent_results", lambda: store.get_agent_results(), False),
+            ("get_agent_results(agent_type)", lambda: store.get_agent_results(agent_type="email"), True),
+            ("get_all_traces", lambda: store.get_all_traces(), False),
+            ("get_traces_page(cursor)", lambda: store.get_traces_page(limit=5, cursor=page_cursor), True),
+            ("get_traces_page(format)", lambda: store.get_traces_page(format="Email", fields=["format", "intent", "status"]), True),
+            ("get_traces_page(intent)", lambda: store.get_traces_page(intent="Customer Service"), True),
+            ("get_traces_page(since)", lambda: store.get_traces_page(since="2024-01-01T00:00:00"), True),
+            ("get_traces_page(until)", lambda: store.get_traces_page(until="2099-01-01T00:00:00"), True),
+            ("get_traces_page(since, until)", lambda: store.get_traces_page(
+                since="2024-01-01T00:00:00", until="2099-01-01T00:00:00"
+            ), True),
+            ("get_traces_page(format, intent)", lambda: store.get_traces_page(
+                format="Email", intent="Customer Service"
+            ), True),
+            ("get_traces_page(format, since, until)", lambda: store.get_traces_page(
+                format="Email", since="2024-01-01T00:00:00", until="2099-01-01T00:00:00"
+            ), True),
+            ("get_traces_page(intent, since, until)", lambda: store.get_traces_page(
+                intent="Customer Service", since="2024-01-01T00:00:00", until="2099-01-01T00:00:00"
+            ), True),
+            ("get_traces_page(format, intent, since, until)", lambda: store.get_traces_page(
+                format="Email", intent="Customer Service", since="2024-01-01T00:00:00", until="2099-01-01T00:00:00"
+            ), True),
+            ("get_traces_page(format, intent, since, until, cursor)", lambda: store.get_traces_page(
+                limit=5, cursor=page_cursor, format="Email", intent="Customer Service",
+                since="2024-01-01T00:00:00", until="2099-01-01T00:00:00"
+            ), True),
+            ("get_trace", lambda: store.get_trace(trace_id), True),
+            ("get_child_traces", lambda: store.get_child_traces(trace_id), True),
+            ("get_decision_logs", lambda: store.get_decision_logs(), False),
+            ("get_decision_logs(component)", lambda: store.get_decision_logs(component="action_router"), True),
+            ("get_action_deliveries", lambda: store.get_action_deliveries(action_result_id), True),
+            ("get_outbox_stats", lambda: store.get_outbox_stats(), False),
+        ]
+
+        failures = 0
+        for name, call, filtered in getters:
+            for sql in capture(store, call):
+                problems = plan_problems(store, sql, filtered)
+                status = "FAIL" if problems else "ok"
+                print(f"{status:<4} {name}" + (f": {'; '.join(problems)}" if problems else ""))
+                failures += bool(problems)
+
+        store.close()
+        return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Fake LLM Server - Local stand-in for the OpenAI chat completions API
+Answers every completion after a fixed delay so benchmarks run without network access
+"""
+
+import time
+import socket
+import asyncio
+import threading
+import uvicorn
+from fastapi import FastAPI, Request
+
+
+def build_app(latency: float, content: str = '{"result": "ok"}') -> FastAPI:
+    """Build a FastAPI app that mimics POST /v1/chat/completions"""
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(latency)
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+        }
+
+    return app
+
+
+class BackgroundServer:
+    """Runs a FastAPI app with uvicorn on a background thread"""
+
+    def __init__(self, app: FastAPI):
+        self.port = self._free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+    @staticmethod
+    def _free_port() -> int:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+
+class FakeLLMServer(BackgroundServer):
+    """Runs the fake completion app on a background thread"""
+
+    def __init__(self, latency: float = 0.5, content: str = '{"result": "ok"}'):
+        super().__init__(build_app(latency, content))
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/v1"
@@ -0,0 +1,57 @@
+"""
+PDF Fixtures - Minimal PDF writer for generating test documents of any length
+Each page is one Helvetica text block; PyPDF2 extracts the lines back verbatim
+"""
+
+from typing import List
+
+
+def _escape(line: str) -> bytes:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace")
+
+
+def build_pdf(pages: List[str]) -> bytes:
+    """Build a PDF with one page per string; newlines start new text lines"""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    content_ids = []
+    for text in pages:
+        stream = b"BT /F1 11 Tf 50 750 Td 14 TL " + b" ".join(b"(" + _escape(line) + b") '" for line in text.split("\n")) + b" ET"
+        content_ids.append(add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"))
+
+    # Page objects reference the page tree, so the tree id is fixed before they are written
+    pages_id = len(objects) + len(pages) + 1
+    page_ids = [
+        add(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font_id, content_id))
+        for content_id in content_ids
+    ]
+    add(b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % page_id for page_id in page_ids) + b"] /Count %d >>" % len(page_ids))
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref)
+    return bytes(out)
+
+
+def report_pages(count: int, lines_per_page: int = 40) -> List[str]:
+    """Filler pages shaped like a long financial report"""
+    return [
+        "\n".join(
+            f"Section {page + 1}.{line + 1}: revenue, expenses and accruals for period {line % 12 + 1} reconciled against ledger {page * lines_per_page + line}"
+            for line in range(lines_per_page)
+        )
+        for page in range(count)
+    ]
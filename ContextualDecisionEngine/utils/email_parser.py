@@ -0,0 +1,191 @@
+"""
+Email Parser - Deterministic RFC 822/MIME parsing with the standard library
+Reads header fields (decoding RFC 2047 encoded words), picks the text body of
+multipart messages, lists attachments and strips quoted reply history
+"""
+
+import os
+import re
+import html
+from email import policy
+from email.parser import Parser
+from email.message import EmailMessage
+from email.utils import getaddresses, parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+from ContextualDecisionEngine.utils.format_sniffer import sniff_format
+
+# Lines that open a quoted earlier message; everything from them on is reply history
+REPLY_MARKERS = [
+    re.compile(r'^On .{0,200}wrote:\s*$'),
+    re.compile(r'^-{2,}\s*Original Message\s*-{2,}\s*$', re.IGNORECASE),
+    re.compile(r'^-{2,}\s*Forwarded message\s*-{2,}\s*$', re.IGNORECASE),
+    re.compile(r'^_{10,}\s*$'),
+]
+# Outlook-style reply header: a From: line followed shortly by Sent:/Date:
+OUTLOOK_FROM = re.compile(r'^From:\s+\S', re.IGNORECASE)
+OUTLOOK_SENT = re.compile(r'^(Sent|Date):\s+\S', re.IGNORECASE)
+
+# Display names containing these must be quoted to stay parseable as an address list
+ADDRESS_SPECIALS = re.compile(r'[()<>\[\]:;@\\,."]')
+
+HTML_BREAKS = re.compile(r'<\s*(br|/p|/div|/tr|/li|/h[1-6])\b[^>]*>', re.IGNORECASE)
+HTML_DROP = re.compile(r'<\s*(script|style)\b.*?<\s*/\s*\1\s*>', re.IGNORECASE | re.DOTALL)
+HTML_TAGS = re.compile(r'<[^>]+>')
+
+
+class ParsedEmail:
+    def __init__(
+        self,
+        headers: Dict[str, str],
+        body: str,
+        quoted: str,
+        attachments: List[Dict[str, Any]],
+        has_headers: bool
+    ):
+        self.headers = headers
+        # Body without quoted reply history, and the history that was removed
+        self.body = body
+        self.quoted = quoted
+        self.attachments = attachments
+        # False when the input carried no RFC 822 header block at all
+        self.has_headers = has_headers
+
+    def header_fields(self) -> Dict[str, Any]:
+        """Structured fields the headers state exactly; absent headers are left out"""
+        fields = {}
+        sender = _addresses(self.headers.get("from"))
+        if sender:
+            fields["sender"] = sender[0]
+        recipients = _addresses(self.headers.get("to"))
+        if recipients:
+            fields["recipient"] = ", ".join(recipients)
+        cc = _addresses(self.headers.get("cc"))
+        if cc:
+            fields["cc"] = cc
+        if self.headers.get("subject"):
+            fields["subject"] = self.headers["subject"]
+        date = _iso_date(self.headers.get("date"))
+        if date:
+            fields["date"] = date
+        if self.headers.get("message-id"):
+            fields["message_id"] = self.headers["message-id"]
+        return fields
+
+    def text_for_analysis(self) -> str:
+        """Subject plus the reply-stripped body: the part of the message written by its sender"""
+        subject = self.headers.get("subject")
+        return f"Subject: {subject}\n\n{self.body}" if subject else self.body
+
+
+def parse_email(raw: str, sniff_threshold: Optional[float] = None) -> ParsedEmail:
+    """
+    Parse a raw message into headers, a plain-text body and attachments
+
+    Input without a header block (a pasted body) is returned as the body unchanged.
+    A header block counts when the format sniffer calls the input Email with at least
+    sniff_threshold confidence, SNIFF_THRESHOLD by default as for the classifier.
+    """
+    if sniff_threshold is None:
+        sniff_threshold = float(os.getenv("SNIFF_THRESHOLD", "0.9"))
+    if not _starts_with_headers(raw, sniff_threshold):
+        body, quoted = strip_quoted_reply(raw.strip())
+        return ParsedEmail({}, body, quoted, [], False)
+
+    message: EmailMessage = Parser(policy=policy.default).parsestr(raw.lstrip())
+    # policy.default decodes RFC 2047 encoded words and unfolds continuation lines
+    headers = {}
+    for name, value in message.items():
+        headers.setdefault(name.lower(), str(value).strip())
+
+    body, quoted = strip_quoted_reply(_text_body(message).strip())
+    return ParsedEmail(headers, body, quoted, _attachments(message), True)
+
+
+def strip_quoted_reply(text: str) -> Tuple[str, str]:
+    """Split text into the new message and the quoted history below it"""
+    lines = text.splitlines()
+    kept = []
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if any(marker.match(stripped) for marker in REPLY_MARKERS) or _outlook_header(lines, index):
+            return "\n".join(kept).strip(), "\n".join(lines[index:]).strip()
+        if stripped.startswith(">"):
+            continue  # Inline quote
+        kept.append(line)
+
+    quoted = "\n".join(line for line in lines if line.strip().startswith(">"))
+    return "\n".join(kept).strip(), quoted.strip()
+
+
+def _outlook_header(lines: List[str], index: int) -> bool:
+    """A From: line after a blank line, with Sent:/Date: within the next few lines"""
+    if index == 0 or lines[index - 1].strip() or not OUTLOOK_FROM.match(lines[index].strip()):
+        return False
+    return any(OUTLOOK_SENT.match(line.strip()) for line in lines[index + 1:index + 4])
+
+
+def _starts_with_headers(raw: str, sniff_threshold: float) -> bool:
+    sniffed = sniff_format(raw)
+    return sniffed["format"] == "Email" and sniffed["confidence"] >= sniff_threshold
+
+
+def _text_body(message: EmailMessage) -> str:
+    """Prefer text/plain, fall back to text/html rendered as text"""
+    part = message.get_body(preferencelist=("plain", "html"))
+    if part is None:
+        return ""
+    try:
+        content = part.get_content()
+    except (LookupError, UnicodeDecodeError):
+        # Unknown or wrong charset declaration
+        content = part.get_payload(decode=True).decode("utf-8", errors="replace")
+    if part.get_content_subtype() == "html":
+        return html_to_text(content)
+    return content
+
+
+def html_to_text(markup: str) -> str:
+    text = HTML_DROP.sub("", markup)
+    text = HTML_BREAKS.sub("\n", text)
+    text = html.unescape(HTML_TAGS.sub("", text))
+    return re.sub(r'\n\s*\n+', '\n\n', text)
+
+
+def _attachments(message: EmailMessage) -> List[Dict[str, Any]]:
+    """Decoded attachment parts with their filename and declared content type"""
+    attachments = []
+    for part in message.iter_attachments():
+        payload = part.get_payload(decode=True)
+        if payload is None:
+            continue  # message/rfc822 and other container parts
+        attachments.append({
+            "filename": part.get_filename() or "",
+            "content_type": part.get_content_type(),
+            "size": len(payload),
+            "payload": payload
+        })
+    return attachments
+
+
+def _addresses(value: Optional[str]) -> List[str]:
+    """Addresses of a header, formatted as "Name <address>" when a display name is given"""
+    if not value:
+        return []
+    addresses = []
+    for name, address in getaddresses([value]):
+        if name and ADDRESS_SPECIALS.search(name):
+            name = '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
+        if address:
+            addresses.append(f"{name} <{address}>" if name else address)
+        elif name:
+            addresses.append(name)
+    return addresses
+
+
+def _iso_date(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).isoformat()
+    except (TypeError, ValueError):
+        return value
@@ -0,0 +1,77 @@
+"""
+Format Sniffer - Deterministic structural format detection without an LLM call
+Recognises PDF magic bytes, parseable JSON and RFC 822 header blocks
+"""
+
+import re
+import json
+from typing import Dict, Any, Union
+
+# Header names that commonly open an RFC 822 message
+EMAIL_HEADERS = {
+    "from", "to", "cc", "bcc", "subject", "date", "reply-to", "sender",
+    "message-id", "mime-version", "content-type", "received", "return-path"
+}
+
+HEADER_LINE = re.compile(r'^([A-Za-z][A-Za-z0-9-]*):[ \t]*(.*)$')
+
+
+def sniff_format(content: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Detect the input format from its structure
+
+    Args:
+        content: Raw input, either text or the leading bytes of an upload
+
+    Returns:
+        Dictionary with the detected format (None if undecided), a confidence
+        between 0 and 1 and a short reason
+    """
+    if isinstance(content, bytes):
+        if content.lstrip()[:5] == b"%PDF-":
+            return _result("PDF", 1.0, "PDF magic bytes")
+        content = content.decode("utf-8", errors="replace")
+
+    stripped = content.lstrip()
+    if not stripped:
+        return _result(None, 0.0, "empty input")
+
+    if stripped.startswith("%PDF-"):
+        return _result("PDF", 0.99, "PDF magic bytes")
+
+    if stripped.startswith(("{", "[")):
+        try:
+            json.loads(content)
+            return _result("JSON", 0.99, "parses as JSON")
+        except ValueError:
+            return _result("JSON", 0.6, "starts like JSON but does not parse")
+
+    return _sniff_email(stripped)
+
+
+def _sniff_email(text: str) -> Dict[str, Any]:
+    """Score the leading header block of a possible RFC 822 message"""
+    headers = set()
+    for line in text.splitlines()[:50]:
+        if not line.strip():
+            break  # Blank line ends the header block
+        if line[0] in " \t":
+            continue  # Folded continuation of the previous header
+        match = HEADER_LINE.match(line)
+        if not match:
+            break
+        headers.add(match.group(1).lower())
+
+    known = headers & EMAIL_HEADERS
+    if "from" in known and ("subject" in known or "to" in known):
+        return _result("Email", 0.95, f"RFC 822 headers: {', '.join(sorted(known))}")
+    if len(known) >= 2:
+        return _result("Email", 0.9, f"RFC 822 headers: {', '.join(sorted(known))}")
+    if known:
+        return _result("Email", 0.6, f"single header: {', '.join(known)}")
+
+    return _result(None, 0.0, "no structural markers")
+
+
+def _result(format_name, confidence: float, reason: str) -> Dict[str, Any]:
+    return {"format": format_name, "confidence": confidence, "reason": reason}
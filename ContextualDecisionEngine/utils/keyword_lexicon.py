@@ -0,0 +1,177 @@
+"""
+Keyword Lexicon - Multi-pattern keyword matching shared by every agent
+Compiles keyword categories once and answers hit and count queries for all categories
+from one scan; large vocabularies run through an Aho-Corasick automaton in a single pass
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+class KeywordHits:
+    """
+    Result of one lexicon scan
+    
+    Automaton scans arrive with every count known. Substring scans keep the lowercased
+    text and look keywords up on demand, once each, so first-match checks still stop early.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]], counts: Dict[str, int], text_lower: Optional[str] = None):
+        self.categories = categories
+        # Non-overlapping occurrences per keyword, the same as str.count
+        self.counts = counts
+        self.text_lower = text_lower
+        self.present: Dict[str, bool] = {}
+
+    def _is_present(self, keyword: str) -> bool:
+        if self.text_lower is None:
+            return keyword in self.counts
+        if keyword not in self.present:
+            self.present[keyword] = keyword in self.text_lower
+        return self.present[keyword]
+
+    def count(self, keyword: str) -> int:
+        keyword = keyword.lower()
+        if self.text_lower is not None and keyword not in self.counts:
+            self.counts[keyword] = self.text_lower.count(keyword) if self._is_present(keyword) else 0
+        return self.counts.get(keyword, 0)
+
+    def found(self, category: str) -> List[str]:
+        """Keywords of a category present in the text, in the order they were declared"""
+        return [keyword for keyword in self.categories[category] if self._is_present(keyword)]
+
+    def any(self, category: str) -> bool:
+        return any(self._is_present(keyword) for keyword in self.categories[category])
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        return {
+            category: {keyword: self.count(keyword) for keyword in self.found(category)}
+            for category in self.categories
+        }
+
+
+class KeywordLexicon:
+    # automaton: one pass finds every keyword; substring: lowercase once, then C substring
+    # search per keyword on demand, which is faster until the vocabulary gets large
+    ENGINES = ("auto", "automaton", "substring")
+    AUTOMATON_MIN_KEYWORDS = 100
+
+    def __init__(self, categories: Dict[str, Iterable[str]], engine: str = "auto"):
+        """
+        Compile keyword categories for case-insensitive substring matching
+
+        Args:
+            categories: Category name to keywords; a keyword may appear in several categories
+            engine: "automaton", "substring" or "auto" (picked by vocabulary size)
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown lexicon engine: {engine}")
+        self.categories: Dict[str, List[str]] = {
+            name: [keyword.lower() for keyword in keywords] for name, keywords in categories.items()
+        }
+        self.keywords = list(dict.fromkeys(
+            keyword for keywords in self.categories.values() for keyword in keywords
+        ))
+        if any(not keyword for keyword in self.keywords):
+            raise ValueError("Lexicon keywords must not be empty")
+
+        if engine == "auto":
+            engine = "automaton" if len(self.keywords) >= self.AUTOMATON_MIN_KEYWORDS else "substring"
+        self.engine = engine
+
+        self.max_length = max((len(keyword) for keyword in self.keywords), default=0)
+        self.prefilter = None
+        if self.engine == "automaton" and self.keywords:
+            self.transitions, self.outputs = self._build_automaton(self.keywords)
+            # The regex engine skips text where no keyword can start far faster than a Python loop,
+            # so the automaton only walks the windows around candidate matches
+            self.prefilter = re.compile(self._trie_pattern(self.keywords))
+
+    @staticmethod
+    def _build_automaton(keywords: List[str]):
+        """Keyword trie with failure links folded into a full transition table"""
+        trie: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword:
+                if char not in trie[state]:
+                    trie.append({})
+                    outputs.append([])
+                    trie[state][char] = len(trie) - 1
+                state = trie[state][char]
+            outputs[state].append(index)
+
+        transitions: List[Dict[str, int]] = [dict() for _ in trie]
+        transitions[0] = dict(trie[0])
+        failure = [0] * len(trie)
+        queue = deque(trie[0].values())
+        while queue:
+            state = queue.popleft()
+            # The failure state is shallower, so its transitions are already complete
+            transitions[state] = dict(transitions[failure[state]], **trie[state])
+            for char, child in trie[state].items():
+                failure[child] = transitions[failure[state]].get(char, 0)
+                outputs[child] = outputs[child] + outputs[failure[child]]
+                queue.append(child)
+        return transitions, outputs
+
+    @staticmethod
+    def _trie_pattern(keywords: List[str]) -> str:
+        """Regex matching any keyword, factored by shared prefixes so each position fails fast"""
+        trie: Dict[str, dict] = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def emit(node: Dict[str, dict]) -> str:
+            branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            return "(?:" + pattern + ")?" if "" in node else pattern
+
+        return emit(trie)
+
+    def scan(self, text: str) -> KeywordHits:
+        """Match every category against the text; the automaton finds all keywords in one pass"""
+        counts: Dict[str, int] = {}
+        text_lower = text.lower()
+        if self.engine == "substring":
+            return KeywordHits(self.categories, counts, text_lower)
+        if not self.prefilter:
+            return KeywordHits(self.categories, counts)
+
+        last_end: Dict[int, int] = {}
+        window_start = window_stop = -1
+        for match in self.prefilter.finditer(text_lower):
+            # Keywords starting inside this match were skipped by the regex; the window covers them
+            stop = match.end() - 1 + self.max_length
+            if match.start() < window_stop:
+                window_stop = max(window_stop, stop)
+                continue
+            if window_start >= 0:
+                self._walk(text_lower, window_start, window_stop, counts, last_end)
+            window_start, window_stop = match.start(), stop
+        if window_start >= 0:
+            self._walk(text_lower, window_start, window_stop, counts, last_end)
+
+        return KeywordHits(self.categories, counts)
+
+    def _walk(self, text: str, start: int, stop: int, counts: Dict[str, int], last_end: Dict[int, int]):
+        """Run the automaton over text[start:stop], counting non-overlapping occurrences"""
+        transitions = self.transitions
+        outputs = self.outputs
+        keywords = self.keywords
+        state = 0
+        for position, char in enumerate(text[start:stop], start):
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                for index in outputs[state]:
+                    keyword = keywords[index]
+                    if position + 1 - len(keyword) >= last_end.get(index, 0):
+                        counts[keyword] = counts.get(keyword, 0) + 1
+                        last_end[index] = position + 1
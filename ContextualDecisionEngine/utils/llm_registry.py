@@ -0,0 +1,214 @@
+"""
+LLM Client Registry - Process-wide pool shared by every agent's OpenAI client
+Owns one keep-alive connection pool, a global request/token budget and per-agent quotas
+"""
+
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+from openai import AsyncOpenAI
+from ContextualDecisionEngine.utils.prompt_memo import PromptMemo
+
+
+class RateBudget:
+    """Token bucket refilled continuously up to a per-minute capacity (0 disables it)"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+
+    async def acquire(self, amount: float) -> float:
+        """Wait until `amount` units are available and take them; returns seconds spent waiting"""
+        if self.capacity <= 0:
+            return 0.0
+
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return waited
+                delay = (amount - self.available) * 60.0 / self.capacity
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def refund(self, amount: float):
+        """Return (or, when negative, additionally charge) units after the real cost is known"""
+        if self.capacity <= 0:
+            return
+        self._refill()
+        self.available = min(self.capacity, self.available + amount)
+
+    def snapshot(self) -> Optional[float]:
+        if self.capacity <= 0:
+            return None
+        self._refill()
+        return round(self.available, 2)
+
+
+class LLMClientRegistry:
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        base_url: Optional[str] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        agent_quotas: Optional[Dict[str, int]] = None,
+        memo: Optional[PromptMemo] = None
+    ):
+        self.api_key = os.getenv("OPENAI_API_KEY", "default_key")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self.max_concurrency = max_concurrency or int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+        self.timeout = timeout or float(os.getenv("OPENAI_TIMEOUT", "30"))
+
+        # One async client means one keep-alive connection pool for every agent
+        self.client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, timeout=self.timeout)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Global rate budget shared by all agents
+        if requests_per_minute is None:
+            requests_per_minute = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+        if tokens_per_minute is None:
+            tokens_per_minute = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+        self.request_budget = RateBudget(requests_per_minute)
+        self.token_budget = RateBudget(tokens_per_minute)
+
+        # Per-agent concurrency quotas, e.g. LLM_AGENT_QUOTAS="classifier=8,email=4"
+        if agent_quotas is None:
+            agent_quotas = self._parse_quotas(os.getenv("LLM_AGENT_QUOTAS", ""))
+        self.agent_quotas = agent_quotas
+        self.agent_semaphores: Dict[str, asyncio.Semaphore] = {
+            agent: asyncio.Semaphore(limit) for agent, limit in agent_quotas.items()
+        }
+
+        # Opt-in prompt memoization shared by every agent (LLM_MEMOIZE=1)
+        if memo is None and os.getenv("LLM_MEMOIZE", "0") == "1":
+            memo = PromptMemo(
+                max_temperature=float(os.getenv("LLM_MEMO_MAX_TEMPERATURE", "0.0")),
+                max_bytes=int(os.getenv("LLM_MEMO_MAX_BYTES", str(16 * 1024 * 1024))),
+                spill_path=os.getenv("LLM_MEMO_SPILL_PATH") or None,
+                max_spill_entries=int(os.getenv("LLM_MEMO_SPILL_MAX_ENTRIES", "100000")),
+                spill_ttl=float(os.getenv("LLM_MEMO_SPILL_TTL", str(7 * 24 * 3600)))
+            )
+        self.memo = memo
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.agent_stats: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _parse_quotas(spec: str) -> Dict[str, int]:
+        quotas = {}
+        for item in spec.split(","):
+            if "=" in item:
+                agent, limit = item.split("=", 1)
+                quotas[agent.strip()] = int(limit)
+        return quotas
+
+    def _stats_for(self, agent_name: str) -> Dict[str, Any]:
+        if agent_name not in self.agent_stats:
+            self.agent_stats[agent_name] = {
+                "requests": 0,
+                "failures": 0,
+                "in_flight": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "throttled_seconds": 0.0
+            }
+        return self.agent_stats[agent_name]
+
+    @asynccontextmanager
+    async def lease(self, agent_name: str, estimated_tokens: int):
+        """
+        Reserve a pool slot for one completion
+
+        Waits on the agent quota, the global rate budget and the shared pool, in that order.
+        Yields a callback that records the real token usage once the response arrives.
+        """
+        stats = self._stats_for(agent_name)
+        agent_semaphore = self.agent_semaphores.get(agent_name)
+        charged = {"tokens": estimated_tokens}
+
+        def record_usage(usage):
+            if usage is None:
+                return
+            stats["prompt_tokens"] += usage.prompt_tokens or 0
+            stats["completion_tokens"] += usage.completion_tokens or 0
+            self.token_budget.refund(charged["tokens"] - (usage.total_tokens or 0))
+            charged["tokens"] = usage.total_tokens or 0
+
+        if agent_semaphore:
+            await agent_semaphore.acquire()
+        try:
+            waited = await self.request_budget.acquire(1)
+            waited += await self.token_budget.acquire(estimated_tokens)
+            stats["throttled_seconds"] += waited
+
+            async with self.semaphore:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                stats["in_flight"] += 1
+                stats["requests"] += 1
+                try:
+                    yield record_usage
+                except BaseException:
+                    stats["failures"] += 1
+                    raise
+                finally:
+                    self.in_flight -= 1
+                    stats["in_flight"] -= 1
+        finally:
+            if agent_semaphore:
+                agent_semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Report pool usage, remaining budget and per-agent accounting"""
+        return {
+            "pool": {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "available": self.max_concurrency - self.in_flight
+            },
+            "budget": {
+                "requests_per_minute": self.request_budget.capacity or None,
+                "tokens_per_minute": self.token_budget.capacity or None,
+                "requests_available": self.request_budget.snapshot(),
+                "tokens_available": self.token_budget.snapshot()
+            },
+            "agents": {
+                agent: dict(stats, quota=self.agent_quotas.get(agent))
+                for agent, stats in self.agent_stats.items()
+            },
+            "memo": self.memo.get_stats() if self.memo else None
+        }
+
+    async def aclose(self):
+        """Close the shared HTTP connection pool and the memo's spill connection"""
+        await self.client.close()
+        if self.memo:
+            # Waits for any spill write still running in a worker thread
+            await asyncio.to_thread(self.memo.close)
+
+
+_registry: Optional[LLMClientRegistry] = None
+
+
+def get_llm_registry() -> LLMClientRegistry:
+    """Return the process-wide registry, creating it on first use"""
+    global _registry
+    if _registry is None:
+        _registry = LLMClientRegistry()
+    return _registry
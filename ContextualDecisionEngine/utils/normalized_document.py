@@ -0,0 +1,54 @@
+"""
+Normalized Document - One parse of an uploaded PDF shared by every pipeline stage
+Holds the extracted text, where each page starts in it and the document metadata,
+so the classifier and PDFAgent read the same pages instead of parsing the file twice
+"""
+
+from typing import Any, Dict, List, Optional
+from ContextualDecisionEngine.utils.pdf_extraction import PDFTextExtractor, PagedPDF
+
+
+class NormalizedDocument(PagedPDF):
+    def __init__(
+        self,
+        extractor: PDFTextExtractor,
+        pdf_path: str,
+        metadata: Dict[str, Any],
+        max_pages: Optional[int] = None,
+        max_seconds: Optional[float] = None
+    ):
+        super().__init__(extractor, pdf_path, max_pages, max_seconds)
+        self.metadata = metadata
+        self.total_pages = metadata["page_count"]
+
+    @classmethod
+    async def from_pdf(
+        cls,
+        extractor: PDFTextExtractor,
+        pdf_path: str,
+        max_pages: Optional[int] = None,
+        max_seconds: Optional[float] = None
+    ) -> "NormalizedDocument":
+        """Read the page count and metadata; pages are extracted by read_pages"""
+        info = await extractor.document_info(pdf_path)
+        return cls(extractor, pdf_path, dict(info["info"], page_count=info["page_count"]), max_pages, max_seconds)
+
+    @property
+    def page_offsets(self) -> List[int]:
+        """Character offset in `text` at which each page read so far begins"""
+        joined = "\n".join(self.pages)
+        # `text` is stripped, so offsets start after any leading whitespace
+        position = len(joined.lstrip()) - len(joined)
+        offsets = []
+        for page_text in self.pages:
+            offsets.append(max(0, position))
+            position += len(page_text) + 1
+        return offsets
+
+    def describe(self) -> Dict[str, Any]:
+        """Metadata and page layout for inclusion in the agent result"""
+        return {
+            "metadata": self.metadata,
+            "pages_read": len(self.pages),
+            "page_offsets": self.page_offsets
+        }
@@ -3,17 +3,55 @@ OpenAI Client - Wrapper for OpenAI API interactions
 Handles chat completions with proper error handling and response formatting
 """
 
-import os
 import json
-from typing import Dict, Any, Optional
-from openai import OpenAI
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+from ContextualDecisionEngine.utils.llm_registry import LLMClientRegistry
+
+# Stages of the current request that answered without a usable LLM response
+_current_fallbacks: contextvars.ContextVar = contextvars.ContextVar("llm_fallbacks", default=None)
+
+
+@contextmanager
+def track_fallbacks():
+    """Collect the fallbacks taken inside the block, e.g. to keep degraded results out of caches"""
+    fallbacks: List[str] = []
+    token = _current_fallbacks.set(fallbacks)
+    try:
+        yield fallbacks
+    finally:
+        _current_fallbacks.reset(token)
+
+
+def note_fallback(stage: str):
+    """Record that a stage fell back to its non-LLM answer (no-op outside track_fallbacks)"""
+    fallbacks = _current_fallbacks.get()
+    if fallbacks is not None:
+        fallbacks.append(stage)
+
 
 class OpenAIClient:
-    def __init__(self):
+    def __init__(
+        self,
+        agent_name: str = "default",
+        registry: Optional[LLMClientRegistry] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        base_url: Optional[str] = None
+    ):
+        # Clients created without a registry get a private pool of their own
+        self.owns_registry = registry is None
+        self.registry = registry or LLMClientRegistry(
+            max_concurrency=max_concurrency, timeout=timeout, base_url=base_url
+        )
+        self.agent_name = agent_name
+        self.client = self.registry.client
+        self.timeout = timeout or self.registry.timeout
+        
         # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
         # do not change this unless explicitly requested by the user
-        self.api_key = os.getenv("OPENAI_API_KEY", "default_key")
-        self.client = OpenAI(api_key=self.api_key)
         self.model = "gpt-4o"
 
     async def chat_completion(
@@ -21,7 +59,8 @@ class OpenAIClient:
         prompt: str, 
         response_format: Optional[Dict[str, str]] = None,
         max_tokens: int = 500,
-        temperature: float = 0.3
+        temperature: float = 0.3,
+        timeout: Optional[float] = None
     ) -> str:
         """
         Generate chat completion using OpenAI API
@@ -31,10 +70,15 @@ class OpenAIClient:
             response_format: Optional response format specification
             max_tokens: Maximum tokens in response
             temperature: Sampling temperature
+            timeout: Per-call timeout in seconds (defaults to the client timeout)
             
         Returns:
             Response content as string
+        
+        Cancelling the awaiting task cancels the underlying HTTP request.
         """
+        call_timeout = timeout or self.timeout
+        
         try:
             messages = [
                 {
@@ -59,14 +103,44 @@ class OpenAIClient:
             if response_format:
                 api_params["response_format"] = response_format
             
-            # Make API call
-            response = self.client.chat.completions.create(**api_params)
+            # Serve low-temperature repeats from the shared memo without an API call
+            memo = self.registry.memo
+            memo_key = None
+            if memo and memo.applies_to(temperature):
+                memo_key = memo.make_key(self.model, messages, response_format, temperature, max_tokens)
+                memoized = await memo.get(memo_key)
+                if memoized is not None:
+                    return memoized
+            
+            # Rough token estimate for the shared budget, reconciled with real usage afterwards
+            estimated_tokens = len(prompt) // 4 + max_tokens
             
-            return response.choices[0].message.content
+            # Make API call, waiting for a free slot in the shared pool first
+            async with self.registry.lease(self.agent_name, estimated_tokens) as record_usage:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(**api_params),
+                    timeout=call_timeout
+                )
+                record_usage(response.usage)
             
+            content = response.choices[0].message.content
+            if memo_key and content is not None:
+                await memo.put(memo_key, content)
+            
+            return content
+            
+        except asyncio.TimeoutError:
+            note_fallback(f"{self.agent_name}:timeout")
+            raise Exception(f"OpenAI API call timed out after {call_timeout}s")
         except Exception as e:
+            note_fallback(f"{self.agent_name}:error")
             raise Exception(f"OpenAI API call failed: {str(e)}")
 
+    async def aclose(self):
+        """Close the private connection pool; a shared registry is closed by its owner"""
+        if self.owns_registry:
+            await self.registry.aclose()
+
     async def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
         Analyze sentiment of text using OpenAI
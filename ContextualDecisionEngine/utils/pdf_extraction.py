@@ -0,0 +1,251 @@
+"""
+PDF Extraction - Page-parallel PDF text extraction off the event loop
+Large documents are split into page ranges extracted in a process pool; pages stream
+back in order through an async generator and are assembled with a single join
+"""
+
+import io
+import os
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import PyPDF2
+
+
+def count_pages(pdf_path: str) -> int:
+    with open(pdf_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def read_document_info(pdf_path: str) -> Dict[str, Any]:
+    """Page count and document information dictionary, from one parse of the file"""
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        info = {}
+        try:
+            metadata = pdf_reader.metadata or {}
+            for key, name in (("/Title", "title"), ("/Author", "author"), ("/Producer", "producer"), ("/CreationDate", "created")):
+                if metadata.get(key):
+                    info[name] = str(metadata[key])
+        except Exception:
+            pass  # A damaged info dictionary should not stop text extraction
+        return {"page_count": len(pdf_reader.pages), "info": info}
+
+
+def extract_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Extract pages [start, stop) with a fresh reader"""
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[page_num].extract_text() or "" for page_num in range(start, stop)]
+
+
+# Per worker process: the reader of the last document, so consecutive ranges skip re-parsing it
+_worker_reader: Dict[str, Any] = {"key": None, "reader": None}
+
+
+def _worker_extract_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Pool task: extract pages [start, stop), reusing this worker's parsed reader"""
+    stat = os.stat(pdf_path)
+    key = (pdf_path, stat.st_mtime_ns, stat.st_size)
+    if _worker_reader["key"] != key:
+        with open(pdf_path, 'rb') as file:
+            _worker_reader["reader"] = PyPDF2.PdfReader(io.BytesIO(file.read()))
+        _worker_reader["key"] = key
+    pdf_reader = _worker_reader["reader"]
+    return [pdf_reader.pages[page_num].extract_text() or "" for page_num in range(start, stop)]
+
+
+class PDFTextExtractor:
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        pages_per_task: Optional[int] = None,
+        parallel_min_pages: Optional[int] = None
+    ):
+        self.max_workers = max_workers or int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.pages_per_task = pages_per_task or int(os.getenv("PDF_PAGES_PER_TASK", "25"))
+        # Smaller documents are extracted on one worker thread; a process hop would cost more than it saves
+        self.parallel_min_pages = parallel_min_pages or int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {"documents": 0, "pages": 0, "parallel_documents": 0}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            # spawn: forking a process that runs an event loop and threads is not safe
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self.executor
+
+    def _ranges(self, start: int, stop: int) -> List[Tuple[int, int]]:
+        """Split pages into ranges small enough to keep every worker busy"""
+        per_worker = -(-(stop - start) // self.max_workers)
+        size = max(1, min(self.pages_per_task, per_worker))
+        return [(first, min(first + size, stop)) for first in range(start, stop, size)]
+
+    async def page_count(self, pdf_path: str) -> int:
+        return await asyncio.to_thread(count_pages, pdf_path)
+
+    async def document_info(self, pdf_path: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(read_document_info, pdf_path)
+
+    async def iter_pages(
+        self,
+        pdf_path: str,
+        start: int = 0,
+        stop: Optional[int] = None,
+        total: Optional[int] = None
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Stream (page number, text) pairs in page order
+        
+        Only as many ranges as there are workers are extracted ahead of the consumer,
+        so a caller that stops early leaves the remaining pages unread.
+        Pass `total` when the page count is already known to skip counting again.
+        """
+        if total is None:
+            total = await self.page_count(pdf_path)
+        stop = total if stop is None else min(stop, total)
+        if start >= stop:
+            return
+
+        self.stats["documents"] += 1
+        if stop - start < self.parallel_min_pages:
+            pages = await asyncio.to_thread(extract_page_range, pdf_path, start, stop)
+            self.stats["pages"] += len(pages)
+            for offset, text in enumerate(pages):
+                yield start + offset, text
+            return
+
+        self.stats["parallel_documents"] += 1
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        ranges = self._ranges(start, stop)
+        pending: List[asyncio.Future] = []
+        next_range = 0
+
+        def submit_ahead():
+            nonlocal next_range
+            while next_range < len(ranges) and len(pending) < self.max_workers:
+                first, last = ranges[next_range]
+                pending.append(loop.run_in_executor(pool, _worker_extract_range, pdf_path, first, last))
+                next_range += 1
+
+        try:
+            for first, _ in ranges:
+                submit_ahead()
+                pages = await pending.pop(0)
+                self.stats["pages"] += len(pages)
+                for offset, text in enumerate(pages):
+                    yield first + offset, text
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def extract_text(self, pdf_path: str) -> str:
+        """Extract the whole document, one page per line block"""
+        return "\n".join([text async for _, text in self.iter_pages(pdf_path)]).strip()
+
+    def get_stats(self):
+        return dict(self.stats, max_workers=self.max_workers, pages_per_task=self.pages_per_task)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+class PagedPDF:
+    """
+    Pages of one PDF read on demand, in order, under a page and time budget
+    
+    Callers read a few leading pages first and pull the rest only if they need them;
+    once either budget is spent no further pages are extracted.
+    """
+
+    def __init__(
+        self,
+        extractor: PDFTextExtractor,
+        pdf_path: str,
+        max_pages: Optional[int] = None,
+        max_seconds: Optional[float] = None
+    ):
+        self.extractor = extractor
+        self.pdf_path = pdf_path
+        self.max_pages = max_pages
+        self.max_seconds = max_seconds
+        self.pages: List[str] = []
+        self.total_pages: Optional[int] = None
+        self.started = time.perf_counter()
+        self.stop_reason: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        """Text of every page read so far"""
+        return "\n".join(self.pages).strip()
+
+    @property
+    def complete(self) -> bool:
+        return self.total_pages is not None and len(self.pages) >= self.total_pages
+
+    def _limit(self) -> int:
+        limit = self.total_pages
+        if self.max_pages is not None:
+            limit = min(limit, self.max_pages)
+        return limit
+
+    async def read_pages(self, count: Optional[int] = None) -> str:
+        """Read up to `count` more pages (all remaining when None) within the budget; returns all text read"""
+        if self.total_pages is None:
+            self.total_pages = await self.extractor.page_count(self.pdf_path)
+
+        start = len(self.pages)
+        limit = self._limit()
+        stop = limit if count is None else min(limit, start + count)
+        if start < stop and self.stop_reason is None:
+            pages = self.extractor.iter_pages(self.pdf_path, start, stop, total=self.total_pages)
+            try:
+                async for _, page_text in pages:
+                    self.pages.append(page_text)
+                    if self.complete:
+                        break
+                    if self.max_seconds is not None and time.perf_counter() - self.started > self.max_seconds:
+                        self.stop_reason = "time_budget"
+                        break
+            finally:
+                await pages.aclose()
+
+        if self.stop_reason is None and len(self.pages) >= limit and not self.complete:
+            self.stop_reason = "page_budget"
+        return self.text
+
+    async def read_all(self) -> str:
+        """Read every remaining page the budget allows"""
+        return await self.read_pages()
+
+    def get_report(self) -> Dict[str, Any]:
+        """Pages read against the budget, for inclusion in the agent result"""
+        return {
+            "pages_total": self.total_pages,
+            "pages_read": len(self.pages),
+            "complete": self.complete,
+            "stop_reason": self.stop_reason,
+            "max_pages": self.max_pages,
+            "max_seconds": self.max_seconds,
+            "elapsed_seconds": round(time.perf_counter() - self.started, 4)
+        }
+
+
+_extractor: Optional[PDFTextExtractor] = None
+
+
+def get_pdf_extractor() -> PDFTextExtractor:
+    """Return the process-wide extractor, creating it on first use"""
+    global _extractor
+    if _extractor is None:
+        _extractor = PDFTextExtractor()
+    return _extractor
@@ -0,0 +1,195 @@
+"""
+Prompt Memo - Opt-in memoization of LLM completions keyed by the full request
+Bounded in memory, optionally spilling evicted entries to a size- and age-bounded SQLite file
+"""
+
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+class PromptMemo:
+    def __init__(
+        self,
+        max_temperature: float = 0.0,
+        max_entries: int = 2048,
+        max_bytes: int = 16 * 1024 * 1024,
+        spill_path: Optional[str] = None,
+        max_spill_entries: int = 100000,
+        spill_ttl: float = 7 * 24 * 3600
+    ):
+        # Only completions at or below this temperature are memoized; 0.0 limits it to greedy decoding,
+        # anything higher replays one sample where a fresh call could have answered differently
+        self.max_temperature = max_temperature
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.spill_path = spill_path
+        # Spilled rows past this count or older than the TTL (seconds, 0 = never) are pruned
+        self.max_spill_entries = max_spill_entries
+        self.spill_ttl = spill_ttl
+        self.lock = threading.Lock()
+
+        self.memory: "OrderedDict[str, str]" = OrderedDict()
+        self.memory_bytes = 0
+        self.stats = {"hits": 0, "spill_hits": 0, "misses": 0, "spilled": 0, "spill_pruned": 0, "invalidations": 0}
+
+        # One connection for the life of the memo, used only from worker threads under spill_lock
+        self.spill_lock = threading.Lock()
+        self.spill_conn: Optional[sqlite3.Connection] = None
+        if self.spill_path:
+            self.spill_conn = sqlite3.connect(self.spill_path, check_same_thread=False)
+            self.spill_conn.execute('''
+                CREATE TABLE IF NOT EXISTS prompt_memo (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    stored_at REAL NOT NULL DEFAULT 0
+                )
+            ''')
+            columns = {row[1] for row in self.spill_conn.execute('PRAGMA table_info(prompt_memo)')}
+            if "stored_at" not in columns:
+                # Files spilled before pruning existed; their rows count as oldest
+                self.spill_conn.execute('ALTER TABLE prompt_memo ADD COLUMN stored_at REAL NOT NULL DEFAULT 0')
+            self.spill_conn.execute('CREATE INDEX IF NOT EXISTS idx_prompt_memo_stored_at ON prompt_memo(stored_at)')
+            self.spill_conn.commit()
+
+    def applies_to(self, temperature: float) -> bool:
+        return temperature <= self.max_temperature
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: List[Dict[str, str]],
+        response_format: Optional[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Hash every parameter that can change the completion"""
+        payload = json.dumps({
+            "model": model,
+            "messages": messages,
+            "response_format": response_format,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            response = self.memory.get(key)
+            if response is not None:
+                self.memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return response
+
+        if self.spill_conn:
+            response = await asyncio.to_thread(self._spill_get, key)
+            if response is not None:
+                with self.lock:
+                    self.stats["spill_hits"] += 1
+                return response
+
+        with self.lock:
+            self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, response: str):
+        with self.lock:
+            if key in self.memory:
+                self.memory_bytes -= len(self.memory.pop(key))
+            self.memory[key] = response
+            self.memory_bytes += len(response)
+
+            evicted = []
+            while self.memory and (len(self.memory) > self.max_entries or self.memory_bytes > self.max_bytes):
+                old_key, old_response = self.memory.popitem(last=False)
+                self.memory_bytes -= len(old_response)
+                evicted.append((old_key, old_response))
+
+        if evicted and self.spill_conn:
+            pruned = await asyncio.to_thread(self._spill_put, evicted)
+            with self.lock:
+                self.stats["spilled"] += len(evicted)
+                self.stats["spill_pruned"] += pruned
+
+    async def invalidate(self, key: Optional[str] = None):
+        """Drop one memoized completion, or every one when no key is given"""
+        with self.lock:
+            if key is None:
+                self.memory.clear()
+                self.memory_bytes = 0
+            elif key in self.memory:
+                self.memory_bytes -= len(self.memory.pop(key))
+            self.stats["invalidations"] += 1
+
+        if self.spill_conn:
+            await asyncio.to_thread(self._spill_delete, key)
+
+    def _spill_get(self, key: str) -> Optional[str]:
+        with self.spill_lock:
+            if self.spill_conn is None:
+                return None
+            if self.spill_ttl:
+                row = self.spill_conn.execute(
+                    'SELECT response FROM prompt_memo WHERE key = ? AND stored_at >= ?',
+                    (key, time.time() - self.spill_ttl)
+                ).fetchone()
+            else:
+                row = self.spill_conn.execute('SELECT response FROM prompt_memo WHERE key = ?', (key,)).fetchone()
+            return row[0] if row else None
+
+    def _spill_put(self, evicted: List[Tuple[str, str]]) -> int:
+        """Write evicted entries, then prune expired and oldest rows; returns rows pruned"""
+        now = time.time()
+        with self.spill_lock:
+            conn = self.spill_conn
+            if conn is None:
+                return 0
+            conn.executemany(
+                'INSERT OR REPLACE INTO prompt_memo (key, response, stored_at) VALUES (?, ?, ?)',
+                [(key, response, now) for key, response in evicted]
+            )
+            pruned = 0
+            if self.spill_ttl:
+                pruned += conn.execute('DELETE FROM prompt_memo WHERE stored_at < ?', (now - self.spill_ttl,)).rowcount
+            if self.max_spill_entries:
+                pruned += conn.execute('''
+                    DELETE FROM prompt_memo WHERE key IN (
+                        SELECT key FROM prompt_memo ORDER BY stored_at DESC LIMIT -1 OFFSET ?
+                    )
+                ''', (self.max_spill_entries,)).rowcount
+            conn.commit()
+            return pruned
+
+    def _spill_delete(self, key: Optional[str]):
+        with self.spill_lock:
+            if self.spill_conn is None:
+                return
+            if key is None:
+                self.spill_conn.execute('DELETE FROM prompt_memo')
+            else:
+                self.spill_conn.execute('DELETE FROM prompt_memo WHERE key = ?', (key,))
+            self.spill_conn.commit()
+
+    def close(self):
+        """Close the spill connection; later spill lookups miss and evictions are dropped"""
+        with self.spill_lock:
+            if self.spill_conn:
+                self.spill_conn.close()
+                self.spill_conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return dict(
+                self.stats,
+                entries=len(self.memory),
+                memory_bytes=self.memory_bytes,
+                max_bytes=self.max_bytes,
+                max_temperature=self.max_temperature,
+                spill_path=self.spill_path,
+                max_spill_entries=self.max_spill_entries,
+                spill_ttl=self.spill_ttl
+            )
@@ -0,0 +1,310 @@
+"""
+Schema Registry - JSON schemas compiled once into reusable validators
+Collects every validation error in one pass into missing, type and extra field lists;
+schemas built from the common keyword subset also get a compiled fast path that
+accepts valid payloads without walking them through jsonschema
+"""
+
+import os
+import json
+import hashlib
+import threading
+import jsonschema
+from jsonschema import validators
+from typing import Any, Callable, Dict, List, Optional
+
+Check = Callable[[Any], bool]
+
+# Keywords that never affect validity (format is an annotation unless a format checker is set)
+ANNOTATION_KEYWORDS = {"$schema", "$id", "$comment", "title", "description", "default", "examples", "format"}
+
+# Dialects whose type semantics the fast path reproduces (1.0 counts as an integer)
+FAST_PATH_DIALECTS = (
+    validators.Draft6Validator,
+    validators.Draft7Validator,
+    validators.Draft201909Validator,
+    validators.Draft202012Validator,
+)
+
+TYPE_CHECKS: Dict[str, Check] = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "integer": lambda value: (
+        (isinstance(value, int) and not isinstance(value, bool))
+        or (isinstance(value, float) and value.is_integer())
+    ),
+}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def compile_fast_check(schema: Any) -> Optional[Check]:
+    """
+    Compile a schema into a plain predicate, or None when it uses keywords outside the subset
+
+    The predicate must agree with jsonschema on every instance, so anything it does not
+    fully reproduce (enum, combinators, references, patterns, ...) disables it.
+    """
+    if schema is True or schema == {}:
+        return lambda value: True
+    if schema is False:
+        return lambda value: False
+    if not isinstance(schema, dict):
+        return None
+
+    checks: List[Check] = []
+    for keyword, argument in schema.items():
+        if keyword in ANNOTATION_KEYWORDS:
+            continue
+        if keyword == "type":
+            names = [argument] if isinstance(argument, str) else argument
+            if not isinstance(names, list) or any(name not in TYPE_CHECKS for name in names):
+                return None
+            type_checks = [TYPE_CHECKS[name] for name in names]
+            checks.append(lambda value, type_checks=type_checks: any(check(value) for check in type_checks))
+        elif keyword == "required":
+            required = list(argument)
+            checks.append(lambda value, required=required: not isinstance(value, dict) or all(key in value for key in required))
+        elif keyword == "properties":
+            properties = {}
+            for name, subschema in argument.items():
+                properties[name] = compile_fast_check(subschema)
+                if properties[name] is None:
+                    return None
+            checks.append(lambda value, properties=properties: not isinstance(value, dict) or all(
+                check(value[name]) for name, check in properties.items() if name in value
+            ))
+        elif keyword == "additionalProperties":
+            declared = set(schema.get("properties", {}))
+            additional = compile_fast_check(argument)
+            if additional is None:
+                return None
+            checks.append(lambda value, declared=declared, additional=additional: not isinstance(value, dict) or all(
+                additional(item) for name, item in value.items() if name not in declared
+            ))
+        elif keyword == "items":
+            items = compile_fast_check(argument)
+            if items is None:
+                return None  # Tuple-form items
+            checks.append(lambda value, items=items: not isinstance(value, list) or all(items(item) for item in value))
+        elif keyword == "minimum":
+            checks.append(lambda value, bound=argument: not _is_number(value) or value >= bound)
+        elif keyword == "maximum":
+            checks.append(lambda value, bound=argument: not _is_number(value) or value <= bound)
+        elif keyword == "minLength":
+            checks.append(lambda value, bound=argument: not isinstance(value, str) or len(value) >= bound)
+        elif keyword == "maxLength":
+            checks.append(lambda value, bound=argument: not isinstance(value, str) or len(value) <= bound)
+        else:
+            return None
+
+    if len(checks) == 1:
+        return checks[0]
+    return lambda value: all(check(value) for check in checks)
+
+
+class ErrorLocator:
+    """
+    Collects jsonschema errors only where the fast check fails
+
+    Each node validates its own keywords with jsonschema (child schemas replaced by true)
+    and descends into the properties, additional properties and array items that fail their
+    own fast check, so a few bad items in a large array are found without walking the rest.
+    """
+
+    def __init__(self, schema: Any, validator_class):
+        self.check = compile_fast_check(schema)
+        self.properties: Dict[str, "ErrorLocator"] = {}
+        self.additional: Optional["ErrorLocator"] = None
+        self.items: Optional["ErrorLocator"] = None
+        local = schema
+        if isinstance(schema, dict):
+            local = dict(schema)
+            if "properties" in schema:
+                self.properties = {
+                    name: ErrorLocator(subschema, validator_class) for name, subschema in schema["properties"].items()
+                }
+                local["properties"] = {name: True for name in schema["properties"]}
+            # Boolean forms stay local: they only ever produce an error at this level
+            if isinstance(schema.get("additionalProperties"), dict):
+                self.additional = ErrorLocator(local.pop("additionalProperties"), validator_class)
+            if isinstance(schema.get("items"), dict):
+                self.items = ErrorLocator(local.pop("items"), validator_class)
+        self.validator = validator_class(local)
+
+    def iter_errors(self, value: Any, path: tuple = ()):
+        if self.check(value):
+            return
+        for error in self.validator.iter_errors(value):
+            error.path.extendleft(reversed(path))
+            yield error
+        if isinstance(value, dict):
+            for name, item in value.items():
+                child = self.properties.get(name)
+                if child is None and name not in self.properties:
+                    child = self.additional
+                if child is not None:
+                    yield from child.iter_errors(item, path + (name,))
+        elif isinstance(value, list) and self.items is not None:
+            for index, item in enumerate(value):
+                yield from self.items.iter_errors(item, path + (index,))
+
+
+class CompiledSchema:
+    def __init__(self, name: str, schema: Dict[str, Any]):
+        """Check the schema itself and build its validator; raises ValueError for invalid schemas"""
+        validator_class = validators.validator_for(schema)
+        try:
+            validator_class.check_schema(schema)
+        except jsonschema.SchemaError as e:
+            raise ValueError(f"Invalid schema {name}: {e.message}")
+        self.name = name
+        self.schema = schema
+        self.validator = validator_class(schema)
+        self.fast_check = compile_fast_check(schema) if issubclass(validator_class, FAST_PATH_DIALECTS) else None
+        self.locator = ErrorLocator(schema, validator_class) if self.fast_check is not None else None
+        # Top-level fields the schema names; anything else in a payload is reported as undeclared
+        self.declared = set(schema.get("properties", {})) | set(schema.get("required", [])) if isinstance(schema, dict) else set()
+
+    def is_valid(self, data: Any) -> bool:
+        if self.fast_check is not None:
+            return self.fast_check(data)
+        return self.validator.is_valid(data)
+
+
+class SchemaRegistry:
+    def __init__(self, schemas: Dict[str, Dict[str, Any]], max_errors: Optional[int] = None):
+        """
+        Compile the built-in schemas
+
+        Args:
+            schemas: Schema name to JSON schema
+            max_errors: Errors reported per payload before the lists are truncated
+        """
+        self.max_errors = max_errors or int(os.getenv("JSON_SCHEMA_MAX_ERRORS", "100"))
+        self.lock = threading.Lock()
+        # Names added or replaced through register(), in registration order
+        self.runtime: List[str] = []
+        self.compiled: Dict[str, CompiledSchema] = {
+            name: CompiledSchema(name, schema) for name, schema in schemas.items()
+        }
+        self.fingerprint = self._fingerprint()
+
+    @property
+    def schemas(self) -> Dict[str, Dict[str, Any]]:
+        return {name: compiled.schema for name, compiled in self.compiled.items()}
+
+    def register(self, name: str, schema: Dict[str, Any]):
+        """Add or replace a schema; it is compiled before it becomes visible to validation"""
+        if not name:
+            raise ValueError("Schema name must not be empty")
+        compiled = CompiledSchema(name, schema)
+        with self.lock:
+            self.compiled = dict(self.compiled, **{name: compiled})
+            if name not in self.runtime:
+                self.runtime.append(name)
+            self.fingerprint = self._fingerprint()
+
+    def _fingerprint(self) -> str:
+        """Changes whenever the set of schemas does, so results validated under other schemas are not reused"""
+        payload = json.dumps(self.schemas, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def matching(self, data: Any, names: List[str]) -> Optional[str]:
+        """First of the named schemas the payload satisfies"""
+        compiled = self.compiled
+        for name in names:
+            if name in compiled and compiled[name].is_valid(data):
+                return name
+        return None
+
+    def validate(self, data: Any, name: str) -> Dict[str, Any]:
+        """
+        Validate a payload, collecting every error in one pass
+
+        Returns:
+            is_valid, missing_fields (dotted paths of absent required fields), type_errors
+            (field, validator, expected and message per violated constraint), extra_fields
+            (fields an additionalProperties constraint rejects), undeclared_fields (top-level
+            fields the schema does not name, informational only), error_count and whether the
+            lists were truncated
+        """
+        result = {
+            "is_valid": True,
+            "missing_fields": [],
+            "type_errors": [],
+            "extra_fields": [],
+            "undeclared_fields": [],
+            "error_count": 0,
+            "errors_truncated": False,
+            "schema_used": name
+        }
+
+        compiled = self.compiled.get(name)
+        if compiled is None:
+            result["is_valid"] = False
+            result["error_count"] = 1
+            result["type_errors"].append({
+                "field": "$", "validator": "schema", "expected": None, "message": f"Unknown JSON type: {name}"
+            })
+            return result
+
+        if isinstance(data, dict) and compiled.declared:
+            result["undeclared_fields"] = [key for key in data if key not in compiled.declared]
+
+        if compiled.fast_check is not None and compiled.fast_check(data):
+            return result
+
+        missing = set()
+        extra = set()
+        errors = compiled.locator.iter_errors(data) if compiled.locator else compiled.validator.iter_errors(data)
+        for error in errors:
+            result["is_valid"] = False
+            result["error_count"] += 1
+            if result["error_count"] > self.max_errors:
+                result["errors_truncated"] = True
+                continue
+            path = _field_path(error.absolute_path)
+            if error.validator == "required":
+                # One error per absent field, each carrying the whole required list
+                for field in error.validator_value:
+                    field_path = _join(path, field)
+                    if field not in error.instance and field_path not in missing:
+                        missing.add(field_path)
+                        result["missing_fields"].append(field_path)
+            elif error.validator == "additionalProperties" and isinstance(error.instance, dict):
+                for field in error.instance:
+                    if field not in error.schema.get("properties", {}):
+                        field = _join(path, field)
+                        if field not in extra:
+                            extra.add(field)
+                            result["extra_fields"].append(field)
+            else:
+                result["type_errors"].append({
+                    "field": path or "$",
+                    "validator": error.validator,
+                    "expected": error.validator_value if _is_plain(error.validator_value) else None,
+                    "message": error.message
+                })
+        return result
+
+
+def _field_path(path) -> str:
+    return ".".join(str(part) for part in path)
+
+
+def _join(path: str, field: str) -> str:
+    return f"{path}.{field}" if path else field
+
+
+def _is_plain(value: Any) -> bool:
+    """Validator arguments worth echoing: scalars and lists of them, not whole subschemas"""
+    if isinstance(value, list):
+        return all(_is_plain(item) for item in value)
+    return value is None or isinstance(value, (str, int, float, bool))
@@ -0,0 +1,89 @@
+"""
+Upload Spool - Streams uploaded files to a spool file in fixed-size chunks
+Enforces the size limit while reading, hashes as it goes and keeps only the leading
+bytes in memory for format sniffing
+"""
+
+import os
+import asyncio
+import hashlib
+import tempfile
+from typing import Optional
+from fastapi import UploadFile
+from ContextualDecisionEngine.utils.format_sniffer import sniff_format
+
+
+class UploadTooLarge(Exception):
+    """Raised as soon as an upload grows past its size limit"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Upload exceeds the {limit} byte limit")
+        self.limit = limit
+
+
+class SpooledUpload:
+    def __init__(self, path: str, size: int, head: bytes, digest: str, is_pdf: bool):
+        self.path = path
+        self.size = size
+        self.head = head
+        self.digest = digest
+        self.is_pdf = is_pdf
+
+    def read_text(self, max_bytes: int) -> str:
+        """Decode the spooled upload as UTF-8 text, refusing files too large to hold as text"""
+        if self.size > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        with open(self.path, "rb") as f:
+            return f.read().decode("utf-8")
+
+    def cleanup(self):
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+async def spool_upload(
+    upload: UploadFile,
+    max_bytes: int,
+    chunk_size: int = 1024 * 1024,
+    head_size: int = 8192
+) -> SpooledUpload:
+    """
+    Copy an upload to a temp file one chunk at a time
+
+    Args:
+        upload: Uploaded file from the multipart form
+        max_bytes: Size limit; exceeding it aborts the copy and removes the spool file
+        chunk_size: Bytes read per chunk, which bounds memory use
+        head_size: Leading bytes kept for format sniffing
+
+    Returns:
+        SpooledUpload with the spool path, size, leading bytes, SHA-256 digest and
+        whether the content is a PDF (by magic bytes or declared content type)
+    """
+    first = await upload.read(chunk_size)
+    head = first[:head_size]
+    is_pdf = sniff_format(head)["format"] == "PDF" or upload.content_type == "application/pdf"
+
+    # PDFs keep the .pdf suffix PDFAgent uses to tell a file path from inline text
+    spool = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf" if is_pdf else ".upload")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        chunk: Optional[bytes] = first
+        while chunk:
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            digest.update(chunk)
+            # Disk writes run in a worker thread so a large upload never stalls other requests
+            await asyncio.to_thread(spool.write, chunk)
+            chunk = await upload.read(chunk_size)
+        await asyncio.to_thread(spool.close)
+    except BaseException:
+        spool.close()
+        os.unlink(spool.name)
+        raise
+
+    return SpooledUpload(spool.name, size, head, digest.hexdigest(), is_pdf)
@@ -348,11 +348,13 @@ function renderActionResults(actionResult) {
                                     <td>
                                         ${action.success ? 
                                             '<span class="badge bg-success">Success</span>' : 
+                                            action.status === 'pending' ?
+                                            '<span class="badge bg-warning">Queued</span>' :
                                             '<span class="badge bg-danger">Failed</span>'
                                         }
                                     </td>
                                     <td>
-                                        ${action.response?.message || action.error || 'No details'}
+                                        ${action.response?.message || action.error || (action.status === 'pending' ? 'Queued for delivery' : 'No details')}
                                     </td>
                                 </tr>
                             `).join('')}
@@ -369,7 +371,9 @@ function renderActionResults(actionResult) {
  */
 async function loadTraces() {
     try {
-        const response = await fetch('/memory/traces');
+        // The list view only needs light columns; heavy JSON is fetched per trace
+        const fields = 'status,format,intent,content_preview,agent_type,success_count,failure_count';
+        const response = await fetch(`/memory/traces?fields=${fields}`);
         const result = await response.json();
         
         if (result.success) {
@@ -431,7 +435,7 @@ function displayTraces(traces) {
                     </div>
                     <div class="col-md-4">
                         <h6 class="h7">Actions Triggered</h6>
-                        <p><strong>Total:</strong> ${trace.action_result?.actions_triggered?.length || 0}</p>
+                        <p><strong>Total:</strong> ${(trace.action_result?.success_count || 0) + (trace.action_result?.failure_count || 0)}</p>
                         <p><strong>Success:</strong> ${trace.action_result?.success_count || 0}</p>
                         <p><strong>Failed:</strong> ${trace.action_result?.failure_count || 0}</p>
                     </div>